@@ -0,0 +1,128 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Benchmark of sending the commands to open the dome for the night in one
+batch.
+
+A client sends the openShutter, setLouvers, moveEl and moveAz commands to the
+mock controller, either one at a time, waiting for the reply to each command
+like the CSC does, or in one batch command frame. The network latency is
+emulated by waiting before each round trip.
+
+For each mode the number of round trips and the mean time to send the
+sequence and get the replies are reported.
+
+Run with::
+
+    python examples/benchmark_batch_commands.py [num] [latency]
+
+with the number of times to send the sequence and the emulated round trip
+latency in milliseconds.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+from lsst.ts.MTDome import encoding_tools
+from lsst.ts.MTDome import ControllerConnection
+from lsst.ts.MTDome import MockMTDomeController
+from lsst.ts.MTDome.mock_llc.lcs import NUM_LOUVERS
+
+TIMEOUT = 10
+
+# The commands to open the dome for the night.
+OPEN_DOME_COMMANDS = [
+    ("openShutter", {}),
+    ("setLouvers", dict(position=[100.0] * NUM_LOUVERS)),
+    ("moveEl", dict(position=0.1)),
+    ("moveAz", dict(position=0.1, velocity=0.0)),
+]
+
+
+async def read_loop(connection):
+    """Hand the replies to the commands waiting for them."""
+    while True:
+        for frame in await connection.frame_reader.read_frames():
+            data = encoding_tools.decode(frame)
+            reply_future = connection.pending_replies.get(data["id"])
+            if reply_future is not None and not reply_future.done():
+                reply_future.set_result(data)
+
+
+async def run_sequences(port, batch, num_sequences, latency):
+    """Send the commands to open the dome a number of times and return the
+    number of round trips and the mean time per sequence.
+    """
+    log = logging.getLogger("benchmark")
+    connection = ControllerConnection("benchmark", log)
+    await connection.connect(host="127.0.0.1", port=port, timeout=TIMEOUT)
+    connection.read_loop_task = asyncio.create_task(read_loop(connection))
+    num_round_trips = 0
+
+    async def send_command(command, params):
+        nonlocal num_round_trips
+        num_round_trips += 1
+        # Emulate the network latency.
+        await asyncio.sleep(latency)
+        return await connection.send_command(command, params, timeout=TIMEOUT)
+
+    start_time = time.monotonic()
+    for _ in range(num_sequences):
+        if batch:
+            commands = [
+                dict(command=command, parameters=params)
+                for command, params in OPEN_DOME_COMMANDS
+            ]
+            await send_command("batch", dict(commands=commands))
+        else:
+            for command, params in OPEN_DOME_COMMANDS:
+                await send_command(command, params)
+    duration = (time.monotonic() - start_time) / num_sequences
+    await connection.disconnect(timeout=TIMEOUT)
+    return num_round_trips, duration
+
+
+async def main(num_sequences, latency):
+    encoding_tools.set_validation_policy(encoding_tools.ValidationPolicy.OFF)
+    mock_ctrl = MockMTDomeController(port=0)
+    await mock_ctrl.start()
+    print(
+        f"{num_sequences} times {len(OPEN_DOME_COMMANDS)} commands with an "
+        f"emulated latency of {latency * 1000:.1f} ms"
+    )
+    print(f"{'mode':<12} {'round trips':>12} {'per sequence [ms]':>18}")
+    for batch in (False, True):
+        num_round_trips, duration = await run_sequences(
+            mock_ctrl.port, batch, num_sequences, latency
+        )
+        mode = "batch" if batch else "one by one"
+        print(f"{mode:<12} {num_round_trips:>12} {duration * 1000:>18.2f}")
+    # Give the mock controller the time to notice that the clients are gone.
+    while mock_ctrl.connections:
+        await asyncio.sleep(0.01)
+    await mock_ctrl.stop()
+
+
+if __name__ == "__main__":
+    num_sequences = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.001
+    asyncio.run(main(num_sequences, latency))
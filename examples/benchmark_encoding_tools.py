@@ -0,0 +1,90 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Microbenchmark of the validation of the messages exchanged with the lower
+level components.
+
+It compares the per-message cost of validating with `jsonschema.validate`
+against the full schema, which is what `encoding_tools.validate` used to do,
+with the cost of `encoding_tools.validate`, which uses cached validators and
+per-command schemas.
+
+Run with::
+
+    python examples/benchmark_encoding_tools.py
+"""
+
+import asyncio
+import timeit
+
+import jsonschema
+
+from lsst.ts.MTDome import encoding_tools
+from lsst.ts.MTDome import mock_llc
+from lsst.ts.MTDome.llc_name import LlcName
+
+NUM_ITERATIONS = 1000
+
+
+def validate_with_full_schema(data):
+    """Validate the data the way `encoding_tools.validate` used to do it."""
+    for k, v in encoding_tools.schemas.items():
+        if k in data.keys():
+            jsonschema.validate(data, v)
+            break
+
+
+async def get_messages():
+    """Get a representative set of messages to validate."""
+    amcs = mock_llc.AmcsStatus(start_tai=0)
+    await amcs.determine_status(current_tai=0)
+    lcs = mock_llc.LcsStatus()
+    await lcs.determine_status(current_tai=0)
+    return {
+        "moveAz command": dict(
+            command="moveAz", id=1, parameters=dict(position=0.1, velocity=0.0)
+        ),
+        "statusThCS command": dict(command="statusThCS", id=2, parameters={}),
+        "command reply": dict(response=0, id=1, timeout=20.0),
+        "AMCS status": {"response": 0, "id": 3, LlcName.AMCS.value: amcs.llc_status},
+        "LCS status": {"response": 0, "id": 4, LlcName.LCS.value: lcs.llc_status},
+    }
+
+
+def main():
+    encoding_tools.validation_raises_exception = True
+    messages = asyncio.run(get_messages())
+    print(f"{'message':<20} {'before [us]':>12} {'after [us]':>12} {'speedup':>8}")
+    for name, data in messages.items():
+        before = timeit.timeit(
+            lambda: validate_with_full_schema(data), number=NUM_ITERATIONS
+        )
+        after = timeit.timeit(
+            lambda: encoding_tools.validate(data), number=NUM_ITERATIONS
+        )
+        print(
+            f"{name:<20} {before / NUM_ITERATIONS * 1e6:12.1f} "
+            f"{after / NUM_ITERATIONS * 1e6:12.1f} {before / after:8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Burst benchmark of coalescing motion commands.
+
+A client sends a burst of moveAz commands with new targets at a fixed
+interval to the mock controller, which takes longer than that interval to
+handle each command. Without coalescing, the commands are sent one at a time,
+like the CSC handles the commands of a SAL topic, so the controller executes
+every stale target in order. With coalescing, only the latest target is sent
+once the previous command got its reply.
+
+For each mode the number of commands sent to the controller and the time
+from sending the last target until the controller accepted it are reported.
+
+Run with::
+
+    python examples/benchmark_motion_coalescing.py [num] [interval] [latency]
+
+with the number of targets, the interval between the targets and the latency
+of the controller in milliseconds.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+from lsst.ts.MTDome import encoding_tools
+from lsst.ts.MTDome import CommandCoalescer, ControllerConnection
+from lsst.ts.MTDome import MockMTDomeController
+
+TIMEOUT = 10
+
+
+async def read_loop(connection):
+    """Hand the replies to the commands waiting for them."""
+    while True:
+        for frame in await connection.frame_reader.read_frames():
+            data = encoding_tools.decode(frame)
+            reply_future = connection.pending_replies.get(data["id"])
+            if reply_future is not None and not reply_future.done():
+                reply_future.set_result(data)
+
+
+async def run_burst(port, coalesce, num_targets, interval, latency):
+    """Send a burst of moveAz commands and return the number of commands
+    sent and the time from sending the last target until it got accepted.
+    """
+    log = logging.getLogger("benchmark")
+    connection = ControllerConnection("benchmark", log)
+    await connection.connect(host="127.0.0.1", port=port, timeout=TIMEOUT)
+    connection.read_loop_task = asyncio.create_task(read_loop(connection))
+    num_sent = 0
+
+    async def send_command(command, **params):
+        nonlocal num_sent
+        num_sent += 1
+        reply = await connection.send_command(command, params, timeout=TIMEOUT)
+        # Emulate a controller that is slow to handle motion commands.
+        await asyncio.sleep(latency)
+        return reply
+
+    coalescer = CommandCoalescer("az", send_command, log)
+    lock = asyncio.Lock()
+
+    async def move_az(position):
+        if coalesce:
+            await coalescer.send("moveAz", position=position, velocity=0.0)
+        else:
+            async with lock:
+                await send_command("moveAz", position=position, velocity=0.0)
+
+    tasks = []
+    for i in range(num_targets):
+        tasks.append(asyncio.create_task(move_az(0.001 * i)))
+        await asyncio.sleep(interval)
+    last_target_time = time.monotonic() - interval
+    await asyncio.gather(*tasks, return_exceptions=True)
+    duration = time.monotonic() - last_target_time
+    await connection.disconnect(timeout=TIMEOUT)
+    return num_sent, duration
+
+
+async def main(num_targets, interval, latency):
+    encoding_tools.set_validation_policy(encoding_tools.ValidationPolicy.OFF)
+    mock_ctrl = MockMTDomeController(port=0)
+    await mock_ctrl.start()
+    print(
+        f"{num_targets} targets every {interval * 1000:.0f} ms with a controller "
+        f"latency of {latency * 1000:.0f} ms"
+    )
+    print(f"{'mode':<12} {'commands sent':>14} {'last target after [ms]':>23}")
+    for coalesce in (False, True):
+        num_sent, duration = await run_burst(
+            mock_ctrl.port, coalesce, num_targets, interval, latency
+        )
+        mode = "coalescing" if coalesce else "in order"
+        print(f"{mode:<12} {num_sent:>14} {duration * 1000:>23.0f}")
+    # Give the mock controller the time to notice that the clients are gone.
+    while mock_ctrl.connections:
+        await asyncio.sleep(0.01)
+    await mock_ctrl.stop()
+
+
+if __name__ == "__main__":
+    num_targets = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    interval = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.005
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.02
+    asyncio.run(main(num_targets, interval, latency))
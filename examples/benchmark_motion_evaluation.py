@@ -0,0 +1,87 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Benchmark of evaluating the mock motion models for many TAI times.
+
+The positions, velocities and motion states of an azimuth move followed by a
+crawl are computed for an array of TAI times at once and one TAI time at a
+time, like the mock controller does for each status command.
+
+Run with::
+
+    python examples/benchmark_motion_evaluation.py [num]
+
+with the number of TAI times.
+"""
+
+import math
+import sys
+import timeit
+
+import numpy as np
+
+from lsst.ts.MTDome import AmcsLimits
+from lsst.ts.MTDome.mock_llc.mock_motion import AzimuthMotion
+from lsst.ts.idl.enums.MTDome import MotionState
+
+START_TAI = 10001.0
+DURATION = 600.0
+NUM_SCALAR_TAIS = 1000
+
+
+def main(num_tais):
+    azimuth_motion = AzimuthMotion(
+        start_position=math.radians(350), max_speed=AmcsLimits().vmax, start_tai=0
+    )
+    azimuth_motion.set_target_position_and_velocity(
+        start_tai=START_TAI,
+        end_position=math.radians(90),
+        crawl_velocity=math.radians(0.01),
+        motion_state=MotionState.MOVING,
+    )
+    tai = np.linspace(START_TAI, START_TAI + DURATION, num_tais)
+    num_scalar = min(num_tais, NUM_SCALAR_TAIS)
+    scalar_tai = tai[:: num_tais // num_scalar][:num_scalar]
+
+    def batch():
+        return azimuth_motion.get_positions_velocities_and_motion_states(tai)
+
+    def scalar():
+        return [
+            azimuth_motion.get_position_velocity_and_motion_state(tai_i)
+            for tai_i in scalar_tai
+        ]
+
+    batch_time = min(timeit.repeat(batch, number=1, repeat=20))
+    scalar_time = min(timeit.repeat(scalar, number=1, repeat=3))
+    print(f"{'method':<8} {'TAI times':>10} {'time [ms]':>10} {'per TAI [us]':>13}")
+    for method, num, duration in (
+        ("batch", num_tais, batch_time),
+        ("scalar", num_scalar, scalar_time),
+    ):
+        print(
+            f"{method:<8} {num:>10} {duration * 1000:>10.2f} "
+            f"{duration / num * 1e6:>13.3f}"
+        )
+
+
+if __name__ == "__main__":
+    num_tais = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    main(num_tais)
@@ -0,0 +1,134 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Benchmark of the slew planner.
+
+The durations of the slews from one start position to many candidate targets
+are computed with the vectorized slew planner and, for a subset of the
+candidates, one at a time with the motion classes of the mock controller, as
+the durations returned by the moveAz and moveEl commands would be.
+
+Run with::
+
+    python examples/benchmark_slew_planner.py [num]
+
+with the number of candidates.
+"""
+
+import math
+import sys
+import timeit
+
+import numpy as np
+
+from lsst.ts.MTDome import AmcsLimits, LwscsLimits, slew_durations
+from lsst.ts.MTDome.mock_llc.mock_motion import AzimuthMotion, ElevationMotion
+from lsst.ts.idl.enums.MTDome import MotionState
+
+START_TAI = 10001.0
+NUM_SCALAR_CANDIDATES = 1000
+
+
+def scalar_slew_durations(
+    start_azimuth, target_azimuth, start_elevation, target_elevation
+):
+    """Compute the slew durations one at a time with the motion classes."""
+    amcs_limits = AmcsLimits()
+    lwscs_limits = LwscsLimits()
+    durations = []
+    for azimuth, elevation in zip(target_azimuth, target_elevation):
+        azimuth_motion = AzimuthMotion(
+            start_position=start_azimuth,
+            max_speed=amcs_limits.vmax,
+            start_tai=START_TAI,
+            max_acceleration=amcs_limits.amax,
+            max_jerk=amcs_limits.jmax,
+        )
+        elevation_motion = ElevationMotion(
+            start_position=start_elevation,
+            min_position=0,
+            max_position=math.pi,
+            max_speed=lwscs_limits.vmax,
+            start_tai=START_TAI,
+            max_acceleration=lwscs_limits.amax,
+            max_jerk=lwscs_limits.jmax,
+        )
+        durations.append(
+            max(
+                azimuth_motion.set_target_position_and_velocity(
+                    START_TAI, azimuth, 0, MotionState.MOVING
+                ),
+                elevation_motion.set_target_position_and_velocity(
+                    START_TAI, elevation, 0, MotionState.MOVING
+                ),
+            )
+        )
+    return durations
+
+
+def main(num_candidates):
+    rng = np.random.default_rng(seed=42)
+    target_azimuth = rng.uniform(0, 2 * math.pi, num_candidates)
+    target_elevation = rng.uniform(0, math.pi / 2, num_candidates)
+    start_azimuth = math.radians(350)
+    start_elevation = math.radians(45)
+    amcs_limits = AmcsLimits()
+    lwscs_limits = LwscsLimits()
+
+    def vectorized():
+        return slew_durations(
+            start_azimuth,
+            target_azimuth,
+            start_elevation,
+            target_elevation,
+            amcs_limits,
+            lwscs_limits,
+        )
+
+    num_scalar = min(num_candidates, NUM_SCALAR_CANDIDATES)
+
+    def scalar():
+        return scalar_slew_durations(
+            start_azimuth,
+            target_azimuth[:num_scalar],
+            start_elevation,
+            target_elevation[:num_scalar],
+        )
+
+    np.testing.assert_allclose(vectorized()[:num_scalar], scalar())
+    num_runs = 20
+    vectorized_time = min(timeit.repeat(vectorized, number=1, repeat=num_runs))
+    scalar_time = min(timeit.repeat(scalar, number=1, repeat=3))
+    print(
+        f"{'method':<12} {'candidates':>10} {'time [ms]':>10} {'per candidate [us]':>19}"
+    )
+    for method, num, duration in (
+        ("vectorized", num_candidates, vectorized_time),
+        ("scalar", num_scalar, scalar_time),
+    ):
+        print(
+            f"{method:<12} {num:>10} {duration * 1000:>10.2f} "
+            f"{duration / num * 1e6:>19.3f}"
+        )
+
+
+if __name__ == "__main__":
+    num_candidates = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    main(num_candidates)
@@ -0,0 +1,86 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Microbenchmark of the wire formats for the status replies.
+
+For each supported wire format it reports the size of the frames and the time
+needed to encode them and to decode them again, without validation.
+
+Run with::
+
+    python examples/benchmark_wire_format.py
+"""
+
+import asyncio
+import timeit
+
+from lsst.ts.MTDome import encoding_tools
+from lsst.ts.MTDome import mock_llc
+from lsst.ts.MTDome.llc_name import LlcName
+
+NUM_ITERATIONS = 10000
+
+
+async def get_replies():
+    """Get a representative set of status replies."""
+    amcs = mock_llc.AmcsStatus(start_tai=0)
+    await amcs.determine_status(current_tai=0)
+    lcs = mock_llc.LcsStatus()
+    await lcs.determine_status(current_tai=0)
+    return {
+        "AMCS status": {"response": 0, "id": 3, LlcName.AMCS.value: amcs.llc_status},
+        "LCS status": {"response": 0, "id": 4, LlcName.LCS.value: lcs.llc_status},
+    }
+
+
+def main():
+    encoding_tools.set_validation_policy(encoding_tools.ValidationPolicy.OFF)
+    replies = asyncio.run(get_replies())
+    print(
+        f"{'reply':<14} {'format':<8} {'size [B]':>9} "
+        f"{'encode [us]':>12} {'decode [us]':>12}"
+    )
+    buffer = bytearray()
+    for name, data in replies.items():
+        for wire_format in encoding_tools.get_supported_wire_formats():
+            encode_into = encoding_tools.frame_encoders[wire_format]
+            frame = bytes(encode_into(buffer, **data))
+            # Strip the terminator or the length prefix.
+            if wire_format == encoding_tools.WireFormat.JSON:
+                payload = frame[: -len(encoding_tools.TERMINATOR)]
+            else:
+                payload = frame[4:]
+            encode_time = timeit.timeit(
+                lambda: encode_into(buffer, **data), number=NUM_ITERATIONS
+            )
+            decode_time = timeit.timeit(
+                lambda: encoding_tools.decode(payload, wire_format),
+                number=NUM_ITERATIONS,
+            )
+            print(
+                f"{name:<14} {wire_format.value:<8} {len(frame):9d} "
+                f"{encode_time / NUM_ITERATIONS * 1e6:12.1f} "
+                f"{decode_time / NUM_ITERATIONS * 1e6:12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Load test of the mock controller with several clients.
+
+Each client sends status commands, waiting for the reply to each command
+before sending the next one, and the number of commands per second handled by
+the mock controller is reported together with the statistics of each
+connection.
+
+Run with::
+
+    python examples/load_test_mock_controller.py [num_clients] [num_commands]
+"""
+
+import asyncio
+import sys
+import time
+
+from lsst.ts.MTDome import encoding_tools
+from lsst.ts.MTDome import MockMTDomeController
+
+
+async def run_client(port, num_commands):
+    """Connect to the mock controller and send status commands."""
+    reader, writer = await asyncio.open_connection(host="127.0.0.1", port=port)
+    frame_reader = encoding_tools.FrameReader(reader)
+    buffer = bytearray()
+    for command_id in range(num_commands):
+        writer.write(
+            encoding_tools.encode_into(
+                buffer, command="statusAMCS", id=command_id, parameters={}
+            )
+        )
+        await writer.drain()
+        await frame_reader.read_frames()
+    return writer
+
+
+async def main(num_clients, num_commands):
+    encoding_tools.set_validation_policy(encoding_tools.ValidationPolicy.OFF)
+    mock_ctrl = MockMTDomeController(port=0)
+    await mock_ctrl.start()
+    start_time = time.monotonic()
+    writers = await asyncio.gather(
+        *[run_client(mock_ctrl.port, num_commands) for i in range(num_clients)]
+    )
+    duration = time.monotonic() - start_time
+    print(
+        f"{num_clients} clients sent {num_clients * num_commands} commands in "
+        f"{duration:.2f} s: {num_clients * num_commands / duration:.0f} commands/s"
+    )
+    for statistics in mock_ctrl.get_statistics():
+        print(statistics)
+    for writer in writers:
+        writer.close()
+    # Give the mock controller the time to notice that the clients are gone.
+    while mock_ctrl.connections:
+        await asyncio.sleep(0.01)
+    await mock_ctrl.stop()
+
+
+if __name__ == "__main__":
+    num_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    num_commands = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    asyncio.run(main(num_clients, num_commands))
@@ -20,11 +20,17 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from .mtdome_csc import *
+from .azimuth_tracker import *
+from .command_coalescer import *
+from .controller_connection import *
 from .llc_configuration_limits import *
 from .mock_controller import *
 from .mock_llc import *
+from .motion_operation import *
 from .on_off import OnOff
 from .response_code import ResponseCode
+from .slew_planner import *
+from .status_scheduler import *
 
 try:
     from .version import *
@@ -0,0 +1,387 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["AzimuthTrajectory", "AzimuthTracker"]
+
+import bisect
+import math
+
+from lsst.ts import salobj
+from .slew_planner import move_durations
+
+
+class AzimuthTrajectory:
+    """A predicted azimuth trajectory of the telescope.
+
+    Use `from_samples` or `from_polynomial` to construct a trajectory.
+
+    Parameters
+    ----------
+    tai: `list` [`float`]
+        The TAI times, unix seconds, of the samples, in increasing order.
+    position: `list` [`float`]
+        The azimuth (deg) at each sample, unwrapped so consecutive samples
+        differ by less than 180 degrees.
+    velocity: `list` [`float`]
+        The azimuth velocity (deg/s) at each sample.
+    coefficients: `list` [`float`]
+        The coefficients of the polynomial, starting with the constant term,
+        or None if the trajectory consists of samples.
+    """
+
+    def __init__(self, tai, position, velocity, coefficients=None):
+        self.tai = tai
+        self.position = position
+        self.velocity = velocity
+        self.coefficients = coefficients
+
+    @classmethod
+    def from_samples(cls, tai, position, velocity):
+        """Make a trajectory that goes through samples of the position and
+        velocity.
+
+        The position between two samples is interpolated with the cubic
+        polynomial that matches the position and velocity of both samples.
+        Before the first and after the last sample the position is
+        extrapolated with the velocity of that sample.
+
+        Parameters
+        ----------
+        tai: `list` [`float`]
+            The TAI times, unix seconds, of the samples, in increasing order.
+        position: `list` [`float`]
+            The azimuth (deg) at each sample. The azimuth may wrap around
+            between samples.
+        velocity: `list` [`float`]
+            The azimuth velocity (deg/s) at each sample.
+
+        Raises
+        ------
+        ValueError
+            If there are no samples, if the lengths of the lists differ or if
+            the times are not increasing.
+        """
+        if not len(tai) == len(position) == len(velocity):
+            raise ValueError(
+                f"The lengths {len(tai)}, {len(position)} and {len(velocity)} "
+                "of tai, position and velocity differ."
+            )
+        if len(tai) == 0:
+            raise ValueError("A trajectory needs at least one sample.")
+        if any(tai1 <= tai0 for tai0, tai1 in zip(tai[:-1], tai[1:])):
+            raise ValueError("The sample times are not increasing.")
+        unwrapped_position = [float(position[0])]
+        for value in position[1:]:
+            unwrapped_position.append(
+                unwrapped_position[-1]
+                + salobj.angle_diff(value, unwrapped_position[-1]).deg
+            )
+        return cls(
+            tai=[float(value) for value in tai],
+            position=unwrapped_position,
+            velocity=[float(value) for value in velocity],
+        )
+
+    @classmethod
+    def from_polynomial(cls, reference_tai, coefficients):
+        """Make a trajectory that follows a polynomial in time.
+
+        Parameters
+        ----------
+        reference_tai: `float`
+            The TAI time, unix seconds, at which the time in the polynomial is
+            0.
+        coefficients: `list` [`float`]
+            The coefficients of the polynomial, starting with the constant
+            term, in deg, deg/s, deg/s^2 etc.
+
+        Raises
+        ------
+        ValueError
+            If there are no coefficients.
+        """
+        if len(coefficients) == 0:
+            raise ValueError("A polynomial needs at least one coefficient.")
+        return cls(
+            tai=[float(reference_tai)],
+            position=[],
+            velocity=[],
+            coefficients=[float(value) for value in coefficients],
+        )
+
+    def evaluate(self, tai):
+        """Compute the position and velocity at a time.
+
+        Parameters
+        ----------
+        tai: `float`
+            The TAI time, unix seconds.
+
+        Returns
+        -------
+        position: `float`
+            The azimuth (deg), in the range [0, 360).
+        velocity: `float`
+            The azimuth velocity (deg/s).
+        """
+        if self.coefficients is not None:
+            dt = tai - self.tai[0]
+            position = 0.0
+            velocity = 0.0
+            # Horner's scheme for the polynomial and its derivative.
+            for coefficient in reversed(self.coefficients):
+                velocity = velocity * dt + position
+                position = position * dt + coefficient
+        else:
+            index = bisect.bisect_right(self.tai, tai) - 1
+            if index < 0 or index == len(self.tai) - 1:
+                index = max(index, 0)
+                velocity = self.velocity[index]
+                position = self.position[index] + velocity * (tai - self.tai[index])
+            else:
+                position, velocity = self._interpolate(index, tai)
+        return salobj.angle_wrap_nonnegative(position).deg, velocity
+
+    def _interpolate(self, index, tai):
+        """Interpolate between two samples with a cubic Hermite polynomial.
+
+        Parameters
+        ----------
+        index: `int`
+            The index of the sample before ``tai``.
+        tai: `float`
+            The TAI time, unix seconds.
+
+        Returns
+        -------
+        position: `float`
+            The unwrapped azimuth (deg).
+        velocity: `float`
+            The azimuth velocity (deg/s).
+        """
+        duration = self.tai[index + 1] - self.tai[index]
+        t = (tai - self.tai[index]) / duration
+        p0, p1 = self.position[index], self.position[index + 1]
+        m0 = self.velocity[index] * duration
+        m1 = self.velocity[index + 1] * duration
+        position = (
+            (2 * t ** 3 - 3 * t ** 2 + 1) * p0
+            + (t ** 3 - 2 * t ** 2 + t) * m0
+            + (-2 * t ** 3 + 3 * t ** 2) * p1
+            + (t ** 3 - t ** 2) * m1
+        )
+        velocity = (
+            (6 * t ** 2 - 6 * t) * p0
+            + (3 * t ** 2 - 4 * t + 1) * m0
+            + (-6 * t ** 2 + 6 * t) * p1
+            + (3 * t ** 2 - 2 * t) * m1
+        ) / duration
+        return position, velocity
+
+
+class AzimuthTracker:
+    """Compute the azimuth commands that keep the dome aligned with an
+    azimuth trajectory of the telescope.
+
+    Each measurement of the dome azimuth is compared with the trajectory. If
+    the dome is off by more than ``tolerance``, a correction move is
+    commanded to the position at which the dome, moving within its speed,
+    acceleration and jerk limits, catches up with the trajectory, after which
+    it crawls at the velocity of the trajectory. Otherwise a new crawl
+    velocity is commanded only if
+    crawling at the current velocity would make the dome deviate by more than
+    half the tolerance within ``horizon`` seconds. The new crawl velocity
+    brings the dome to the position of the trajectory ``horizon`` seconds
+    ahead. This sends far fewer commands than moving the dome for each
+    update of the telescope position.
+
+    Parameters
+    ----------
+    trajectory: `AzimuthTrajectory`
+        The trajectory to follow.
+    max_speed: `float`
+        The maximum speed (deg/s) of the dome.
+    tolerance: `float`
+        The maximum allowed difference (deg) between the dome azimuth and the
+        trajectory.
+    horizon: `float`
+        The time (sec) ahead for which the crawl velocity is planned.
+    max_acceleration: `float` or None
+        The maximum acceleration (deg/s^2) of the dome, or None if the dome
+        moves at maximum speed all the way.
+    max_jerk: `float` or None
+        The maximum jerk (deg/s^3) of the dome, or None if the dome moves at
+        maximum speed all the way.
+    """
+
+    def __init__(
+        self,
+        trajectory,
+        max_speed,
+        tolerance,
+        horizon,
+        max_acceleration=None,
+        max_jerk=None,
+    ):
+        self.trajectory = trajectory
+        self.max_speed = max_speed
+        self.max_acceleration = max_acceleration
+        self.max_jerk = max_jerk
+        self.tolerance = tolerance
+        self.horizon = horizon
+        # The TAI time, unix seconds, of the last command and the TAI time
+        # at which the last correction move is expected to end, see
+        # `set_move_duration`.
+        self.command_tai = -math.inf
+        self.move_end_tai = -math.inf
+        self.num_updates = 0
+        self.num_moves = 0
+        self.num_crawls = 0
+        # The maximum difference (deg) between the dome azimuth and the
+        # trajectory, outside the correction moves.
+        self.max_error = 0.0
+
+    def update(self, tai, position, velocity):
+        """Compare a measurement of the dome azimuth with the trajectory and
+        determine the command to send, if any.
+
+        Parameters
+        ----------
+        tai: `float`
+            The TAI time, unix seconds, of the measurement.
+        position: `float`
+            The measured azimuth (deg).
+        velocity: `float`
+            The measured azimuth velocity (deg/s).
+
+        Returns
+        -------
+        command: `tuple` or None
+            None if no command needs to be sent or a tuple of the command,
+            either "moveAz" or "crawlAz", and a `dict` with its parameters:
+            the position (deg) and/or the velocity (deg/s).
+        """
+        self.num_updates += 1
+        if tai < self.move_end_tai:
+            # A correction move is in progress.
+            return None
+        target_position, _ = self.trajectory.evaluate(tai)
+        error = salobj.angle_diff(target_position, position).deg
+        if math.fabs(error) > self.tolerance:
+            return self._move(tai, position)
+        self.max_error = max(self.max_error, math.fabs(error))
+
+        horizon_position, _ = self.trajectory.evaluate(tai + self.horizon)
+        horizon_error = salobj.angle_diff(
+            horizon_position, position + velocity * self.horizon
+        ).deg
+        if math.fabs(horizon_error) <= self.tolerance / 2:
+            return None
+        crawl_velocity = (
+            salobj.angle_diff(horizon_position, position).deg / self.horizon
+        )
+        self.command_tai = tai
+        self.num_crawls += 1
+        return "crawlAz", dict(velocity=self._clip_velocity(crawl_velocity))
+
+    def _move(self, tai, position):
+        """Determine the correction move to catch up with the trajectory.
+
+        Parameters
+        ----------
+        tai: `float`
+            The TAI time, unix seconds, of the measurement.
+        position: `float`
+            The measured azimuth (deg).
+
+        Returns
+        -------
+        command: `tuple`
+            "moveAz" and a `dict` with the position (deg) and velocity (deg/s)
+            to move to.
+        """
+        # Iterate to the time at which the dome reaches the position of the
+        # trajectory at that time.
+        duration = 0.0
+        for _ in range(3):
+            end_position, end_velocity = self.trajectory.evaluate(tai + duration)
+            distance = salobj.angle_diff(end_position, position).deg
+            duration = float(
+                move_durations(
+                    distance, self.max_speed, self.max_acceleration, self.max_jerk
+                )
+            )
+        end_position, end_velocity = self.trajectory.evaluate(tai + duration)
+        self.command_tai = tai
+        self.move_end_tai = tai + duration
+        self.num_moves += 1
+        return (
+            "moveAz",
+            dict(position=end_position, velocity=self._clip_velocity(end_velocity)),
+        )
+
+    def set_move_duration(self, duration):
+        """Set the duration of the last correction move, as returned by the
+        controller.
+
+        This is more accurate than the duration estimated by `update`, which
+        assumes that the move starts and ends at standstill. No other command
+        is computed until the move has ended.
+
+        Parameters
+        ----------
+        duration: `float`
+            The duration (sec) of the move.
+        """
+        self.move_end_tai = self.command_tai + duration
+
+    def _clip_velocity(self, velocity):
+        """Limit a velocity to the maximum speed.
+
+        Parameters
+        ----------
+        velocity: `float`
+            The velocity (deg/s).
+
+        Returns
+        -------
+        velocity: `float`
+            The velocity (deg/s), limited to [-max_speed, max_speed].
+        """
+        return min(max(velocity, -self.max_speed), self.max_speed)
+
+    def get_statistics(self):
+        """Get the statistics of the tracking.
+
+        Returns
+        -------
+        statistics: `dict`
+            The number of measurements that were handled, the number of
+            correction moves and crawl commands that were computed and the
+            maximum difference (deg) between the dome azimuth and the
+            trajectory outside the correction moves.
+        """
+        return dict(
+            num_updates=self.num_updates,
+            num_moves=self.num_moves,
+            num_crawls=self.num_crawls,
+            max_error=self.max_error,
+        )
@@ -0,0 +1,144 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["CommandCoalescer"]
+
+import asyncio
+
+from lsst.ts import salobj
+
+
+class CommandCoalescer:
+    """Send the commands for one axis one at a time, with the latest command
+    replacing a command that still is waiting to be sent.
+
+    At most one command is sent at a time. A command that is sent while
+    another one is being sent waits, and if yet another command is sent
+    before it gets its turn, it is superseded by that command. The call that
+    sent a superseded command raises `asyncio.CancelledError`, so only the
+    latest command reaches the controller.
+
+    Parameters
+    ----------
+    name: `str`
+        The name of the axis, used in log messages and statistics.
+    send_command: coro
+        The coroutine function that sends a command and returns the reply. It
+        is called with the command as ``command`` keyword argument and the
+        parameters of the command as other keyword arguments.
+    log: `logging.Logger`
+        The logger to use.
+    """
+
+    def __init__(self, name, send_command, log):
+        self.name = name
+        self.send_command = send_command
+        self.log = log
+        # The (command, parameters, future) of the command that waits to be
+        # sent, or None. The future gets the reply to the command.
+        self.pending = None
+        self.send_task = salobj.make_done_future()
+        self.num_sent = 0
+        self.num_superseded = 0
+
+    async def send(self, command, **params):
+        """Send a command once the command being sent, if any, got its reply,
+        unless a newer command supersedes it before that.
+
+        Parameters
+        ----------
+        command: `str`
+            The command to send.
+        **params:
+            The parameters for the command. This may be empty.
+
+        Returns
+        -------
+        data: `dict`
+            The reply.
+
+        Raises
+        ------
+        asyncio.CancelledError
+            If the command was superseded by a newer command or discarded by
+            `discard_pending`.
+        """
+        future = asyncio.get_running_loop().create_future()
+        if self.discard_pending():
+            self.num_superseded += 1
+            self.log.info(
+                f"The pending {self.name} command was superseded by {command} "
+                f"{params}."
+            )
+        self.pending = (command, params, future)
+        if self.send_task.done():
+            self.send_task = asyncio.create_task(self.send_loop())
+        return await future
+
+    def discard_pending(self):
+        """Discard the command that waits to be sent, if any.
+
+        The call that sent the discarded command raises
+        `asyncio.CancelledError`.
+
+        Returns
+        -------
+        discarded: `bool`
+            True if a command was discarded.
+        """
+        if self.pending is None:
+            return False
+        _, _, future = self.pending
+        self.pending = None
+        future.cancel()
+        return True
+
+    async def send_loop(self):
+        """Send the pending commands one at a time."""
+        while self.pending is not None:
+            command, params, future = self.pending
+            self.pending = None
+            if future.done():
+                # The sender of the command gave up waiting.
+                continue
+            self.num_sent += 1
+            try:
+                reply = await self.send_command(command=command, **params)
+            except asyncio.CancelledError:
+                future.cancel()
+                self.discard_pending()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(reply)
+
+    def get_statistics(self):
+        """Get the statistics of the commands.
+
+        Returns
+        -------
+        statistics: `dict`
+            The number of commands that were sent and that were superseded.
+        """
+        return dict(num_sent=self.num_sent, num_superseded=self.num_superseded)
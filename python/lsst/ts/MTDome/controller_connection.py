@@ -0,0 +1,281 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["ControllerConnection", "HIGH_PRIORITY", "NORMAL_PRIORITY"]
+
+import asyncio
+import itertools
+
+from lsst.ts import salobj
+from lsst.ts.MTDome import encoding_tools
+
+# The priorities with which commands get written. Commands with a lower value
+# are written first.
+HIGH_PRIORITY = 0
+NORMAL_PRIORITY = 1
+
+
+class ControllerConnection:
+    """A TCP/IP connection to the dome controller.
+
+    The commands are written by a write loop in order of priority, so a
+    command with a high priority jumps ahead of the commands with a normal
+    priority that are still waiting to be written. Reading the replies is up
+    to the owner of the connection, which hands each reply to the command
+    waiting for it with `pop_reply_future`.
+
+    Parameters
+    ----------
+    name: `str`
+        The name of the connection, used in log messages.
+    log: `logging.Logger`
+        The logger to use.
+    """
+
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+        self.reader = None
+        self.writer = None
+        # The reader of the frames sent by the controller, created when
+        # connecting.
+        self.frame_reader = None
+        # Futures for the replies to the commands that were sent, by command
+        # id.
+        self.pending_replies = {}
+        # The ids of the commands that were written and of which the reply
+        # hasn't been read yet, in the order of writing. The values are
+        # unused.
+        self.written_command_ids = {}
+        self.command_id_iter = itertools.count(1)
+        # Buffer to encode the commands into, which is reused for every
+        # command.
+        self.write_buffer = bytearray()
+        # Queue of (priority, command id, command, future) of the commands to
+        # write, created when connecting. The future is done when the command
+        # has been written.
+        self.write_queue = None
+        self.write_loop_task = salobj.make_done_future()
+        # The task reading the replies, which is set by the owner of the
+        # connection.
+        self.read_loop_task = salobj.make_done_future()
+
+    @property
+    def connected(self):
+        return None not in (self.reader, self.writer)
+
+    async def connect(self, host, port, timeout):
+        """Connect to the controller and start writing commands.
+
+        Parameters
+        ----------
+        host: `str`
+            The host of the controller.
+        port: `int`
+            The port of the controller.
+        timeout: `float`
+            Time limit for connecting (sec).
+        """
+        connect_coro = asyncio.open_connection(host=host, port=port)
+        self.reader, self.writer = await asyncio.wait_for(connect_coro, timeout=timeout)
+        self.frame_reader = encoding_tools.FrameReader(self.reader)
+        self.write_queue = asyncio.PriorityQueue()
+        self.write_loop_task = asyncio.create_task(self.write_loop())
+        self.log.info(f"Opened the {self.name} connection.")
+
+    async def disconnect(self, timeout):
+        """Stop reading and writing and close the connection.
+
+        Parameters
+        ----------
+        timeout: `float`
+            Time limit for writing the commands that already were written to
+            the stream (sec).
+        """
+        self.write_loop_task.cancel()
+        self.read_loop_task.cancel()
+        self.fail_pending_replies()
+        writer = self.writer
+        self.reader = None
+        self.writer = None
+        if writer:
+            try:
+                writer.write_eof()
+                await asyncio.wait_for(writer.drain(), timeout=timeout)
+            finally:
+                writer.close()
+
+    async def send_command(self, command, params, timeout, priority=NORMAL_PRIORITY):
+        """Write a command and wait for its reply.
+
+        The command gets a unique id which the controller echoes in the reply.
+
+        Parameters
+        ----------
+        command: `str`
+            The command to write.
+        params: `dict`
+            The parameters for the command. This may be empty.
+        timeout: `float`
+            Time limit for reading the reply after writing the command (sec).
+        priority: `int`
+            The priority of the command, either `HIGH_PRIORITY` or
+            `NORMAL_PRIORITY`.
+
+        Returns
+        -------
+        data: `dict`
+            The reply.
+
+        Raises
+        ------
+        ConnectionError
+            If not connected.
+        """
+        if not self.connected:
+            raise ConnectionError(f"The {self.name} connection is not open.")
+        command_id = next(self.command_id_iter)
+        command_dict = dict(command=command, id=command_id, parameters=params)
+        loop = asyncio.get_running_loop()
+        reply_future = loop.create_future()
+        written_future = loop.create_future()
+        self.pending_replies[command_id] = reply_future
+        try:
+            await self.write_queue.put(
+                (priority, command_id, command_dict, written_future)
+            )
+            await written_future
+            return await asyncio.wait_for(reply_future, timeout=timeout)
+        finally:
+            self.pending_replies.pop(command_id, None)
+            self.written_command_ids.pop(command_id, None)
+
+    async def write_loop(self):
+        """Write the queued commands in order of priority."""
+        written_future = None
+        try:
+            while True:
+                (
+                    _,
+                    command_id,
+                    command_dict,
+                    written_future,
+                ) = await self.write_queue.get()
+                if written_future.done():
+                    # The sender of the command gave up waiting.
+                    continue
+                try:
+                    self.log.debug(
+                        f"Sending command {command_dict} on the {self.name} connection"
+                    )
+                    self.writer.write(
+                        encoding_tools.encode_into(self.write_buffer, **command_dict)
+                    )
+                    self.written_command_ids[command_id] = None
+                    if self.writer.transport.get_write_buffer_size() > 0:
+                        # The transport may hold on to the buffer until it has
+                        # been sent so don't reuse it.
+                        self.write_buffer = bytearray()
+                    await self.writer.drain()
+                except Exception as e:
+                    if not written_future.done():
+                        written_future.set_exception(e)
+                else:
+                    if not written_future.done():
+                        written_future.set_result(None)
+        finally:
+            written_futures = [written_future]
+            while self.write_queue.qsize() > 0:
+                written_futures.append(self.write_queue.get_nowait()[-1])
+            for written_future in written_futures:
+                if written_future is not None and not written_future.done():
+                    written_future.set_exception(
+                        ConnectionError(f"The {self.name} connection was closed.")
+                    )
+
+    def discard_queued_commands(self, commands):
+        """Discard the queued commands that haven't been written yet, for
+        instance the motion commands of an axis that is commanded to stop.
+
+        The calls that sent the discarded commands raise
+        `asyncio.CancelledError`.
+
+        Parameters
+        ----------
+        commands: `set` [`str`]
+            The names of the commands to discard.
+
+        Returns
+        -------
+        discarded: `list` [`str`]
+            The names of the discarded commands, in order of writing.
+        """
+        if self.write_queue is None:
+            return []
+        queued = []
+        while self.write_queue.qsize() > 0:
+            queued.append(self.write_queue.get_nowait())
+        discarded = []
+        for item in queued:
+            _, _, command_dict, written_future = item
+            if command_dict["command"] in commands and not written_future.done():
+                written_future.cancel()
+                discarded.append(command_dict["command"])
+            else:
+                self.write_queue.put_nowait(item)
+        return discarded
+
+    def pop_reply_future(self, command_id):
+        """Get the future for the reply to a command and stop waiting for
+        another reply to it.
+
+        A reply without a command id is the reply to the oldest command that
+        was written and of which the reply hasn't been read yet, since the
+        controller replies in the order of receiving. That isn't necessarily
+        the oldest command sent, because commands with a high priority jump
+        ahead of the commands waiting to be written.
+
+        Parameters
+        ----------
+        command_id: `int` or None
+            The command id in the reply, or None if the reply has none.
+
+        Returns
+        -------
+        reply_future: `asyncio.Future` or None
+            The future for the reply, or None if no command is waiting for
+            it.
+        """
+        if command_id is None:
+            command_id = next(iter(self.written_command_ids), None)
+        self.written_command_ids.pop(command_id, None)
+        return self.pending_replies.pop(command_id, None)
+
+    def fail_pending_replies(self):
+        """Make all commands waiting for a reply fail because the connection
+        was lost."""
+        self.written_command_ids.clear()
+        while self.pending_replies:
+            _, reply_future = self.pending_replies.popitem()
+            if not reply_future.done():
+                reply_future.set_exception(
+                    ConnectionError(f"The {self.name} connection was lost.")
+                )
@@ -19,12 +19,24 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import asyncio
+import collections
+import concurrent.futures
+import enum
 import logging
 import json
 import os
+import random
+import struct
+import threading
 
 import jsonschema
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 # The directory in which this file resides for later reference.
 script_dir = os.path.dirname(__file__)
 
@@ -45,6 +57,80 @@ schemas = {
     "ThCS": _load_schema("thcs_status.jschema"),
 }
 
+# The keys of the status schemas, which are the names of the lower level
+# components.
+status_keys = ("AMCS", "ApSCS", "LCS", "LWSCS", "MonCS", "ThCS")
+_status_key_set = frozenset(status_keys)
+
+
+def _split_command_schema(command_schema):
+    """Split the command schema into one schema per command.
+
+    The command schema contains an if-then condition for each command. This
+    creates a schema for each command, with the properties of the command
+    schema combined with the properties of the then-clause of the command, so
+    validating a command doesn't require evaluating all the conditions.
+
+    Parameters
+    ----------
+    command_schema: `dict`
+        The command schema.
+
+    Returns
+    -------
+    command_schemas: `dict`
+        A dict with the command names as keys and their schemas as values.
+    """
+    command_schemas = {}
+    for condition in command_schema["allOf"]:
+        command = condition["if"]["properties"]["command"]["const"]
+        command_schemas[command] = {
+            "$schema": command_schema["$schema"],
+            "type": "object",
+            "properties": {
+                **command_schema["properties"],
+                **condition["then"]["properties"],
+            },
+        }
+    return command_schemas
+
+
+# dict to look up the schema of each command.
+command_schemas = _split_command_schema(schemas["command"])
+
+
+def _make_status_delta_schema(key):
+    """Make the schema for a status delta of a lower level component.
+
+    A status delta only contains the items of the status that changed, so it
+    is the status schema without the required items of the status.
+
+    Parameters
+    ----------
+    key: `str`
+        The name of the lower level component.
+
+    Returns
+    -------
+    schema: `dict`
+        The schema for the status delta.
+    """
+    status_schema = {**schemas[key]["properties"][key]}
+    status_schema.pop("required", None)
+    return {
+        **schemas[key],
+        "properties": {**schemas[key]["properties"], key: status_schema},
+    }
+
+
+# dict to look up the schema of the status deltas of each lower level
+# component.
+status_delta_schemas = {key: _make_status_delta_schema(key) for key in status_keys}
+
+# Cache of validators, by schema key. The validators are created when first
+# needed, see `get_validator`.
+_validators = {}
+
 # Logger
 log = logging.getLogger("EncodingTools")
 
@@ -52,6 +138,86 @@ log = logging.getLogger("EncodingTools")
 # set this to true.
 validation_raises_exception = False
 
+# The terminator of each message.
+TERMINATOR = b"\r\n"
+# The length prefix of the MessagePack frames: the length in bytes of the
+# payload as a big endian unsigned int.
+_LENGTH_PREFIX = struct.Struct(">I")
+
+
+class WireFormat(enum.Enum):
+    """Format of the frames exchanged with the lower level components.
+
+    * JSON: JSON text followed by the terminator. This is the default.
+    * MSGPACK: MessagePack, preceded by the length of the payload in bytes,
+      see `encode_msgpack_into`. Only available if msgpack is installed.
+    """
+
+    JSON = "json"
+    MSGPACK = "msgpack"
+
+
+def get_supported_wire_formats():
+    """Get the wire formats that are supported with the installed packages.
+
+    Returns
+    -------
+    wire_formats: `list` of `WireFormat`
+        The supported wire formats.
+    """
+    if msgpack is None:
+        return [WireFormat.JSON]
+    return [WireFormat.JSON, WireFormat.MSGPACK]
+
+
+class ValidationPolicy(enum.Enum):
+    """Policy for validating decoded messages.
+
+    * ALWAYS: validate every message before returning it.
+    * SAMPLE: validate a random sample of the messages in the background.
+    * FIRST_OF_EACH_SHAPE: validate, in the background, each message with a
+      structure (keys, value types and array lengths) not seen before.
+    * OFF: don't validate at all.
+    """
+
+    ALWAYS = "always"
+    SAMPLE = "sample"
+    FIRST_OF_EACH_SHAPE = "first_of_each_shape"
+    OFF = "off"
+
+
+# The validation policy, see `set_validation_policy`. Unit tests should leave
+# this to ALWAYS so validation_raises_exception works as expected.
+validation_policy = ValidationPolicy.ALWAYS
+# The percentage of messages to validate with the SAMPLE policy.
+validation_sample_percentage = 10.0
+# The number of validation failures, by schema key. Messages for which no
+# schema could be found are counted with key "unknown".
+validation_failures = collections.Counter()
+_validation_failures_lock = threading.Lock()
+# The shapes of the messages that have been validated with the
+# FIRST_OF_EACH_SHAPE policy.
+_validated_shapes = set()
+# Executor for validating messages in the background. It is created when
+# first needed.
+_validation_executor = None
+
+
+def set_validation_policy(policy, sample_percentage=10.0):
+    """Set the policy for validating decoded messages.
+
+    Parameters
+    ----------
+    policy: `ValidationPolicy`
+        The validation policy.
+    sample_percentage: `float`
+        The percentage of messages to validate with the SAMPLE policy.
+    """
+    global validation_policy, validation_sample_percentage
+    validation_policy = ValidationPolicy(policy)
+    validation_sample_percentage = sample_percentage
+    _validated_shapes.clear()
+
 
 def encode(**params):
     """Encode the given parameters.
@@ -76,24 +242,373 @@ def encode(**params):
     return json.dumps({**params})
 
 
-def decode(st):
+def encode_into(buffer, **params):
+    """Encode the given parameters into a frame, i.e. the encoded parameters
+    followed by the terminator, ready to be written.
+
+    The frame is written into the given buffer, which is cleared first, so
+    the same buffer can be reused for every message instead of allocating a
+    new one.
+
+    Parameters
+    ----------
+    buffer: `bytearray`
+        The buffer to encode the frame into.
+    **params:
+        Additional parameters to encode. This may be empty.
+
+    Returns
+    -------
+    buffer: `bytearray`
+        The buffer, which now contains the frame.
+    """
+    buffer.clear()
+    buffer += json.dumps(params).encode()
+    buffer += TERMINATOR
+    return buffer
+
+
+def encode_msgpack_into(buffer, **params):
+    """Encode the given parameters into a MessagePack frame, i.e. the length
+    of the payload followed by the payload, ready to be written.
+
+    The frame is written into the given buffer, which is cleared first. Floats
+    are encoded as float64 so no precision is lost compared to JSON.
+
+    Parameters
+    ----------
+    buffer: `bytearray`
+        The buffer to encode the frame into.
+    **params:
+        Additional parameters to encode. This may be empty.
+
+    Returns
+    -------
+    buffer: `bytearray`
+        The buffer, which now contains the frame.
+    """
+    payload = msgpack.packb(params, use_bin_type=True)
+    buffer.clear()
+    buffer += _LENGTH_PREFIX.pack(len(payload))
+    buffer += payload
+    return buffer
+
+
+# The functions to encode a frame with, by wire format.
+frame_encoders = {
+    WireFormat.JSON: encode_into,
+    WireFormat.MSGPACK: encode_msgpack_into,
+}
+
+
+def _loads(frame, wire_format):
+    """Load the data from a frame without validating it."""
+    if wire_format == WireFormat.MSGPACK:
+        return msgpack.unpackb(frame, raw=False)
+    return json.loads(frame)
+
+
+def decode(st, wire_format=WireFormat.JSON, validated_callback=None):
     """Decode the given string.
 
+    The decoded data is validated according to the `validation_policy`. Data
+    decoded from MessagePack are validated against the same schemas as JSON.
+
     Parameters
     ----------
-    st: `str`
-        The string to decode.
+    st: `str`, `bytes` or `bytearray`
+        The string to decode. A frame, as returned by `FrameReader`, can be
+        decoded without converting it to a string first.
+    wire_format: `WireFormat`
+        The format of the string. MessagePack frames need to be bytes.
+    validated_callback: callable or None
+        Function to call, without arguments, once the string has been
+        validated in the background, for instance to report the validation
+        failures. It is called from the validation thread. It is not called
+        if the string is validated right away or not at all.
 
     Returns
     -------
         A decoded Python representation of the string.
     """
-    data = json.loads(st)
-    validate(data)
+    data = _loads(st, wire_format)
+    future = None
+    if validation_policy == ValidationPolicy.ALWAYS:
+        validate(data)
+    elif validation_policy == ValidationPolicy.SAMPLE:
+        if random.random() * 100 < validation_sample_percentage:
+            future = _validate_in_background(st, wire_format)
+    elif validation_policy == ValidationPolicy.FIRST_OF_EACH_SHAPE:
+        shape = get_shape(data)
+        if shape not in _validated_shapes:
+            _validated_shapes.add(shape)
+            future = _validate_in_background(st, wire_format)
+    if future is not None and validated_callback is not None:
+        future.add_done_callback(lambda future: validated_callback())
     return data
 
 
-def validate(data):
+class FrameReader:
+    """Read frames, i.e. messages followed by the terminator, from a stream.
+
+    All data available on the stream is read at once, so a single read can
+    result in several frames.
+
+    Parameters
+    ----------
+    reader: `asyncio.StreamReader`
+        The stream reader to read from.
+    read_size: `int`
+        The maximum number of bytes to read at once.
+
+    Attributes
+    ----------
+    wire_format: `WireFormat`
+        The format of the frames to read. It may be changed between reads, for
+        instance after the wire format has been negotiated.
+    num_bytes_read: `int`
+        The number of bytes read from the stream.
+    """
+
+    def __init__(self, reader, read_size=2 ** 16):
+        self.reader = reader
+        self.read_size = read_size
+        self.wire_format = WireFormat.JSON
+        # The number of bytes read from the stream.
+        self.num_bytes_read = 0
+        # The data read that doesn't form a complete frame yet.
+        self._buffer = bytearray()
+
+    async def read_frames(self):
+        """Read one or more frames.
+
+        Returns
+        -------
+        frames: `list` of `bytes`
+            The frames read, without terminator or length prefix.
+
+        Raises
+        ------
+        asyncio.IncompleteReadError
+            If the end of the stream is reached before a complete frame has
+            been read.
+        """
+        frames = self._extract_frames()
+        while not frames:
+            data = await self.reader.read(self.read_size)
+            if not data:
+                partial = bytes(self._buffer)
+                self._buffer.clear()
+                raise asyncio.IncompleteReadError(partial, None)
+            self.num_bytes_read += len(data)
+            self._buffer += data
+            frames = self._extract_frames()
+        return frames
+
+    def _extract_frames(self):
+        """Extract all complete frames from the buffer.
+
+        Returns
+        -------
+        frames: `list` of `bytes`
+            The complete frames, without terminator or length prefix.
+        """
+        if self.wire_format == WireFormat.MSGPACK:
+            return self._extract_length_prefixed_frames()
+        frames = []
+        start = 0
+        with memoryview(self._buffer) as view:
+            end = self._buffer.find(TERMINATOR, start)
+            while end >= 0:
+                frames.append(view[start:end].tobytes())
+                start = end + len(TERMINATOR)
+                end = self._buffer.find(TERMINATOR, start)
+        if start > 0:
+            del self._buffer[:start]
+        return frames
+
+    def _extract_length_prefixed_frames(self):
+        """Extract all complete length prefixed frames from the buffer.
+
+        Returns
+        -------
+        frames: `list` of `bytes`
+            The complete frames, without length prefix.
+        """
+        frames = []
+        start = 0
+        with memoryview(self._buffer) as view:
+            while len(view) - start >= _LENGTH_PREFIX.size:
+                (length,) = _LENGTH_PREFIX.unpack_from(view, start)
+                payload_start = start + _LENGTH_PREFIX.size
+                end = payload_start + length
+                if end > len(view):
+                    break
+                frames.append(view[payload_start:end].tobytes())
+                start = end
+        if start > 0:
+            del self._buffer[:start]
+        return frames
+
+
+def get_shape(value):
+    """Get the shape of a decoded value.
+
+    The shape is a hashable representation of the structure of the value: the
+    keys of dicts, the lengths of arrays and the types of the values, but not
+    the values themselves. Only the values of the "command" key are part of
+    the shape, since they determine the schema to validate against.
+
+    Parameters
+    ----------
+    value: `dict`, `list` or scalar
+        The decoded value.
+
+    Returns
+    -------
+    shape: `tuple` or `str`
+        The shape of the value.
+    """
+    if isinstance(value, dict):
+        return tuple(
+            (k, v if k == "command" else get_shape(v)) for k, v in value.items()
+        )
+    elif isinstance(value, list):
+        return ("array", len(value), frozenset(get_shape(v) for v in value))
+    elif isinstance(value, bool):
+        return "boolean"
+    elif isinstance(value, (int, float)):
+        return "number"
+    return type(value).__name__
+
+
+def _validate_in_background(st, wire_format=WireFormat.JSON):
+    """Decode and validate the given string in a background thread.
+
+    The string rather than the decoded data is passed on so the caller is free
+    to modify the decoded data. Validation failures are counted in
+    `validation_failures` and logged but never raised.
+
+    Parameters
+    ----------
+    st: `str` or `bytes`
+        The string to validate.
+    wire_format: `WireFormat`
+        The format of the string.
+
+    Returns
+    -------
+    future: `concurrent.futures.Future`
+        The future of the validation.
+    """
+    global _validation_executor
+    if _validation_executor is None:
+        _validation_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="MTDomeValidation"
+        )
+    return _validation_executor.submit(_validate_string, st, wire_format)
+
+
+def _validate_string(st, wire_format):
+    """Decode and validate the given string, logging any exception."""
+    try:
+        validate(_loads(st, wire_format), raise_exception=False)
+    except Exception:
+        log.exception(f"Background validation of {st!r} failed.")
+
+
+def _count_validation_failure(key):
+    """Count a validation failure for the schema with the given key."""
+    with _validation_failures_lock:
+        validation_failures[key] += 1
+
+
+def get_validator(key):
+    """Get the validator for the schema with the given key.
+
+    The validator is created and the schema itself checked the first time it
+    is needed. After that the cached validator is returned.
+
+    Parameters
+    ----------
+    key: `str` or `tuple`
+        The key of the schema in `schemas`, ("command", command name) for
+        the schema of a command in `command_schemas` or ("delta", lower level
+        component name) for the schema of a status delta in
+        `status_delta_schemas`.
+
+    Returns
+    -------
+    validator: `jsonschema.Draft7Validator`
+        The validator for the schema.
+    """
+    validator = _validators.get(key)
+    if validator is None:
+        if isinstance(key, tuple) and key[0] == "delta":
+            schema = status_delta_schemas[key[1]]
+        elif isinstance(key, tuple):
+            schema = command_schemas[key[1]]
+        else:
+            schema = schemas[key]
+        jsonschema.Draft7Validator.check_schema(schema)
+        validator = jsonschema.Draft7Validator(schema)
+        _validators[key] = validator
+    return validator
+
+
+def _get_validations(data):
+    """Determine which validators to use for which (part of the) data.
+
+    Parameters
+    ----------
+    data: `dict`
+        The data to validate.
+
+    Returns
+    -------
+    validations: `list` of `tuple`
+        A list of (schema key, validator, instance to validate). The list is
+        empty if no known key was found in the data.
+    """
+    if "command" in data:
+        command = data["command"]
+        if isinstance(command, str) and command in command_schemas:
+            validations = [("command", get_validator(("command", command)), data)]
+            parameters = data.get("parameters")
+            if command == "batch" and isinstance(parameters, dict):
+                # Validate each command of the batch against its own schema.
+                for items in parameters.get("commands", ()):
+                    if isinstance(items, dict) and "command" in items:
+                        validations += _get_validations(items)
+            return validations
+        # Let the full command schema report the unknown command.
+        return [("command", get_validator("command"), data)]
+    elif "timeout" in data:
+        return [("timeout", get_validator("timeout"), data)]
+    elif isinstance(data.get("replies"), list):
+        # The reply to a batch command contains the reply to each command.
+        return [
+            validation
+            for reply in data["replies"]
+            if isinstance(reply, dict)
+            for validation in _get_validations(reply)
+        ]
+    llc_keys = [k for k in data if k in _status_key_set]
+    deltas = data.get("delta", ())
+    if len(llc_keys) == 1 and not deltas:
+        return [(llc_keys[0], get_validator(llc_keys[0]), data)]
+    reply_keys = {k: data[k] for k in ("response", "id") if k in data}
+    return [
+        (
+            k,
+            get_validator(("delta", k) if k in deltas else k),
+            {**reply_keys, k: data[k]},
+        )
+        for k in llc_keys
+    ]
+
+
+def validate(data, raise_exception=None):
     """Validates the data against a JSON schema and logs an error in case the
     validation fails.
 
@@ -101,36 +616,49 @@ def validate(data):
     command responses and one for all other command responses. This function
     determines which schema to use based on the keys in the data. Commands are
     validated as well to ensure that the simulator receives correct commands
-    and this should be done by other clients too.
+    and this should be done by other clients too. The reply to the statusAll
+    command contains the status of all lower level components, in which case
+    the status of each of them is validated against its own schema. The
+    statuses listed under the "delta" key only contain the items that changed
+    and are validated against `status_delta_schemas`. The commands in a
+    batch command and the replies in the reply to it are validated like
+    separate commands and replies.
+
+    Commands are validated against the schema of the command only, see
+    `command_schemas`. The validators are cached, see `get_validator`.
+    Validation failures are counted in `validation_failures`.
 
     Parameters
     ----------
     data: `dict`
         The data to validate. The format of the dict is explained in the
         `encode` function.
+    raise_exception: `bool` or `None`
+        Whether or not validation errors should raise an exception. If None,
+        use `validation_raises_exception`.
 
     Raises
     ------
     ValidationError:
         In case the validation fails.
-    ValueError:
+    RuntimeError:
         In case the retrieved data doesn't contain a known key.
 
     """
-
-    try:
-        for k, v in schemas.items():
-            if k in data.keys():
-                jsonschema.validate(data, v)
-                break
-        else:
-            message = f"Validation failed because no known key found in data {data!r}"
-            if validation_raises_exception:
-                raise RuntimeError(message)
-            else:
-                log.error(message)
-    except jsonschema.ValidationError as e:
-        if validation_raises_exception:
-            raise e
-        else:
-            log.exception("Validation failed.", e)
+    if raise_exception is None:
+        raise_exception = validation_raises_exception
+    validations = _get_validations(data)
+    if not validations:
+        _count_validation_failure("unknown")
+        message = f"Validation failed because no known key found in data {data!r}"
+        if raise_exception:
+            raise RuntimeError(message)
+        log.error(message)
+    for key, validator, instance in validations:
+        try:
+            validator.validate(instance)
+        except jsonschema.ValidationError:
+            _count_validation_failure(key)
+            if raise_exception:
+                raise
+            log.exception("Validation failed.")
@@ -22,7 +22,11 @@
 __all__ = ["MockMTDomeController"]
 
 import asyncio
+import collections
+import copy
+import functools
 import logging
+import math
 
 from lsst.ts import salobj
 from lsst.ts.MTDome import encoding_tools
@@ -31,6 +35,109 @@ from lsst.ts.MTDome.llc_name import LlcName
 from lsst.ts.MTDome.response_code import ResponseCode
 
 
+class ClientConnection:
+    """The connection of a client to the mock controller and the state that
+    belongs to it.
+
+    Parameters
+    ----------
+    reader: `asyncio.StreamReader`
+        The stream reader to read the commands from.
+    writer: `asyncio.StreamWriter`
+        The stream writer to write the replies to.
+    log: `logging.Logger`
+        The logger to use.
+    """
+
+    def __init__(self, reader, writer, log):
+        self.frame_reader = encoding_tools.FrameReader(reader)
+        self.writer = writer
+        self.log = log
+        # The address of the client.
+        self.peername = writer.get_extra_info("peername")
+        # The number of commands received and the number of messages, i.e.
+        # replies and pushed statuses, and bytes written.
+        self.num_commands = 0
+        self.num_messages_written = 0
+        self.num_bytes_written = 0
+        # Lock to make sure that replies and pushed statuses are written one
+        # at a time.
+        self.write_lock = asyncio.Lock()
+        # Buffer to encode the replies into, which is reused for every reply.
+        self.write_buffer = bytearray()
+        # The format in which replies and pushed statuses are written. The
+        # client may change it with the setWireFormat command.
+        self.wire_format = encoding_tools.WireFormat.JSON
+        # Every how many statuses of a lower level component a full status
+        # gets sent. In between only the items that changed are sent. 0 means
+        # always send the full status. The client may change it with the
+        # setStatusDelta command.
+        self.status_keyframe_interval = 0
+        # The last status sent to the client and the number of statuses sent,
+        # by lower level component name.
+        self.status_snapshots = {}
+        self.num_statuses_sent = collections.Counter()
+        # Tasks that periodically push the status of the lower level
+        # components that were subscribed to, by name.
+        self.subscription_tasks = {}
+
+    async def write(self, **data):
+        """Write the data in the current wire format, i.e. appended with a
+        newline character for JSON.
+
+        The reply to the setWireFormat command always is written as JSON,
+        since the client only switches format after having read it.
+
+        Parameters
+        ----------
+        data:
+            The data to write.
+        """
+        wire_format = self.wire_format
+        if "wireFormat" in data:
+            wire_format = encoding_tools.WireFormat.JSON
+        encode_into = encoding_tools.frame_encoders[wire_format]
+        async with self.write_lock:
+            frame = encode_into(self.write_buffer, **data)
+            self.writer.write(frame)
+            self.num_messages_written += 1
+            self.num_bytes_written += len(frame)
+            if self.writer.transport.get_write_buffer_size() > 0:
+                # The transport may hold on to the buffer until it has been
+                # sent so don't reuse it.
+                self.write_buffer = bytearray()
+            self.log.debug(data)
+            await self.writer.drain()
+
+    @property
+    def num_bytes_read(self):
+        """The number of bytes read."""
+        return self.frame_reader.num_bytes_read
+
+    def get_statistics(self):
+        """Get the statistics of the connection.
+
+        Returns
+        -------
+        statistics: `dict`
+            The address of the client and the number of commands and bytes
+            read and of the messages and bytes written.
+        """
+        return dict(
+            peername=self.peername,
+            num_commands=self.num_commands,
+            num_bytes_read=self.num_bytes_read,
+            num_messages_written=self.num_messages_written,
+            num_bytes_written=self.num_bytes_written,
+        )
+
+    def cancel_subscriptions(self):
+        """Cancel all status subscriptions."""
+        while self.subscription_tasks:
+            _, task = self.subscription_tasks.popitem()
+            task.cancel()
+
+
 class MockMTDomeController:
     """Mock MTDome Controller that talks over TCP/IP.
 
@@ -52,6 +159,9 @@ class MockMTDomeController:
     * ThCS: Thermal Control System, which interfaces with the MTDome
         Environment Control System
 
+    Several clients may be connected at the same time. Each gets the replies
+    to its own commands, but they all control the same sub-systems.
+
     To start the server:
 
         ctrl = MockMTDomeController(...)
@@ -71,7 +181,10 @@ class MockMTDomeController:
     ):
         self.port = port
         self._server = None
-        self._writer = None
+        # The connections of the clients. Any number of clients may be
+        # connected at the same time and they all control the same lower
+        # level components.
+        self.connections = []
         self.log = logging.getLogger("MockMTDomeController")
         # Dict of command: (has_argument, function).
         # The function is called with:
@@ -80,11 +193,13 @@ class MockMTDomeController:
         self.dispatch_dict = {
             "moveAz": self.move_az,
             "moveEl": self.move_el,
+            "moveAzEl": self.move_az_el,
             "stopAz": self.stop_az,
             "stopEl": self.stop_el,
             "stop": self.stop_llc,
             "crawlAz": self.crawl_az,
             "crawlEl": self.crawl_el,
+            "trackTrajectory": self.track_trajectory,
             "setLouvers": self.set_louvers,
             "closeLouvers": self.close_louvers,
             "stopLouvers": self.stop_louvers,
@@ -102,7 +217,50 @@ class MockMTDomeController:
             "statusLWSCS": self.status_lwscs,
             "statusMonCS": self.status_moncs,
             "statusThCS": self.status_thcs,
+            "statusAll": self.status_all,
+            "subscribe": self.subscribe,
+            "setWireFormat": self.set_wire_format,
+            "setStatusDelta": self.set_status_delta,
+            "batch": self.batch,
         }
+        # The commands of which the function also gets called with the
+        # connection on which the command was received, since their result
+        # depends on it.
+        self.connection_commands = frozenset(
+            (
+                "statusAMCS",
+                "statusApSCS",
+                "statusLCS",
+                "statusLWSCS",
+                "statusMonCS",
+                "statusThCS",
+                "statusAll",
+                "subscribe",
+                "setWireFormat",
+                "setStatusDelta",
+                "batch",
+            )
+        )
+        # The commands that change the motion of the lower level components
+        # and with that the times at which their motion state changes.
+        self.motion_commands = frozenset(
+            (
+                "moveAz",
+                "moveEl",
+                "moveAzEl",
+                "stopAz",
+                "stopEl",
+                "stop",
+                "crawlAz",
+                "crawlEl",
+                "trackTrajectory",
+                "park",
+            )
+        )
+        # Event that is set when a motion command has been executed, which
+        # wakes up the tasks that push the status of the lower level
+        # components.
+        self.motion_changed = asyncio.Event()
         # Durations used by this class and by its unit test
         self.long_duration = 20
         self.short_duration = 2
@@ -116,6 +274,8 @@ class MockMTDomeController:
         self.lwscs = None
         self.moncs = None
         self.thcs = None
+        # The lower level components by name.
+        self.llcs = {}
 
     async def start(self, keep_running=False):
         """Start the TCP/IP server.
@@ -147,6 +307,14 @@ class MockMTDomeController:
         self.lwscs = mock_llc.LwscsStatus(start_tai=self.current_tai)
         self.moncs = mock_llc.MoncsStatus()
         self.thcs = mock_llc.ThcsStatus()
+        self.llcs = {
+            LlcName.AMCS: self.amcs,
+            LlcName.APSCS: self.apscs,
+            LlcName.LCS: self.lcs,
+            LlcName.LWSCS: self.lwscs,
+            LlcName.MONCS: self.moncs,
+            LlcName.THCS: self.thcs,
+        }
 
         if keep_running:
             await self._server.serve_forever()
@@ -159,23 +327,15 @@ class MockMTDomeController:
 
         server = self._server
         self._server = None
+        for connection in self.connections:
+            connection.cancel_subscriptions()
+            # Closing the server doesn't close the connections of the
+            # clients.
+            connection.writer.close()
         self.log.info("Closing server")
         server.close()
         self.log.info("Done closing")
 
-    async def write(self, **data):
-        """Write the data appended with a newline character.
-
-        Parameters
-        ----------
-        data:
-            The data to write.
-        """
-        st = encoding_tools.encode(**data)
-        self._writer.write(st.encode() + b"\r\n")
-        self.log.debug(st)
-        await self._writer.drain()
-
     async def cmd_loop(self, reader, writer):
         """Execute commands and output replies.
 
@@ -186,107 +346,518 @@ class MockMTDomeController:
         writer: stream writer
             The stream writer to write to.
         """
-        self.log.info("The cmd_loop begins")
-        self._writer = writer
-        while True:
-            self.log.debug("Waiting for next command.")
-
-            try:
-                line = await reader.readuntil(b"\r\n")
-                line = line.decode().strip()
-                self.log.debug(f"Read command line: {line!r}")
-            except asyncio.IncompleteReadError:
-                return
-            if line:
-                # some housekeeping for sending a response
-                send_response = True
-                response = ResponseCode.OK
+        connection = ClientConnection(reader, writer, self.log)
+        self.log.info(f"The cmd_loop for {connection.peername} begins")
+        self.connections.append(connection)
+        try:
+            while True:
+                self.log.debug("Waiting for next command.")
+
                 try:
-                    # demarshall the line into a dict of Python objects.
-                    items = encoding_tools.decode(line)
-                    cmd = items["command"]
-                    self.log.debug(f"Trying to execute cmd {cmd}")
-                    if cmd not in self.dispatch_dict:
-                        self.log.error(f"Command '{line}' unknown")
-                        # CODE=2 in this case means "Unsupported command."
-                        response = ResponseCode.UNSUPPORTED_COMMAND
-                        duration = -1
-                    else:
-                        func = self.dispatch_dict[cmd]
-                        kwargs = items["parameters"]
-                        if cmd.startswith("status"):
-                            # the status commands take care of sending a reply
-                            # themselves
-                            send_response = False
-
-                        duration = await func(**kwargs)
-                except (TypeError, RuntimeError):
-                    self.log.exception(f"Command '{line}' failed")
-                    # CODE=3 in this case means "Missing or incorrect
-                    # parameter(s)."
-                    response = ResponseCode.INCORRECT_PARAMETER
-                    duration = -1
-                if send_response:
-                    if duration is None:
-                        duration = self.long_duration
-                    # DM-25189: timeout should be renamed duration and this
-                    # needs to be discussed with EIE. As soon as this is done
-                    # and agreed upon, I will open another issue to fix this.
-                    await self.write(response=response, timeout=duration)
-
-    async def status_amcs(self):
-        """Request the status from the AMCS lower level component and write it
-        in reply.
-        """
-        await self.request_and_send_status(self.amcs, LlcName.AMCS)
-
-    async def status_apscs(self):
-        """Request the status from the ApSCS lower level component and write it
-        in reply.
-        """
-        await self.request_and_send_status(self.apscs, LlcName.APSCS)
-
-    async def status_lcs(self):
-        """Request the status from the LCS lower level component and write it
-        in reply.
-        """
-        await self.request_and_send_status(self.lcs, LlcName.LCS)
-
-    async def status_lwscs(self):
-        """Request the status from the LWSCS lower level component and write it
-        in reply.
-        """
-        await self.request_and_send_status(self.lwscs, LlcName.LWSCS)
-
-    async def status_moncs(self):
-        """Request the status from the MonCS lower level component and write it
-        in reply.
-        """
-        await self.request_and_send_status(self.moncs, LlcName.MONCS)
-
-    async def status_thcs(self):
-        """Request the status from the ThCS lower level component and write it
-        in reply.
-        """
-        await self.request_and_send_status(self.thcs, LlcName.THCS)
-
-    async def request_and_send_status(self, llc, llc_name):
-        """Request the status of the given Lower Level Component and write it
-        to the requester.
+                    frames = await connection.frame_reader.read_frames()
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                for frame in frames:
+                    if frame and not frame.isspace():
+                        connection.num_commands += 1
+                        await self.handle_command(connection, frame)
+        finally:
+            connection.cancel_subscriptions()
+            self.connections.remove(connection)
+            self.log.info(
+                f"The cmd_loop for {connection.peername} ends: "
+                f"{connection.get_statistics()}"
+            )
+            writer.close()
+
+    def get_statistics(self):
+        """Get the statistics of all connected clients.
+
+        Returns
+        -------
+        statistics: `list` of `dict`
+            The statistics of each connection, see
+            `ClientConnection.get_statistics`.
+        """
+        return [connection.get_statistics() for connection in self.connections]
+
+    async def handle_command(self, connection, frame):
+        """Execute a command and output the reply.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection on which the command was received.
+        frame: `bytes`
+            The command, without terminator.
+        """
+        self.log.debug(f"Read command frame: {frame!r}")
+        # The id of the command, if any, gets echoed in the reply so
+        # the client can match the reply to the command.
+        command_id = None
+        try:
+            # demarshall the frame into a dict of Python objects.
+            items = encoding_tools.decode(frame)
+            command_id = items.get("id")
+        except (TypeError, RuntimeError, ValueError):
+            self.log.exception(f"Command {frame!r} failed")
+            # CODE=3 in this case means "Missing or incorrect
+            # parameter(s)."
+            reply = dict(response=ResponseCode.INCORRECT_PARAMETER, timeout=-1)
+        else:
+            reply = await self.execute_command(connection, items)
+        if command_id is not None:
+            reply["id"] = command_id
+        await connection.write(**reply)
+
+    async def execute_command(self, connection, items):
+        """Execute a command and return the reply.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection on which the command was received.
+        items: `dict`
+            The decoded command, with the command name as "command" and its
+            parameters, if any, as "parameters".
+
+        Returns
+        -------
+        reply: `dict`
+            The reply, without the id of the command.
+        """
+        # some housekeeping for sending a response
+        status = None
+        response = ResponseCode.OK
+        try:
+            cmd = items.get("command")
+            self.log.debug(f"Trying to execute cmd {cmd}")
+            if cmd not in self.dispatch_dict:
+                self.log.error(f"Command {items!r} unknown")
+                # CODE=2 in this case means "Unsupported command."
+                response = ResponseCode.UNSUPPORTED_COMMAND
+                duration = -1
+            else:
+                func = self.dispatch_dict[cmd]
+                # Validation may let a command in a batch without parameters
+                # through.
+                kwargs = items.get("parameters", {})
+                if cmd in self.connection_commands:
+                    func = functools.partial(func, connection)
+                if cmd in self.motion_commands:
+                    # Start the motion at the current time, instead of at the
+                    # time of the last status request.
+                    await self.determine_current_tai()
+                if cmd.startswith("status") or cmd in ("setWireFormat", "batch"):
+                    # the status, setWireFormat and batch commands return the
+                    # data to send instead of a duration
+                    status = await func(**kwargs)
+                else:
+                    duration = await func(**kwargs)
+                if cmd in self.motion_commands:
+                    self.motion_changed.set()
+                    self.motion_changed.clear()
+        except (TypeError, RuntimeError, ValueError):
+            self.log.exception(f"Command {items!r} failed")
+            # CODE=3 in this case means "Missing or incorrect
+            # parameter(s)."
+            response = ResponseCode.INCORRECT_PARAMETER
+            duration = -1
+        if status is not None:
+            return dict(response=response, **status)
+        if duration is None:
+            duration = self.long_duration
+        # DM-25189: timeout should be renamed duration and this
+        # needs to be discussed with EIE. As soon as this is done
+        # and agreed upon, I will open another issue to fix this.
+        return dict(response=response, timeout=duration)
+
+    async def batch(self, connection, commands):
+        """Execute several commands in order and return their replies in one
+        reply.
+
+        The commands are executed one after the other, without reading other
+        frames in between. Execution stops at the first command that fails, so
+        the last reply is the one of the failed command.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection on which the command was received.
+        commands: `list` [`dict`]
+            The commands, each with the command name as "command" and its
+            parameters, if any, as "parameters". A batch may not contain a
+            batch.
+
+        Returns
+        -------
+        reply: `dict`
+            The reply with the list of replies to the executed commands as
+            "replies".
+
+        Raises
+        ------
+        ValueError
+            If a command is a batch.
+        """
+        self.log.info(f"Received command 'batch' with {len(commands)} commands")
+        if any(items.get("command") == "batch" for items in commands):
+            raise ValueError("A batch may not contain a batch.")
+        replies = []
+        for items in commands:
+            reply = await self.execute_command(connection, items)
+            replies.append(reply)
+            if reply["response"] != ResponseCode.OK:
+                break
+        return dict(replies=replies)
+
+    async def status_amcs(self, connection, fields=None):
+        """Request the status from the AMCS lower level component and return
+        it so it can be written in reply.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection to send the status on.
+        fields: `list` [`str`] or None
+            The items of the status to return, or None for the full status.
+        """
+        return await self.request_status(connection, self.amcs, LlcName.AMCS, fields)
+
+    async def status_apscs(self, connection, fields=None):
+        """Request the status from the ApSCS lower level component and return
+        it so it can be written in reply.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection to send the status on.
+        fields: `list` [`str`] or None
+            The items of the status to return, or None for the full status.
+        """
+        return await self.request_status(connection, self.apscs, LlcName.APSCS, fields)
+
+    async def status_lcs(self, connection, fields=None):
+        """Request the status from the LCS lower level component and return
+        it so it can be written in reply.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection to send the status on.
+        fields: `list` [`str`] or None
+            The items of the status to return, or None for the full status.
+        """
+        return await self.request_status(connection, self.lcs, LlcName.LCS, fields)
+
+    async def status_lwscs(self, connection, fields=None):
+        """Request the status from the LWSCS lower level component and return
+        it so it can be written in reply.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection to send the status on.
+        fields: `list` [`str`] or None
+            The items of the status to return, or None for the full status.
+        """
+        return await self.request_status(connection, self.lwscs, LlcName.LWSCS, fields)
+
+    async def status_moncs(self, connection, fields=None):
+        """Request the status from the MonCS lower level component and return
+        it so it can be written in reply.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection to send the status on.
+        fields: `list` [`str`] or None
+            The items of the status to return, or None for the full status.
+        """
+        return await self.request_status(connection, self.moncs, LlcName.MONCS, fields)
+
+    async def status_thcs(self, connection, fields=None):
+        """Request the status from the ThCS lower level component and return
+        it so it can be written in reply.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection to send the status on.
+        fields: `list` [`str`] or None
+            The items of the status to return, or None for the full status.
+        """
+        return await self.request_status(connection, self.thcs, LlcName.THCS, fields)
+
+    async def status_all(self, connection):
+        """Request the status from all lower level components and return it
+        so it can be written in a single reply.
+        """
+        self.log.debug("Determining current TAI.")
+        await self.determine_current_tai()
+        state = {}
+        for llc_name, llc in self.llcs.items():
+            await llc.determine_status(self.current_tai)
+            self.add_status_to_send(connection, state, llc_name, llc)
+        return state
+
+    async def request_status(self, connection, llc, llc_name, fields=None):
+        """Request the status of the given Lower Level Component.
+
+        If fields are given, only those items of the status are returned and
+        the name of the Lower Level Component is listed under the "delta" key,
+        so the client merges them into the last full status it received.
 
         Parameters
         ----------
+        connection: `ClientConnection`
+            The connection to send the status on.
         llc: mock_llc
             The Lower Level Component to request the status for.
         llc_name: LlcName
             The name of the Lower Level Component.
+        fields: `list` [`str`] or None
+            The items of the status to return, or None for the full status.
+
+        Returns
+        -------
+        state: `dict`
+            A dict with the name of the Lower Level Component as key and its
+            status as value.
+
+        Raises
+        ------
+        ValueError
+            If the status doesn't have one of the fields.
         """
         self.log.debug("Determining current TAI.")
         await self.determine_current_tai()
         self.log.debug(f"Requesting status for LLC {llc_name}")
         await llc.determine_status(self.current_tai)
-        state = {llc_name.value: llc.llc_status}
-        await self.write(response=ResponseCode.OK, **state)
+        state = {}
+        if fields is None:
+            self.add_status_to_send(connection, state, llc_name, llc)
+            return state
+        projection = llc.get_status_fields(fields)
+        # Keep the snapshot up to date with what the client knows, so the
+        # next status delta doesn't leave out items that changed back.
+        snapshot = connection.status_snapshots.get(llc_name)
+        if snapshot is not None:
+            snapshot.update(copy.deepcopy(projection))
+        state[llc_name.value] = projection
+        state["delta"] = [llc_name.value]
+        return state
+
+    def add_status_to_send(self, connection, state, llc_name, llc):
+        """Add the status of a Lower Level Component to the state to send.
+
+        If the client asked for status deltas, only the items that changed
+        since the previous status sent are added, except for every
+        ``status_keyframe_interval``-th status which is sent in full. The names
+        of the Lower Level Components of which a delta is sent are listed
+        under the "delta" key.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection to send the status on.
+        state: `dict`
+            The state to add the status to.
+        llc_name: LlcName
+            The name of the Lower Level Component.
+        llc: mock_llc
+            The Lower Level Component.
+        """
+        if connection.status_keyframe_interval == 0:
+            state[llc_name.value] = llc.llc_status
+            return
+        snapshot = connection.status_snapshots.get(llc_name)
+        num_sent = connection.num_statuses_sent[llc_name]
+        connection.num_statuses_sent[llc_name] += 1
+        connection.status_snapshots[llc_name] = copy.deepcopy(llc.llc_status)
+        if snapshot is None or num_sent % connection.status_keyframe_interval == 0:
+            state[llc_name.value] = llc.llc_status
+        else:
+            state[llc_name.value] = llc.get_status_delta(snapshot)
+            state.setdefault("delta", []).append(llc_name.value)
+
+    async def subscribe(self, connection, system, period):
+        """Subscribe to the status of a lower level component.
+
+        The status then gets written periodically on the connection without
+        the need for a status command.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection to write the status on.
+        system: `str`
+            The name of the lower level component to subscribe to.
+        period: `float`
+            The period (sec) at which to write the status. A period of 0 means
+            unsubscribe.
+
+        Returns
+        -------
+        `float`
+            The estimated duration of the execution of the command.
+
+        Raises
+        ------
+        ValueError
+            If the system is unknown or the period is negative.
+        """
+        self.log.info(
+            f"Received command 'subscribe' with arguments system={system} and period={period}"
+        )
+        llc_name = LlcName(system)
+        if period < 0:
+            raise ValueError(f"The period {period} should not be negative.")
+        task = connection.subscription_tasks.pop(llc_name, None)
+        if task is not None:
+            task.cancel()
+        if period > 0:
+            connection.subscription_tasks[llc_name] = asyncio.create_task(
+                self.push_status_loop(connection, llc_name, period)
+            )
+        return 0.0
+
+    async def push_status_loop(self, connection, llc_name, period):
+        """Write the status of a lower level component at the given period.
+
+        The status of the AMCS and LWSCS also gets written as soon as their
+        motion state changes, e.g. when a move ends, so the client doesn't
+        need to wait for the next period to learn about it.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection to write the status on.
+        llc_name: `LlcName`
+            The name of the lower level component.
+        period: `float`
+            The period (sec) at which to write the status.
+        """
+        loop = asyncio.get_running_loop()
+        push_time = loop.time() + period
+        try:
+            while True:
+                timeout = push_time - loop.time()
+                time_to_transition = await self.get_time_to_next_transition(llc_name)
+                if time_to_transition is not None:
+                    timeout = min(timeout, time_to_transition)
+                try:
+                    await asyncio.wait_for(
+                        self.motion_changed.wait(), timeout=max(timeout, 0)
+                    )
+                    # The motion changed so determine the next transition
+                    # again.
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+                state = await self.request_status(
+                    connection, self.llcs[llc_name], llc_name
+                )
+                await connection.write(response=ResponseCode.OK, **state)
+                if loop.time() >= push_time:
+                    push_time = loop.time() + period
+        except ConnectionError:
+            self.log.info(f"Stop pushing the status of {llc_name.value}.")
+
+    async def get_time_to_next_transition(self, llc_name):
+        """Determine the time until the motion state of a lower level
+        component changes.
+
+        Parameters
+        ----------
+        llc_name: `LlcName`
+            The name of the lower level component.
+
+        Returns
+        -------
+        time_to_transition: `float` or None
+            The time (sec) until the next change of the motion state, or None
+            if it doesn't change anymore or if the lower level component
+            doesn't move.
+        """
+        if llc_name == LlcName.AMCS:
+            motion = self.amcs.azimuth_motion
+        elif llc_name == LlcName.LWSCS:
+            motion = self.lwscs.elevation_motion
+        else:
+            return None
+        await self.determine_current_tai()
+        transition_tai = motion.next_transition_tai(self.current_tai)
+        if transition_tai is None:
+            return None
+        return transition_tai - self.current_tai
+
+    async def set_wire_format(self, connection, formats):
+        """Set the format in which replies and pushed statuses are written on
+        a connection.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection on which the command was received.
+        formats: `list` of `str`
+            The wire formats supported by the client, in order of preference.
+
+        Returns
+        -------
+        reply: `dict`
+            The data to write in reply, with the selected wire format.
+
+        Raises
+        ------
+        ValueError
+            If none of the formats is supported.
+        """
+        self.log.info(
+            f"Received command 'setWireFormat' with argument formats={formats}"
+        )
+        supported_formats = encoding_tools.get_supported_wire_formats()
+        for wire_format in formats:
+            if wire_format in (f.value for f in supported_formats):
+                connection.wire_format = encoding_tools.WireFormat(wire_format)
+                return dict(timeout=0.0, wireFormat=connection.wire_format.value)
+        raise ValueError(f"None of the wire formats {formats} is supported.")
+
+    async def set_status_delta(self, connection, keyframeInterval):
+        """Set whether to send the full status of the lower level components
+        or only the items that changed on a connection.
+
+        Parameters
+        ----------
+        connection: `ClientConnection`
+            The connection on which the command was received.
+        keyframeInterval: `int`
+            Every how many statuses of a lower level component a full status
+            gets sent. In between only the items that changed are sent. 0
+            means always send the full status.
+
+        Returns
+        -------
+        `float`
+            The estimated duration of the execution of the command.
+
+        Raises
+        ------
+        ValueError
+            If the interval is negative.
+        """
+        self.log.info(
+            f"Received command 'setStatusDelta' with argument keyframeInterval={keyframeInterval}"
+        )
+        if keyframeInterval < 0:
+            raise ValueError(
+                f"The keyframe interval {keyframeInterval} should not be negative."
+            )
+        connection.status_keyframe_interval = keyframeInterval
+        # Start with a full status of each lower level component.
+        connection.status_snapshots.clear()
+        connection.num_statuses_sent.clear()
+        return 0.0
 
     async def determine_current_tai(self):
         """Determine the current TAI time.
@@ -339,6 +910,48 @@ class MockMTDomeController:
         # and the mock az controller use radians.
         return await self.lwscs.moveEl(position, self.current_tai)
 
+    async def move_az_el(self, azimuth, azimuthVelocity, elevation):
+        """Move the dome and the light and wind screen at the same time.
+
+        Both motions start at the same TAI time. The parameters are checked
+        before either motion starts, so either both or neither of them start.
+
+        Parameters
+        ----------
+        azimuth: `float`
+            Desired azimuth, in radians, in range [0, 2 pi)
+        azimuthVelocity: `float`
+            The velocity, in rad/sec, to start crawling at once the azimuth
+            has been reached.
+        elevation: `float`
+            Desired elevation, in radians, in range [0, pi/2)
+
+        Returns
+        -------
+        `float`
+            The estimated duration of the execution of the command, which is
+            the longest of the durations of both motions.
+
+        Raises
+        ------
+        ValueError
+            If the azimuth velocity is larger than the maximum speed of the
+            dome or if the elevation is out of range.
+        """
+        self.log.info(
+            f"Received command 'moveAzEl' with arguments azimuth={azimuth}, "
+            f"azimuthVelocity={azimuthVelocity} and elevation={elevation}"
+        )
+        if math.fabs(azimuthVelocity) > self.amcs.amcs_limits.vmax:
+            raise ValueError(
+                f"The azimuth velocity {azimuthVelocity} is larger than the max "
+                f"speed {self.amcs.amcs_limits.vmax}."
+            )
+        # The elevation is checked by moving the light and wind screen first.
+        el_duration = await self.lwscs.moveEl(elevation, self.current_tai)
+        az_duration = await self.amcs.moveAz(azimuth, azimuthVelocity, self.current_tai)
+        return max(az_duration, el_duration)
+
     async def stop_az(self):
         """Stop all dome motion.
 
@@ -407,6 +1020,41 @@ class MockMTDomeController:
         # and the mock az controller use radians.
         return await self.lwscs.crawlEl(velocity, self.current_tai)
 
+    async def track_trajectory(self, system, tai, position, velocity):
+        """Make the dome or the light and wind screen follow a trajectory.
+
+        The trajectory may be sent in chunks: the samples of a chunk replace
+        those of the trajectory being followed from the first sample of the
+        chunk on.
+
+        Parameters
+        ----------
+        system: `str`
+            The name of the system to move, AMCS or LWSCS.
+        tai: `list` [`float`]
+            The TAI times, unix seconds, of the samples, in increasing order.
+        position: `list` [`float`]
+            The position, in radians, at each sample.
+        velocity: `list` [`float`]
+            The velocity, in rad/sec, at each sample.
+
+        Returns
+        -------
+        `float`
+            The time until the last sample.
+        """
+        self.log.debug(
+            f"Received command 'trackTrajectory' with arguments system={system} "
+            f"and {len(tai)} samples"
+        )
+        if system == LlcName.AMCS.value:
+            llc = self.amcs
+        elif system == LlcName.LWSCS.value:
+            llc = self.lwscs
+        else:
+            raise ValueError(f"Unknown system {system}.")
+        return await llc.trackTrajectory(tai, position, velocity, self.current_tai)
+
     async def set_louvers(self, position):
         """Set the positions of the louvers.
 
@@ -486,6 +1134,11 @@ class MockMTDomeController:
                     # these cases we need to extract the only value in the
                     # array.
                     setattr(self.amcs.amcs_limits, field["target"], field["setting"][0])
+            self.amcs.azimuth_motion.set_motion_limits(
+                max_speed=self.amcs.amcs_limits.vmax,
+                max_acceleration=self.amcs.amcs_limits.amax,
+                max_jerk=self.amcs.amcs_limits.jmax,
+            )
         elif system == LlcName.LWSCS.value:
             for field in settings:
                 if field["target"] in ("jmax", "amax", "vmax"):
@@ -495,6 +1148,11 @@ class MockMTDomeController:
                     setattr(
                         self.lwscs.lwscs_limits, field["target"], field["setting"][0]
                     )
+            self.lwscs.elevation_motion.set_motion_limits(
+                max_speed=self.lwscs.lwscs_limits.vmax,
+                max_acceleration=self.lwscs.lwscs_limits.amax,
+                max_jerk=self.lwscs.lwscs_limits.jmax,
+            )
         else:
             raise KeyError(f"Unknown system {system}.")
 
@@ -60,7 +60,11 @@ class AmcsStatus(BaseMockStatus):
         self.vmax = self.amcs_limits.vmax
         # variables helping with the state of the mock AZ motion
         self.azimuth_motion = AzimuthMotion(
-            start_position=0.0, max_speed=self.vmax, start_tai=start_tai
+            start_position=0.0,
+            max_speed=self.vmax,
+            start_tai=start_tai,
+            max_acceleration=self.amax,
+            max_jerk=self.jmax,
         )
         self.duration = 0.0
         # variables holding the status of the mock AZ motion. The error codes
@@ -96,6 +100,7 @@ class AmcsStatus(BaseMockStatus):
             velocity,
             motion_state,
         ) = self.azimuth_motion.get_position_velocity_and_motion_state(tai=current_tai)
+        transition_tai = self.azimuth_motion.next_transition_tai(current_tai)
         self.llc_status = {
             "status": {
                 "error": self.error,
@@ -115,6 +120,11 @@ class AmcsStatus(BaseMockStatus):
             "encoderHeadCalibrated": self.encoder_head_calibrated.tolist(),
             "resolverRaw": self.resolver_raw.tolist(),
             "resolverCalibrated": self.resolver_calibrated.tolist(),
+            # The time (sec) until the motion state changes, so a client that
+            # polls for the status can poll again right after that.
+            "timeToTransition": None
+            if transition_tai is None
+            else transition_tai - current_tai,
             # DM-26653: The name of this key is still under discussion and
             # could be modified to "timestampUTC"
             "timestampUTC": current_tai,
@@ -178,6 +188,30 @@ class AmcsStatus(BaseMockStatus):
         )
         return self.duration
 
+    async def trackTrajectory(self, tai, position, velocity, start_tai):
+        """Make the dome follow a trajectory.
+
+        Parameters
+        ----------
+        tai: `list` [`float`]
+            The TAI times, unix seconds, of the samples of the trajectory, in
+            increasing order.
+        position: `list` [`float`]
+            The azimuth (rad) at each sample.
+        velocity: `list` [`float`]
+            The azimuth velocity (rad/s) at each sample.
+        start_tai: `float`
+            The TAI time, unix seconds, when the command was issued. To model
+            the real dome, this should be the current time. However, for unit
+            tests it can be convenient to use other values.
+        """
+        self.duration = self.azimuth_motion.follow_trajectory(
+            start_tai=start_tai, tai=tai, position=position, velocity=velocity,
+        )
+        # Only once the trajectory has been validated.
+        self.position_commanded = position[-1]
+        return self.duration
+
     async def stopAz(self, start_tai):
         """Stop all motion of the dome.
 
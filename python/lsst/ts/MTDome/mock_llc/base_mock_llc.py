@@ -46,3 +46,47 @@ class BaseMockStatus(ABC):
             The current Unix TAI time, in seconds
         """
         pass
+
+    def get_status_delta(self, snapshot):
+        """Get the items of the status that changed compared to a snapshot
+        of an earlier status.
+
+        Parameters
+        ----------
+        snapshot: `dict`
+            An earlier status of the Lower Level Component.
+
+        Returns
+        -------
+        delta: `dict`
+            The items of llc_status that are not in the snapshot or that have
+            a different value.
+        """
+        return {
+            key: value
+            for key, value in self.llc_status.items()
+            if key not in snapshot or snapshot[key] != value
+        }
+
+    def get_status_fields(self, fields):
+        """Get the given items of the status.
+
+        Parameters
+        ----------
+        fields: `list` [`str`]
+            The keys of the items of the status to get.
+
+        Returns
+        -------
+        projection: `dict`
+            The items of llc_status with the given keys.
+
+        Raises
+        ------
+        ValueError
+            If the status doesn't have one of the keys.
+        """
+        unknown_fields = [field for field in fields if field not in self.llc_status]
+        if unknown_fields:
+            raise ValueError(f"Unknown status fields {unknown_fields}.")
+        return {field: self.llc_status[field] for field in fields}
@@ -62,6 +62,8 @@ class LwscsStatus(BaseMockStatus):
             max_position=math.pi,
             max_speed=math.fabs(self.vmax),
             start_tai=start_tai,
+            max_acceleration=self.amax,
+            max_jerk=self.jmax,
         )
         self.duration = 0.0
         # variables holding the status of the mock EL motion
@@ -96,6 +98,7 @@ class LwscsStatus(BaseMockStatus):
         ) = self.elevation_motion.get_position_velocity_and_motion_state(
             tai=current_tai
         )
+        transition_tai = self.elevation_motion.next_transition_tai(current_tai)
         self.llc_status = {
             "status": motion_state.name,
             "positionActual": position,
@@ -111,6 +114,11 @@ class LwscsStatus(BaseMockStatus):
             "resolverRaw": self.resolver_raw.tolist(),
             "resolverCalibrated": self.resolver_calibrated.tolist(),
             "powerDraw": self.power_draw,
+            # The time (sec) until the motion state changes, so a client that
+            # polls for the status can poll again right after that.
+            "timeToTransition": None
+            if transition_tai is None
+            else transition_tai - current_tai,
             "timestampUTC": current_tai,
         }
         self.log.debug(f"lwscs_state = {self.llc_status}")
@@ -162,6 +170,30 @@ class LwscsStatus(BaseMockStatus):
         )
         return self.duration
 
+    async def trackTrajectory(self, tai, position, velocity, start_tai):
+        """Make the light and wind screen follow a trajectory.
+
+        Parameters
+        ----------
+        tai: `list` [`float`]
+            The TAI times, unix seconds, of the samples of the trajectory, in
+            increasing order.
+        position: `list` [`float`]
+            The elevation (rad) at each sample.
+        velocity: `list` [`float`]
+            The elevation velocity (rad/s) at each sample.
+        start_tai: `float`
+            The TAI time, unix seconds, when the command was issued. To model
+            the real dome, this should be the current time. However, for unit
+            tests it can be convenient to use other values.
+        """
+        self.duration = self.elevation_motion.follow_trajectory(
+            start_tai=start_tai, tai=tai, position=position, velocity=velocity,
+        )
+        # Only once the trajectory has been validated.
+        self.position_commanded = position[-1]
+        return self.duration
+
     async def stopEl(self, start_tai):
         """Stop moving the light and wind screen.
 
@@ -24,9 +24,10 @@ __all__ = ["AzimuthMotion"]
 import logging
 import math
 
+import numpy as np
+
 from .base_llc_motion import BaseLlcMotion
 from lsst.ts.idl.enums.MTDome import MotionState
-import lsst.ts.salobj as salobj
 
 
 class AzimuthMotion(BaseLlcMotion):
@@ -42,6 +43,12 @@ class AzimuthMotion(BaseLlcMotion):
         The TAI time, unix seconds, of the start of the move. This also needs
         to be set in the constructor so this class knows what the TAI time
         currently is.
+    max_acceleration: `float` or None
+        The maximum allowed acceleration [rad/s^2], or None to change the
+        velocity instantaneously.
+    max_jerk: `float` or None
+        The maximum allowed jerk [rad/s^3], or None to change the velocity
+        instantaneously.
 
     Notes
     -----
@@ -49,16 +56,22 @@ class AzimuthMotion(BaseLlcMotion):
     speed and start crawling from there with the specified crawl velocity, or
     crawl at the specified velocity. It handles the 0/2pi radians boundary.
     When either moving or crawling, a new move or handle command is handled,
-    the azimuth motion/crawl can be stopped and the dome can be parked.
+    the azimuth motion/crawl can be stopped and the dome can be parked. If the
+    maximum acceleration and jerk are set, all velocity changes follow an
+    S-curve profile, see `MotionProfile`.
     """
 
-    def __init__(self, start_position, max_speed, start_tai):
+    def __init__(
+        self, start_position, max_speed, start_tai, max_acceleration=None, max_jerk=None
+    ):
         super().__init__(
             start_position=start_position,
             min_position=0,
             max_position=2 * math.pi,
             max_speed=max_speed,
             start_tai=start_tai,
+            max_acceleration=max_acceleration,
+            max_jerk=max_jerk,
         )
         self.log = logging.getLogger("MockCircularCrawlingActuator")
 
@@ -68,8 +81,11 @@ class AzimuthMotion(BaseLlcMotion):
         """Sets the end_position and crawl velocity and returns the duration
         of the move.
 
-        No aceleration is taken into account. The time taken by crawling is not
-        taken into account either.
+        Acceleration is only taken into account if the maximum acceleration
+        and jerk are set. The time taken by crawling is not taken into
+        account. The move or crawl starts from the position and velocity at
+        ``start_tai`` of the current motion, so the dome can be commanded
+        again while it is moving, crawling, parking or stopping.
 
         Parameters
         ----------
@@ -87,7 +103,8 @@ class AzimuthMotion(BaseLlcMotion):
         Returns
         -------
         duration: `float`
-            The duration [s] of the move.
+            The duration [s] of the move, or of the change to the crawl
+            velocity in case of a crawl.
 
         Raises
         ------
@@ -105,87 +122,74 @@ class AzimuthMotion(BaseLlcMotion):
         if motion_state not in [MotionState.MOVING, MotionState.CRAWLING]:
             raise ValueError("motion_speed should be MOVING or CRAWLING.")
 
+        start_velocity = self._update_start_position(start_tai)
         self._commanded_motion_state = motion_state
-        self._start_tai = start_tai
         self._end_position = end_position
         self._crawl_velocity = crawl_velocity
-        duration = self._get_duration()
-        self._end_tai = self._start_tai + duration
-        return duration
+        return self._start_motion(start_tai, start_velocity)
 
-    def get_position_velocity_and_motion_state(self, tai):
-        """Computes the position and `MotionState` for the given TAI time.
+    def get_positions_velocities_and_motion_states(self, tai):
+        """Computes the positions and `MotionState` codes for an array of TAI
+        times.
 
         Parameters
         ----------
-        tai: `float`
-            The TAI time, unix seconds, for which to compute the position. To
-            model the real dome, this should be the current time. However, for
-            unit tests it can be convenient to use other values.
+        tai: `numpy.ndarray`
+            The TAI times, unix seconds, for which to compute the positions.
+            To model the real dome, these should be current times. However,
+            for unit tests it can be convenient to use other values.
 
         Returns
         -------
-        position: `float`
-            The position [rad] at the given TAI time, taking both the move
+        positions: `numpy.ndarray`
+            The positions [rad] at the given TAI times, taking both the move
             (optional) and crawl velocities into account.
-        velocity: `float`
-            The velocity [rad/s] at the given TAI time.
-        motion_state: `MotionState`
-            The MotionState at the given TAI time.
+        velocities: `numpy.ndarray`
+            The velocities [rad/s] at the given TAI times.
+        motion_states: `numpy.ndarray`
+            The `MotionState` values, as integers, at the given TAI times.
+
+        Raises
+        ------
+        ValueError
+            If a TAI time is before the start of the current move.
         """
-        if tai >= self._end_tai:
-            if self._commanded_motion_state in [
-                MotionState.PARKING,
-                MotionState.PARKED,
-            ]:
-                motion_state = MotionState.PARKED
-                position = self._end_position
-                velocity = 0
-            elif self._commanded_motion_state in [
-                MotionState.STOPPING,
-                MotionState.STOPPED,
-            ]:
-                motion_state = MotionState.STOPPED
-                position = self._end_position
-                velocity = 0
-            else:
-                diff_since_crawl_started = tai - self._end_tai
-                calculation_position = self._end_position
-                if self._commanded_motion_state == MotionState.CRAWLING:
-                    calculation_position = self._start_position
-                position = (
-                    calculation_position
-                    + self._crawl_velocity * diff_since_crawl_started
-                )
-                motion_state = MotionState.CRAWLING
-                velocity = self._crawl_velocity
-                if self._crawl_velocity == 0:
-                    motion_state = MotionState.STOPPED
-                    velocity = 0
-        elif tai < self._start_tai:
+        tai = np.asarray(tai, dtype=float)
+        if np.any(tai < self._start_tai):
             raise ValueError(
-                f"Encountered TAI {tai} which is smaller than start TAI {self._start_tai}"
+                f"Encountered TAI {tai.min()} which is smaller than start TAI "
+                f"{self._start_tai}"
             )
+
+        positions, velocities = self._profile.evaluate(tai)
+
+        # The motion state during the motion and once it is done.
+        if self._commanded_motion_state in [
+            MotionState.PARKING,
+            MotionState.PARKED,
+        ]:
+            moving_motion_state = MotionState.PARKING
+            done_motion_state = MotionState.PARKED
+        elif self._commanded_motion_state in [
+            MotionState.STOPPING,
+            MotionState.STOPPED,
+        ]:
+            moving_motion_state = MotionState.STOPPING
+            done_motion_state = MotionState.STOPPED
         else:
-            frac_time = (tai - self._start_tai) / (self._end_tai - self._start_tai)
-            distance = self._get_distance()
-            position = self._start_position + distance * frac_time
-            velocity = self._max_speed
-            if distance < 0:
-                velocity = -self._max_speed
-            if self._commanded_motion_state == MotionState.PARKING:
-                motion_state = MotionState.PARKING
-            elif self._commanded_motion_state == MotionState.STOPPING:
-                motion_state = MotionState.STOPPED
-                velocity = 0
-            else:
-                motion_state = MotionState.MOVING
-
-        position = salobj.angle_wrap_nonnegative(math.degrees(position)).rad
-        return position, velocity, motion_state
+            moving_motion_state = self._commanded_motion_state
+            done_motion_state = MotionState.CRAWLING
+            if self._crawl_velocity == 0:
+                done_motion_state = MotionState.STOPPED
+        motion_states = np.where(
+            tai < self._end_tai, int(moving_motion_state), int(done_motion_state)
+        )
+
+        positions = np.remainder(positions, 2 * math.pi)
+        return positions, velocities, motion_states
 
     def stop(self, start_tai):
-        """Stops the current motion instantaneously.
+        """Stops the current motion.
 
         Parameters
         ----------
@@ -194,14 +198,7 @@ class AzimuthMotion(BaseLlcMotion):
             model the real dome, this should be the current time. However, for
             unit tests it can be convenient to use other values.
         """
-        position, velocity, motion_state = self.get_position_velocity_and_motion_state(
-            tai=start_tai
-        )
-        self._start_tai = start_tai
-        self._start_position = position
-        self._end_position = position
-        self._crawl_velocity = 0
-        self._commanded_motion_state = MotionState.STOPPING
+        self._stop_motion(start_tai=start_tai, motion_state=MotionState.STOPPING)
 
     def park(self, start_tai):
         """Parks the dome.
@@ -212,14 +209,15 @@ class AzimuthMotion(BaseLlcMotion):
             The TAI time, unix seconds, at which the command was issued. To
             model the real dome, this should be the current time. However, for
             unit tests it can be convenient to use other values.
+
+        Returns
+        -------
+        end_tai: `float`
+            The TAI time, unix seconds, at which the dome is parked.
         """
-        position, velocity, motion_state = self.get_position_velocity_and_motion_state(
-            tai=start_tai
-        )
-        self._start_tai = start_tai
-        self._start_position = position
+        start_velocity = self._update_start_position(start_tai)
+        self._commanded_motion_state = MotionState.PARKING
         self._end_position = 0
         self._crawl_velocity = 0
-        self._commanded_motion_state = MotionState.PARKING
-        self._end_tai = self._start_tai + self._get_duration()
+        self._start_motion(start_tai, start_velocity)
         return self._end_tai
@@ -23,13 +23,22 @@ import math
 
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+from .motion_profile import MotionProfile
 from lsst.ts.idl.enums.MTDome import MotionState
-import lsst.ts.salobj as salobj
 
 
 class BaseLlcMotion(ABC):
     def __init__(
-        self, start_position, min_position, max_position, max_speed, start_tai
+        self,
+        start_position,
+        min_position,
+        max_position,
+        max_speed,
+        start_tai,
+        max_acceleration=None,
+        max_jerk=None,
     ):
         # This defines the start position of a move or a crawl.
         self._start_position = start_position
@@ -43,6 +52,10 @@ class BaseLlcMotion(ABC):
         # This is not a constant but can be configured by the MTDome CSC, which
         # is why it is a parameter.
         self._max_speed = max_speed
+        # The maximum acceleration and jerk can be configured as well. If
+        # either is None, the velocity changes instantaneously.
+        self._max_acceleration = max_acceleration
+        self._max_jerk = max_jerk
         # The commanded MotionState, against which the computed MotionState
         # will be compared. By default the elevation motion starts in STOPPED
         # state. The MotionState only changes when a new command is received.
@@ -59,6 +72,32 @@ class BaseLlcMotion(ABC):
         # When a move or crawl command is received, it specifies the crawl
         # crawl_velocity.
         self._crawl_velocity = 0
+        # The profile of the current motion.
+        self._profile = MotionProfile(
+            start_tai=start_tai, position=start_position, velocity=0.0
+        )
+        # The TAI times, unix seconds, positions [rad] and velocities [rad/s]
+        # of the trajectory that is being followed, or None if not following
+        # a trajectory.
+        self._trajectory = None
+
+    def set_motion_limits(self, max_speed, max_acceleration, max_jerk):
+        """Sets the limits of the motion, which apply to the next command.
+
+        Parameters
+        ----------
+        max_speed: `float`
+            The maximum allowed speed [rad/s].
+        max_acceleration: `float` or None
+            The maximum allowed acceleration [rad/s^2], or None to change the
+            velocity instantaneously.
+        max_jerk: `float` or None
+            The maximum allowed jerk [rad/s^3], or None to change the
+            velocity instantaneously.
+        """
+        self._max_speed = max_speed
+        self._max_acceleration = max_acceleration
+        self._max_jerk = max_jerk
 
     def _get_distance(self):
         """Determines the smallest distance [rad] between the initial and
@@ -69,33 +108,118 @@ class BaseLlcMotion(ABC):
         distance: `float`
             The smallest distance between the initial and target positions.
         """
-        distance = salobj.angle_diff(
-            math.degrees(self._end_position), math.degrees(self._start_position)
-        ).rad
+        distance = self._end_position - self._start_position
+        if not -math.pi <= distance < math.pi:
+            # The same wrap to [-pi, pi) as salobj.angle_diff, in radians.
+            distance = (distance + math.pi) % (2 * math.pi) - math.pi
         return distance
 
-    def _get_duration(self):
-        """Determines the duration of the move using the distance of the move
-        and the maximum speed, or zero in case of a crawl.
+    def _update_start_position(self, start_tai):
+        """Updates the start position to the position at ``start_tai`` of the
+        current motion, if any, so the next motion starts from there.
+
+        Parameters
+        ----------
+        start_tai: `float`
+            The TAI time, unix seconds, at which the next motion starts.
+
+        Returns
+        -------
+        velocity: `float`
+            The velocity [rad/s] at ``start_tai``, or zero if there is no
+            current motion.
+        """
+        if self._commanded_motion_state not in [
+            MotionState.MOVING,
+            MotionState.CRAWLING,
+            MotionState.PARKING,
+            MotionState.STOPPING,
+        ]:
+            return 0.0
+        (
+            self._start_position,
+            velocity,
+            _,
+        ) = self.get_position_velocity_and_motion_state(start_tai)
+        return velocity
+
+    def _start_motion(self, start_tai, start_velocity):
+        """Plans the commanded move or crawl, starting at ``start_tai`` from
+        the start position.
+
+        Parameters
+        ----------
+        start_tai: `float`
+            The TAI time, unix seconds, at which the motion starts.
+        start_velocity: `float`
+            The velocity [rad/s] at ``start_tai``.
 
         Returns
         -------
         duration: `float`
-            The duration of the move, or zero in case of a crawl.
+            The duration [s] of the move, or of the change to the crawl
+            velocity in case of a crawl.
         """
-        duration = math.fabs(self._get_distance()) / self._max_speed
+        self._start_tai = start_tai
+        self._trajectory = None
         if self._commanded_motion_state == MotionState.CRAWLING:
-            # A crawl command is executed instantaneously.
-            duration = 0
+            self._profile, duration = MotionProfile.plan_velocity_change(
+                start_tai=start_tai,
+                position=self._start_position,
+                velocity=start_velocity,
+                end_velocity=self._crawl_velocity,
+                max_acceleration=self._max_acceleration,
+                max_jerk=self._max_jerk,
+            )
+        else:
+            self._profile, duration = MotionProfile.plan_move(
+                start_tai=start_tai,
+                position=self._start_position,
+                velocity=start_velocity,
+                distance=self._get_distance(),
+                end_velocity=self._crawl_velocity,
+                max_speed=self._max_speed,
+                max_acceleration=self._max_acceleration,
+                max_jerk=self._max_jerk,
+            )
+        self._end_tai = self._start_tai + duration
         return duration
 
+    def _stop_motion(self, start_tai, motion_state):
+        """Plans stopping the current motion, starting at ``start_tai``.
+
+        Parameters
+        ----------
+        start_tai: `float`
+            The TAI time, unix seconds, at which stopping starts.
+        motion_state: `MotionState`
+            The commanded MotionState while stopping.
+        """
+        start_velocity = self._update_start_position(start_tai)
+        self._start_tai = start_tai
+        self._trajectory = None
+        self._crawl_velocity = 0
+        self._commanded_motion_state = motion_state
+        self._profile, duration = MotionProfile.plan_velocity_change(
+            start_tai=start_tai,
+            position=self._start_position,
+            velocity=start_velocity,
+            end_velocity=0.0,
+            max_acceleration=self._max_acceleration,
+            max_jerk=self._max_jerk,
+        )
+        self._end_tai = self._start_tai + duration
+        self._end_position = float(self._profile.position[-1])
+
     def set_target_position_and_velocity(
         self, start_tai, end_position, crawl_velocity, motion_state
     ):
         """Sets the end_position and crawl_velocity and returns the duration of
         the move.
 
-        No aceleration is taken into account.
+        If the maximum acceleration and jerk are set, the move or crawl
+        follows an S-curve profile, otherwise the velocity changes
+        instantaneously.
 
         Parameters
         ----------
@@ -106,7 +230,7 @@ class BaseLlcMotion(ABC):
         end_position: `float`
             The target position.
         crawl_velocity: `float`
-            The crawl_velocity.
+            The crawl_velocity. Ignored in case of a move.
         motion_state: `MotionState`
             MOVING or CRAWLING. The value is not checked.
 
@@ -133,18 +257,191 @@ class BaseLlcMotion(ABC):
                 f"max speed {self._max_speed}."
             )
 
+        start_velocity = self._update_start_position(start_tai)
         self._commanded_motion_state = motion_state
-        self._start_tai = start_tai
         self._end_position = end_position
-        self._crawl_velocity = crawl_velocity
-        duration = self._get_duration()
-        self._end_tai = self._start_tai + duration
-        return duration
+        # A move ends at rest.
+        self._crawl_velocity = 0
+        if motion_state == MotionState.CRAWLING:
+            self._crawl_velocity = crawl_velocity
+        return self._start_motion(start_tai, start_velocity)
+
+    def follow_trajectory(self, start_tai, tai, position, velocity):
+        """Follows a trajectory given as samples of the position and
+        velocity and returns the time until the last sample.
+
+        The position between samples is interpolated with a cubic polynomial,
+        see `MotionProfile.from_samples`, and after the last sample the
+        motion continues at the velocity of that sample. The motion goes from
+        the position and velocity at ``start_tai`` to the first sample after
+        ``start_tai``, so samples in the past are ignored. If a trajectory
+        is being followed already, its samples before the first new sample
+        are kept and the later ones are replaced, so a long trajectory can be
+        sent in chunks. The acceleration and jerk are not limited, since they
+        follow from the samples.
+
+        Parameters
+        ----------
+        start_tai: `float`
+            The TAI time, unix seconds, at which the command was issued. To
+            model the real dome, this should be the current time. However, for
+            unit tests it can be convenient to use other values.
+        tai: `list` [`float`]
+            The TAI times, unix seconds, of the samples, in increasing order.
+        position: `list` [`float`]
+            The position [rad] at each sample.
+        velocity: `list` [`float`]
+            The velocity [rad/s] at each sample.
+
+        Returns
+        -------
+        duration: `float`
+            The time [s] from ``start_tai`` until the last sample.
+
+        Raises
+        ------
+        ValueError
+            If the lengths of the lists differ, if the times are not
+            increasing, if no sample is after ``start_tai``, if a position
+            falls outside the range [min position, max position] or if the
+            speed of a sample is larger than max_speed.
+        """
+        tai = np.asarray(tai, dtype=float)
+        position = np.asarray(position, dtype=float)
+        velocity = np.asarray(velocity, dtype=float)
+        if not len(tai) == len(position) == len(velocity):
+            raise ValueError(
+                f"The lengths {len(tai)}, {len(position)} and {len(velocity)} "
+                "of tai, position and velocity differ."
+            )
+        if np.any(np.diff(tai) <= 0):
+            raise ValueError("The sample times are not increasing.")
+        if len(tai) == 0 or tai[-1] <= start_tai:
+            raise ValueError(f"No sample is after the start TAI {start_tai}.")
+        if np.any((position < self._min_position) | (position > self._max_position)):
+            raise ValueError(
+                f"A position of the trajectory is outside of the range "
+                f"[{self._min_position, self._max_position}]"
+            )
+        if np.any(np.fabs(velocity) > self._max_speed):
+            raise ValueError(
+                f"A speed of the trajectory is larger than the max speed "
+                f"{self._max_speed}."
+            )
+
+        start_velocity = self._update_start_position(start_tai)
+        if self._trajectory is not None:
+            # Keep the samples of the trajectory that is being followed until
+            # the first new sample.
+            old_tai, old_position, old_velocity = self._trajectory
+            keep = old_tai < tai[0]
+            tai = np.append(old_tai[keep], tai)
+            position = np.append(old_position[keep], position)
+            velocity = np.append(old_velocity[keep], velocity)
+        future = tai > start_tai
+        tai = np.append(start_tai, tai[future])
+        position = np.append(self._start_position, position[future])
+        velocity = np.append(start_velocity, velocity[future])
+        # Unwrap the positions, so the motion between two samples goes the
+        # shortest way around, like `_get_distance` does.
+        distance = np.diff(position)
+        distance = np.where(
+            (distance < -math.pi) | (distance >= math.pi),
+            np.remainder(distance + math.pi, 2 * math.pi) - math.pi,
+            distance,
+        )
+        position = position[0] + np.append(0.0, np.cumsum(distance))
+
+        self._commanded_motion_state = MotionState.CRAWLING
+        self._start_tai = start_tai
+        self._end_tai = float(tai[-1])
+        self._end_position = float(position[-1])
+        self._crawl_velocity = float(velocity[-1])
+        self._profile = MotionProfile.from_samples(tai, position, velocity)
+        self._trajectory = (tai[1:], position[1:], velocity[1:])
+        return self._end_tai - start_tai
 
-    @abstractmethod
     def get_position_velocity_and_motion_state(self, tai):
+        """Computes the position and `MotionState` for the given TAI time.
+
+        Parameters
+        ----------
+        tai: `float`
+            The TAI time, unix seconds, for which to compute the position. To
+            model the real dome, this should be the current time. However, for
+            unit tests it can be convenient to use other values.
+
+        Returns
+        -------
+        position: `float`
+            The position [rad] at the given TAI time, taking both the move
+            (optional) and crawl velocities into account.
+        velocity: `float`
+            The velocity [rad/s] at the given TAI time.
+        motion_state: `MotionState`
+            The MotionState at the given TAI time.
+        """
+        (
+            positions,
+            velocities,
+            motion_states,
+        ) = self.get_positions_velocities_and_motion_states(np.array([tai]))
+        return (
+            float(positions[0]),
+            float(velocities[0]),
+            MotionState(motion_states[0]),
+        )
+
+    @abstractmethod
+    def get_positions_velocities_and_motion_states(self, tai):
+        """Computes the positions and `MotionState` codes for an array of TAI
+        times.
+
+        Parameters
+        ----------
+        tai: `numpy.ndarray`
+            The TAI times, unix seconds, for which to compute the positions.
+
+        Returns
+        -------
+        positions: `numpy.ndarray`
+            The positions [rad] at the given TAI times.
+        velocities: `numpy.ndarray`
+            The velocities [rad/s] at the given TAI times.
+        motion_states: `numpy.ndarray`
+            The `MotionState` values, as integers, at the given TAI times.
+
+        Raises
+        ------
+        ValueError
+            If a TAI time is before the start of the current move.
+        """
         pass
 
+    def next_transition_tai(self, tai):
+        """Determines when the `MotionState` next changes, if the motion
+        continues as commanded.
+
+        Parameters
+        ----------
+        tai: `float`
+            The TAI time, unix seconds, after which to look.
+
+        Returns
+        -------
+        transition_tai: `float` or None
+            The TAI time, unix seconds, of the next change of the
+            `MotionState`, or None if it doesn't change anymore.
+        """
+        if tai >= self._end_tai:
+            return None
+        _, _, motion_states = self.get_positions_velocities_and_motion_states(
+            np.array([tai, self._end_tai])
+        )
+        if motion_states[0] == motion_states[1]:
+            return None
+        return self._end_tai
+
     @abstractmethod
     def stop(self, start_tai):
         pass
@@ -24,9 +24,10 @@ __all__ = ["ElevationMotion"]
 import logging
 import math
 
+import numpy as np
+
 from .base_llc_motion import BaseLlcMotion
 from lsst.ts.idl.enums.MTDome import MotionState
-import lsst.ts.salobj as salobj
 
 
 class ElevationMotion(BaseLlcMotion):
@@ -47,6 +48,12 @@ class ElevationMotion(BaseLlcMotion):
         The current TAI time, unix seconds. To  model the real dome, this
         should be the current time. However, for unit tests it can be
         convenient to use other values.
+    max_acceleration: `float` or None
+        The maximum allowed acceleration [rad/s^2], or None to change the
+        velocity instantaneously.
+    max_jerk: `float` or None
+        The maximum allowed jerk [rad/s^3], or None to change the velocity
+        instantaneously.
 
     Notes
     -----
@@ -55,12 +62,21 @@ class ElevationMotion(BaseLlcMotion):
     handles the min_position and max_position boundaries by stopping there.
     When either moving or crawling, a new move or crawl command is handled and
     the elevation motion/crawl can be stopped. To "park" the light and wind
-    screen, it needs to be moved to min_position.
+    screen, it needs to be moved to min_position. If the maximum acceleration
+    and jerk are set, all velocity changes follow an S-curve profile, see
+    `MotionProfile`.
 
     """
 
     def __init__(
-        self, start_position, min_position, max_position, max_speed, start_tai
+        self,
+        start_position,
+        min_position,
+        max_position,
+        max_speed,
+        start_tai,
+        max_acceleration=None,
+        max_jerk=None,
     ):
         super().__init__(
             start_position=start_position,
@@ -68,79 +84,111 @@ class ElevationMotion(BaseLlcMotion):
             max_position=max_position,
             max_speed=max_speed,
             start_tai=start_tai,
+            max_acceleration=max_acceleration,
+            max_jerk=max_jerk,
         )
         self.log = logging.getLogger("MockPointToPointActuator")
 
-    def get_position_velocity_and_motion_state(self, tai):
-        """Computes the position and `MotionState` for the given TAI time.
+    def get_positions_velocities_and_motion_states(self, tai):
+        """Computes the positions and `MotionState` codes for an array of TAI
+        times.
 
         Parameters
         ----------
-        tai: `float`
-            The TAI time, unix seconds, for which to compute the position. To
-            model the real dome, this should be the current time. However, for
-            unit tests it can be convenient to use other values.
+        tai: `numpy.ndarray`
+            The TAI times, unix seconds, for which to compute the positions.
+            To model the real dome, these should be current times. However,
+            for unit tests it can be convenient to use other values.
 
         Returns
         -------
-        position: `float`
-            The position [rad] at the given TAI time, taking both the move
+        positions: `numpy.ndarray`
+            The positions [rad] at the given TAI times, taking both the move
             (optional) and crawl velocities into account.
-        velocity: `float`
-            The velocity [rad/s] at the given TAI time.
-        motion_state: `MotionState`
-            The MotionState at the given TAI time.
+        velocities: `numpy.ndarray`
+            The velocities [rad/s] at the given TAI times.
+        motion_states: `numpy.ndarray`
+            The `MotionState` values, as integers, at the given TAI times.
+
+        Raises
+        ------
+        ValueError
+            If a TAI time is before the start of the current move.
         """
-        if tai >= self._end_tai:
-            if self._commanded_motion_state in [
-                MotionState.STOPPING,
-                MotionState.STOPPED,
-                MotionState.MOVING,
-            ]:
-                motion_state = MotionState.STOPPED
-                position = self._end_position
-                velocity = 0
-            else:
-                diff_since_crawl_started = tai - self._end_tai
-                position = (
-                    self._start_position
-                    + self._crawl_velocity * diff_since_crawl_started
-                )
-                motion_state = MotionState.CRAWLING
-                velocity = self._crawl_velocity
-                if position >= self._max_position:
-                    position = self._max_position
-                    motion_state = MotionState.STOPPED
-                    velocity = 0
-                elif position <= self._min_position:
-                    position = self._min_position
-                    motion_state = MotionState.STOPPED
-                    velocity = 0
-                if self._crawl_velocity == 0:
-                    motion_state = MotionState.STOPPED
-                    velocity = 0
-        elif tai < self._start_tai:
+        tai = np.asarray(tai, dtype=float)
+        if np.any(tai < self._start_tai):
             raise ValueError(
-                f"Encountered TAI {tai} which is smaller than start TAI {self._start_tai}"
+                f"Encountered TAI {tai.min()} which is smaller than start TAI "
+                f"{self._start_tai}"
             )
+
+        positions, velocities = self._profile.evaluate(tai)
+
+        # The motion state during the motion and once it is done.
+        if self._commanded_motion_state in [
+            MotionState.STOPPING,
+            MotionState.STOPPED,
+        ]:
+            moving_motion_state = MotionState.STOPPING
+            done_motion_state = MotionState.STOPPED
         else:
-            frac_time = (tai - self._start_tai) / (self._end_tai - self._start_tai)
-            distance = self._get_distance()
-            position = self._start_position + distance * frac_time
-            velocity = self._max_speed
-            if distance < 0:
-                velocity = -self._max_speed
-            if self._commanded_motion_state == MotionState.STOPPING:
-                motion_state = MotionState.STOPPED
-                velocity = 0
-            else:
-                motion_state = MotionState.MOVING
-
-        position = salobj.angle_wrap_nonnegative(math.degrees(position)).rad
-        return position, velocity, motion_state
+            moving_motion_state = self._commanded_motion_state
+            done_motion_state = MotionState.STOPPED
+            if (
+                self._commanded_motion_state == MotionState.CRAWLING
+                and self._crawl_velocity != 0
+            ):
+                done_motion_state = MotionState.CRAWLING
+        motion_states = np.where(
+            tai < self._end_tai, int(moving_motion_state), int(done_motion_state)
+        )
+
+        # The motion stops at the position limits.
+        at_limit = ((positions >= self._max_position) & (velocities > 0)) | (
+            (positions <= self._min_position) & (velocities < 0)
+        )
+        positions = np.clip(positions, self._min_position, self._max_position)
+        velocities = np.where(at_limit, 0.0, velocities)
+        motion_states = np.where(at_limit, int(MotionState.STOPPED), motion_states)
+
+        positions = np.remainder(positions, 2 * math.pi)
+        return positions, velocities, motion_states
+
+    def next_transition_tai(self, tai):
+        """Determines when the `MotionState` next changes, if the motion
+        continues as commanded.
+
+        Besides at the end of a move or of a change of the crawl velocity, the
+        `MotionState` changes when the light and wind screen reaches a
+        position limit.
+
+        Parameters
+        ----------
+        tai: `float`
+            The TAI time, unix seconds, after which to look.
+
+        Returns
+        -------
+        transition_tai: `float` or None
+            The TAI time, unix seconds, of the next change of the
+            `MotionState`, or None if it doesn't change anymore.
+        """
+        transition_tais = [
+            super().next_transition_tai(tai),
+            self._profile.get_crossing_tai(self._max_position, tai, direction=1),
+            self._profile.get_crossing_tai(self._min_position, tai, direction=-1),
+        ]
+        transition_tais = [
+            transition_tai
+            for transition_tai in transition_tais
+            if transition_tai is not None
+        ]
+        if not transition_tais:
+            return None
+        return min(transition_tais)
 
     def stop(self, start_tai):
-        """Stops the current motion instantaneously.
+        """Stops the current motion.
 
         Parameters
         ----------
@@ -149,14 +197,7 @@ class ElevationMotion(BaseLlcMotion):
             model the real dome, this should be the current time. However, for
             unit tests it can be convenient to use other values.
         """
-        position, velocity, motion_state = self.get_position_velocity_and_motion_state(
-            tai=start_tai
-        )
-        self._start_tai = start_tai
-        self._start_position = position
-        self._end_position = position
-        self._crawl_velocity = 0
-        self._commanded_motion_state = MotionState.STOPPING
+        self._stop_motion(start_tai=start_tai, motion_state=MotionState.STOPPING)
 
     def park(self, start_tai):
         """Not used for the elevation motion.
@@ -0,0 +1,480 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["MotionProfile"]
+
+import math
+
+import numpy as np
+
+# The number of bisection steps to find the peak velocity of a move that is
+# too short to reach the maximum speed and that doesn't start and end at rest,
+# which is enough for double precision.
+_NUM_BISECTION_STEPS = 64
+
+
+def _velocity_change_phases(start_velocity, end_velocity, max_acceleration, max_jerk):
+    """Determine the phases of a jerk and acceleration limited change of
+    velocity.
+
+    The acceleration ramps up at maximum jerk, stays at maximum acceleration
+    if the velocity change is large enough and ramps down again at maximum
+    jerk.
+
+    Parameters
+    ----------
+    start_velocity: `float`
+        The velocity [rad/s] at the start.
+    end_velocity: `float`
+        The velocity [rad/s] at the end.
+    max_acceleration: `float`
+        The maximum acceleration [rad/s^2].
+    max_jerk: `float`
+        The maximum jerk [rad/s^3].
+
+    Returns
+    -------
+    phases: `list` [`tuple`]
+        The (duration [s], jerk [rad/s^3]) of the phases.
+    """
+    velocity_change = end_velocity - start_velocity
+    if velocity_change == 0:
+        return []
+    jerk = math.copysign(max_jerk, velocity_change)
+    velocity_change = math.fabs(velocity_change)
+    if velocity_change * max_jerk >= max_acceleration ** 2:
+        jerk_duration = max_acceleration / max_jerk
+        acceleration_duration = velocity_change / max_acceleration - jerk_duration
+    else:
+        # The maximum acceleration is not reached.
+        jerk_duration = math.sqrt(velocity_change / max_jerk)
+        acceleration_duration = 0
+    return [(jerk_duration, jerk), (acceleration_duration, 0), (jerk_duration, -jerk)]
+
+
+def _velocity_change_distance(start_velocity, end_velocity, max_acceleration, max_jerk):
+    """Determine the distance covered by a jerk and acceleration limited
+    change of velocity.
+
+    The velocity profile is symmetric around its middle, so the distance is
+    the mean velocity times the duration.
+
+    Parameters
+    ----------
+    start_velocity: `float`
+        The velocity [rad/s] at the start.
+    end_velocity: `float`
+        The velocity [rad/s] at the end.
+    max_acceleration: `float`
+        The maximum acceleration [rad/s^2].
+    max_jerk: `float`
+        The maximum jerk [rad/s^3].
+
+    Returns
+    -------
+    distance: `float`
+        The distance [rad].
+    """
+    duration = sum(
+        duration
+        for duration, _ in _velocity_change_phases(
+            start_velocity, end_velocity, max_acceleration, max_jerk
+        )
+    )
+    return (start_velocity + end_velocity) / 2 * duration
+
+
+def _rest_to_rest_peak_velocity(distance, max_acceleration, max_jerk):
+    """Determine the peak velocity of a jerk and acceleration limited move
+    from rest to rest that is too short to reach the maximum speed.
+
+    Both changes of velocity cover half of the distance. If the maximum
+    acceleration is reached, the peak velocity solves a quadratic equation,
+    otherwise a cubic equation with only a cube term.
+
+    Parameters
+    ----------
+    distance: `float`
+        The distance [rad] to move.
+    max_acceleration: `float`
+        The maximum acceleration [rad/s^2].
+    max_jerk: `float`
+        The maximum jerk [rad/s^3].
+
+    Returns
+    -------
+    peak_velocity: `float`
+        The peak velocity [rad/s], with the sign of the distance.
+    """
+    jerk_duration = max_acceleration / max_jerk
+    if math.fabs(distance) >= 2 * max_acceleration * jerk_duration ** 2:
+        peak_speed = (
+            max_acceleration
+            / 2
+            * (
+                math.sqrt(
+                    jerk_duration ** 2 + 4 * math.fabs(distance) / max_acceleration
+                )
+                - jerk_duration
+            )
+        )
+    else:
+        peak_speed = (distance ** 2 * max_jerk / 4) ** (1 / 3)
+    return math.copysign(peak_speed, distance)
+
+
+class MotionProfile:
+    """A motion profile made of segments of constant jerk.
+
+    The profile is stored as a table with the start time, position,
+    velocity, acceleration and jerk of each segment, so the position at any
+    time is found by a binary search for the segment followed by the
+    evaluation of a cubic polynomial. The last segment lasts forever. Use
+    `plan_velocity_change` or `plan_move` to construct a profile.
+
+    Parameters
+    ----------
+    start_tai: `float`
+        The TAI time, unix seconds, of the start of the profile.
+    position: `float`
+        The position [rad] at the start.
+    velocity: `float`
+        The velocity [rad/s], which is kept constant.
+    """
+
+    def __init__(self, start_tai, position, velocity):
+        self.tai = np.array([start_tai], dtype=float)
+        self.position = np.array([position], dtype=float)
+        self.velocity = np.array([velocity], dtype=float)
+        self.acceleration = np.zeros(1)
+        self.jerk = np.zeros(1)
+
+    @classmethod
+    def from_phases(cls, start_tai, position, velocity, phases, end_velocity):
+        """Make a profile from phases of constant jerk.
+
+        Parameters
+        ----------
+        start_tai: `float`
+            The TAI time, unix seconds, of the start of the profile.
+        position: `float`
+            The position [rad] at the start.
+        velocity: `float`
+            The velocity [rad/s] at the start.
+        phases: `list` [`tuple`]
+            The (duration [s], jerk [rad/s^3]) of each phase. Phases without
+            duration are skipped.
+        end_velocity: `float`
+            The velocity [rad/s] at the end of the phases, which is kept
+            constant after that.
+
+        Returns
+        -------
+        profile: `MotionProfile`
+            The profile.
+        """
+        rows = []
+        tai = start_tai
+        acceleration = 0.0
+        for duration, jerk in phases:
+            if duration <= 0:
+                continue
+            rows.append((tai, position, velocity, acceleration, jerk))
+            position += duration * (
+                velocity + duration * (acceleration / 2 + duration * jerk / 6)
+            )
+            velocity += duration * (acceleration + duration * jerk / 2)
+            acceleration += duration * jerk
+            tai += duration
+        rows.append((tai, position, end_velocity, 0.0, 0.0))
+        profile = cls(start_tai, position, end_velocity)
+        (
+            profile.tai,
+            profile.position,
+            profile.velocity,
+            profile.acceleration,
+            profile.jerk,
+        ) = np.array(rows).T.copy()
+        return profile
+
+    @classmethod
+    def from_samples(cls, tai, position, velocity):
+        """Make a profile that goes through samples of the position and
+        velocity.
+
+        Between two samples the position follows the cubic polynomial that
+        matches the position and velocity of both samples, which is a segment
+        of constant jerk. After the last sample the velocity of that sample
+        is kept constant.
+
+        Parameters
+        ----------
+        tai: `numpy.ndarray`
+            The TAI times, unix seconds, of the samples, in increasing order.
+        position: `numpy.ndarray`
+            The position [rad] at each sample.
+        velocity: `numpy.ndarray`
+            The velocity [rad/s] at each sample.
+
+        Returns
+        -------
+        profile: `MotionProfile`
+            The profile.
+        """
+        tai = np.asarray(tai, dtype=float)
+        position = np.asarray(position, dtype=float)
+        velocity = np.asarray(velocity, dtype=float)
+        duration = np.diff(tai)
+        mean_velocity = np.diff(position) / duration
+        jerk = 6 * (velocity[:-1] + velocity[1:] - 2 * mean_velocity) / duration ** 2
+        acceleration = np.diff(velocity) / duration - jerk * duration / 2
+        profile = cls(tai[0], position[0], velocity[0])
+        profile.tai = tai.copy()
+        profile.position = position.copy()
+        profile.velocity = velocity.copy()
+        profile.acceleration = np.append(acceleration, 0.0)
+        profile.jerk = np.append(jerk, 0.0)
+        return profile
+
+    @classmethod
+    def plan_velocity_change(
+        cls,
+        start_tai,
+        position,
+        velocity,
+        end_velocity,
+        max_acceleration=None,
+        max_jerk=None,
+    ):
+        """Plan a change of velocity, after which the velocity is kept
+        constant.
+
+        Parameters
+        ----------
+        start_tai: `float`
+            The TAI time, unix seconds, of the start of the change.
+        position: `float`
+            The position [rad] at the start.
+        velocity: `float`
+            The velocity [rad/s] at the start.
+        end_velocity: `float`
+            The velocity [rad/s] to change to.
+        max_acceleration: `float` or None
+            The maximum acceleration [rad/s^2], or None to change the
+            velocity instantaneously.
+        max_jerk: `float` or None
+            The maximum jerk [rad/s^3], or None to change the velocity
+            instantaneously.
+
+        Returns
+        -------
+        profile: `MotionProfile`
+            The profile.
+        duration: `float`
+            The duration [s] of the change of velocity.
+        """
+        if max_acceleration is None or max_jerk is None:
+            return cls(start_tai, position, end_velocity), 0.0
+        phases = _velocity_change_phases(
+            velocity, end_velocity, max_acceleration, max_jerk
+        )
+        profile = cls.from_phases(start_tai, position, velocity, phases, end_velocity)
+        return profile, sum(duration for duration, _ in phases)
+
+    @classmethod
+    def plan_move(
+        cls,
+        start_tai,
+        position,
+        velocity,
+        distance,
+        end_velocity,
+        max_speed,
+        max_acceleration=None,
+        max_jerk=None,
+    ):
+        """Plan a move over a distance, after which the velocity is kept
+        constant.
+
+        If the acceleration and jerk are limited, the profile is a seven
+        segment S-curve: the velocity changes to a peak velocity, which is
+        kept for as long as needed to cover the distance, and then changes to
+        the end velocity. If the distance is too short to reach the maximum
+        speed, the peak velocity is lower, and it even may have the opposite
+        sign of the distance if the start velocity is too high to arrive at
+        the end velocity in time, in which case the move overshoots and comes
+        back. If the acceleration and jerk are not limited, the move is made
+        at the maximum speed.
+
+        Parameters
+        ----------
+        start_tai: `float`
+            The TAI time, unix seconds, of the start of the move.
+        position: `float`
+            The position [rad] at the start.
+        velocity: `float`
+            The velocity [rad/s] at the start. Ignored if the acceleration
+            and jerk are not limited.
+        distance: `float`
+            The distance [rad] to move.
+        end_velocity: `float`
+            The velocity [rad/s] at the end of the move.
+        max_speed: `float`
+            The maximum speed [rad/s].
+        max_acceleration: `float` or None
+            The maximum acceleration [rad/s^2], or None to move at the
+            maximum speed all the way.
+        max_jerk: `float` or None
+            The maximum jerk [rad/s^3], or None to move at the maximum speed
+            all the way.
+
+        Returns
+        -------
+        profile: `MotionProfile`
+            The profile.
+        duration: `float`
+            The duration [s] of the move.
+        """
+        if max_acceleration is None or max_jerk is None:
+            duration = math.fabs(distance) / max_speed
+            velocity = math.copysign(max_speed, distance)
+            phases = [(duration, 0)]
+        else:
+
+            def get_distance(peak_velocity):
+                return _velocity_change_distance(
+                    velocity, peak_velocity, max_acceleration, max_jerk
+                ) + _velocity_change_distance(
+                    peak_velocity, end_velocity, max_acceleration, max_jerk
+                )
+
+            # The distance covered without cruising increases with the peak
+            # velocity. From rest to rest the peak velocity that covers the
+            # distance exactly has a closed form. Otherwise the distance is
+            # the sum of two different square root or quadratic terms, so the
+            # peak velocity is found by bisection.
+            cruise_duration = 0
+            if distance >= get_distance(max_speed):
+                peak_velocity = max_speed
+                cruise_duration = (distance - get_distance(max_speed)) / max_speed
+            elif distance <= get_distance(-max_speed):
+                peak_velocity = -max_speed
+                cruise_duration = (get_distance(-max_speed) - distance) / max_speed
+            elif velocity == 0 and end_velocity == 0:
+                peak_velocity = _rest_to_rest_peak_velocity(
+                    distance, max_acceleration, max_jerk
+                )
+            else:
+                low, high = -max_speed, max_speed
+                for _ in range(_NUM_BISECTION_STEPS):
+                    peak_velocity = (low + high) / 2
+                    if get_distance(peak_velocity) < distance:
+                        low = peak_velocity
+                    else:
+                        high = peak_velocity
+            phases = (
+                _velocity_change_phases(
+                    velocity, peak_velocity, max_acceleration, max_jerk
+                )
+                + [(cruise_duration, 0)]
+                + _velocity_change_phases(
+                    peak_velocity, end_velocity, max_acceleration, max_jerk
+                )
+            )
+            duration = sum(phase_duration for phase_duration, _ in phases)
+        profile = cls.from_phases(start_tai, position, velocity, phases, end_velocity)
+        # Avoid the accumulation of rounding errors in the end position.
+        profile.position[-1] = position + distance
+        return profile, duration
+
+    @property
+    def end_tai(self):
+        """The TAI time, unix seconds, of the start of the last segment."""
+        return self.tai[-1]
+
+    def evaluate(self, tai):
+        """Compute the positions and velocities at an array of TAI times.
+
+        Parameters
+        ----------
+        tai: `numpy.ndarray`
+            The TAI times, unix seconds. TAI times before the start of the
+            profile are extrapolated from the first segment.
+
+        Returns
+        -------
+        positions: `numpy.ndarray`
+            The positions [rad].
+        velocities: `numpy.ndarray`
+            The velocities [rad/s].
+        """
+        index = np.maximum(np.searchsorted(self.tai, tai, side="right") - 1, 0)
+        dt = tai - self.tai[index]
+        velocity = self.velocity[index]
+        acceleration = self.acceleration[index]
+        jerk = self.jerk[index]
+        positions = self.position[index] + dt * (
+            velocity + dt * (acceleration / 2 + dt * jerk / 6)
+        )
+        velocities = velocity + dt * (acceleration + dt * jerk / 2)
+        return positions, velocities
+
+    def get_crossing_tai(self, position, tai, direction):
+        """Determine when the profile next reaches a position.
+
+        Parameters
+        ----------
+        position: `float`
+            The position [rad].
+        tai: `float`
+            The TAI time, unix seconds, after which to look.
+        direction: `int`
+            1 to only consider reaching the position while moving in positive
+            direction, -1 for negative direction.
+
+        Returns
+        -------
+        crossing_tai: `float` or None
+            The first TAI time, unix seconds, after ``tai`` at which the
+            position is reached, or None if it never is.
+        """
+        end_tais = np.append(self.tai[1:], math.inf)
+        for i in range(np.searchsorted(self.tai, tai, side="right") - 1, len(self.tai)):
+            if i < 0 or end_tais[i] <= tai:
+                continue
+            roots = np.roots(
+                [
+                    self.jerk[i] / 6,
+                    self.acceleration[i] / 2,
+                    self.velocity[i],
+                    self.position[i] - position,
+                ]
+            )
+            for dt in sorted(roots[np.isreal(roots)].real):
+                crossing_tai = self.tai[i] + dt
+                if not tai < crossing_tai < end_tais[i]:
+                    continue
+                velocity = self.velocity[i] + dt * (
+                    self.acceleration[i] + dt * self.jerk[i] / 2
+                )
+                if velocity * direction > 0:
+                    return crossing_tai
+        return None
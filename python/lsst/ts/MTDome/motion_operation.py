@@ -0,0 +1,118 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["MotionOperation"]
+
+import asyncio
+
+
+class MotionOperation:
+    """A motion command of a lower level component that is in flight, i.e.
+    that was accepted by the controller but of which the motion hasn't
+    completed yet.
+
+    The operation completes when a status of the lower level component
+    reports one of the target motion states. The lower level component may
+    already be in a target state when the command is accepted, e.g. STOPPED
+    before a move starts, so a target state only completes the operation
+    after another motion state has been reported or once the expected end of
+    the motion has passed. All times are TAI times of the CSC, because the
+    timestamps of the statuses come from the clock of the controller.
+
+    Parameters
+    ----------
+    llc_name: `LlcName`
+        The name of the lower level component.
+    command: `str`
+        The motion command.
+    target_states: `frozenset` [`MotionState`]
+        The motion states that the lower level component reports once the
+        motion has completed.
+    command_tai: `float`
+        The TAI time, unix seconds, at which the controller accepted the
+        command.
+    duration: `float`
+        The duration (sec) of the motion as estimated by the controller.
+    """
+
+    def __init__(self, llc_name, command, target_states, command_tai, duration):
+        self.llc_name = llc_name
+        self.command = command
+        self.target_states = target_states
+        self.command_tai = command_tai
+        self.expected_end_tai = command_tai + duration
+        # Whether a motion state other than the target states was reported
+        # since the command was accepted.
+        self.motion_seen = False
+        # The TAI time, unix seconds, at which the status that reported that
+        # the motion completed was received.
+        self.end_tai = None
+        # The future that is done when the motion has completed, with the
+        # motion state as result. It is cancelled if the operation is aborted.
+        self.done_future = asyncio.Future()
+        # The task that checks the status at the expected end of the motion.
+        self.check_task = None
+
+    def update(self, motion_state, tai):
+        """Compare a status of the lower level component with the target
+        states.
+
+        Parameters
+        ----------
+        motion_state: `MotionState`
+            The reported motion state.
+        tai: `float`
+            The TAI time, unix seconds, at which the status was received.
+
+        Returns
+        -------
+        completed: `bool`
+            True if the operation completed with this status.
+        """
+        if self.done_future.done():
+            return False
+        if motion_state not in self.target_states:
+            self.motion_seen = True
+            return False
+        if not self.motion_seen and tai < self.expected_end_tai:
+            return False
+        self.end_tai = tai
+        self.done_future.set_result(motion_state)
+        return True
+
+    def abort(self, exception=None):
+        """Abort the operation, for instance because another command for the
+        same lower level component was sent.
+
+        Parameters
+        ----------
+        exception: `Exception` or None
+            The exception to raise to code waiting for the operation, or None
+            to cancel it.
+        """
+        if self.check_task is not None:
+            self.check_task.cancel()
+        if self.done_future.done():
+            return
+        if exception is None:
+            self.done_future.cancel()
+        else:
+            self.done_future.set_exception(exception)
@@ -22,29 +22,96 @@
 __all__ = ["MTDomeCsc"]
 
 import asyncio
+import functools
 import math
 import pathlib
+import random
+import time
+
+import numpy as np
 
 from .llc_configuration_limits import AmcsLimits, LwscsLimits
 from .llc_name import LlcName
 from lsst.ts import salobj
 from lsst.ts.MTDome import encoding_tools
+from .azimuth_tracker import AzimuthTracker
+from .command_coalescer import CommandCoalescer
+from .controller_connection import ControllerConnection, HIGH_PRIORITY, NORMAL_PRIORITY
 from .mock_controller import MockMTDomeController
+from .motion_operation import MotionOperation
 from .response_code import ResponseCode
+from .status_scheduler import StatusScheduler
 from lsst.ts.idl.enums.MTDome import EnabledState, MotionState
 
 _LOCAL_HOST = "127.0.0.1"
 _TIMEOUT = 20  # timeout in s to be used by this module
 # DM-26653: Added "positionError" since this key is still under discussion.
-_KEYS_TO_REMOVE = {"status", "positionError"}
+_KEYS_TO_REMOVE = {"status", "positionError", "timeToTransition"}
 _KEYS_IN_RADIANS = {"positionError", "positionActual", "positionCommanded"}
-
-_AMCS_STATUS_PERIOD = 0.2
-_APsCS_STATUS_PERIOD = 2.0
-_LCS_STATUS_PERIOD = 2.0
-_LWSCS_STATUS_PERIOD = 2.0
-_MONCS_STATUS_PERIOD = 2.0
-_THCS_STATUS_PERIOD = 2.0
+# The minimum and maximum time (sec) to wait before trying to reconnect after
+# the connection to the controller was lost.
+_RECONNECT_MIN_BACKOFF = 0.5
+_RECONNECT_MAX_BACKOFF = 30.0
+
+# The commands that are sent on the telemetry connection. All other commands
+# are sent on the control connection.
+_TELEMETRY_COMMANDS = frozenset(
+    (
+        "statusAMCS",
+        "statusApSCS",
+        "statusLCS",
+        "statusLWSCS",
+        "statusMonCS",
+        "statusThCS",
+        "statusAll",
+        "subscribe",
+        "setStatusDelta",
+    )
+)
+# The commands that jump ahead of all other commands waiting to be written.
+_STOP_COMMANDS = frozenset(("stop", "stopAz", "stopEl", "stopLouvers", "stopShutter"))
+# The motion commands that a stop command discards if they still are waiting
+# to be written, so the stopped axes don't start moving again right after
+# stopping. The CSC only uploads azimuth trajectories.
+_AZ_MOTION_COMMANDS = frozenset(("moveAz", "crawlAz", "moveAzEl", "trackTrajectory"))
+_EL_MOTION_COMMANDS = frozenset(("moveEl", "crawlEl", "moveAzEl"))
+_MOTION_COMMANDS_DISCARDED_BY_STOP = {
+    "stop": _AZ_MOTION_COMMANDS | _EL_MOTION_COMMANDS,
+    "stopAz": _AZ_MOTION_COMMANDS,
+    "stopEl": _EL_MOTION_COMMANDS,
+}
+# The motion states in which the status of AMCS and LWSCS is polled at the
+# moving status period instead of the normal status period.
+_MOVING_STATES = frozenset(
+    (
+        MotionState.CRAWLING,
+        MotionState.MOVING,
+        MotionState.PARKING,
+        MotionState.STOPPING,
+    )
+)
+# The azimuth motion states that are in position.
+_AZ_IN_POSITION_STATES = frozenset(
+    (MotionState.STOPPED, MotionState.CRAWLING, MotionState.PARKED,)
+)
+# The items of the AMCS and LWSCS status that are requested by the position
+# polls, which are merged into the last full status.
+_POSITION_STATUS_FIELDS = {
+    LlcName.AMCS: [
+        "status",
+        "positionActual",
+        "velocityActual",
+        "timeToTransition",
+        "timestampUTC",
+    ],
+    LlcName.LWSCS: [
+        "status",
+        "positionActual",
+        "velocityActual",
+        "timeToTransition",
+        "timestampUTC",
+    ],
+}
 
 
 class MTDomeCsc(salobj.ConfigurableCsc):
@@ -91,8 +158,23 @@ class MTDomeCsc(salobj.ConfigurableCsc):
             .joinpath("schema", "MTDome.yaml")
         )
 
-        self.reader = None
-        self.writer = None
+        # The connection for the motion and configuration commands and the
+        # connection for the status commands. If not configured to use
+        # separate connections, they are the same connection. They are
+        # created when connecting.
+        self.control_connection = None
+        self.telemetry_connection = None
+        # The host and port of the controller, set when connecting.
+        self.controller_host = None
+        self.controller_port = None
+        # The task reconnecting after the connection was lost.
+        self.reconnect_task = salobj.make_done_future()
+        # The number of reconnects and the time (sec) from losing the
+        # connection until polling the status again, of the last and the
+        # slowest reconnect.
+        self.num_reconnects = 0
+        self.last_reconnect_duration = None
+        self.max_reconnect_duration = None
         self.config = None
 
         self.mock_ctrl = None  # mock controller, or None if not constructed
@@ -109,10 +191,53 @@ class MTDomeCsc(salobj.ConfigurableCsc):
 
         # Keep the lower level statuses in memory for unit tests.
         self.lower_level_status = {}
-        self.status_tasks = []
-
-        # Keep a lock so only one remote command can be executed at a time.
-        self.communication_lock = asyncio.Lock()
+        # The telemetry topic for each lower level component.
+        self.llc_topics = {
+            LlcName.AMCS: self.tel_azimuth,
+            LlcName.APSCS: self.tel_apertureShutter,
+            LlcName.LCS: self.tel_louvers,
+            LlcName.LWSCS: self.tel_lightWindScreen,
+            LlcName.MONCS: self.tel_interlocks,
+            LlcName.THCS: self.tel_thermal,
+        }
+        # The scheduler polling the status of the lower level components,
+        # created when starting the status tasks.
+        self.status_scheduler = None
+        # The timer handle of the status poll at the next motion state
+        # transition of AMCS and LWSCS, by `LlcName`, see
+        # `schedule_transition_poll`.
+        self.transition_poll_handles = {}
+
+        # The last full status of each lower level component received, by
+        # name, into which status deltas get merged.
+        self.status_cache = {}
+        # The lower level components of which the controller pushes the
+        # status.
+        self.status_subscriptions = set()
+        # The number of validation failures that has been reported.
+        self.num_reported_validation_failures = 0
+
+        # The coalescers of the motion commands of each axis, which are used
+        # if configured to coalesce motion commands.
+        self.motion_coalescers = {
+            axis: CommandCoalescer(axis, self.write_then_read_reply, self.log)
+            for axis in ("az", "el")
+        }
+        # The tracker of the azimuth trajectory that the dome follows, or None
+        # if not tracking.
+        self.azimuth_tracker = None
+        # The task sending the command computed by the tracker.
+        self.tracking_task = salobj.make_done_future()
+        # The TAI time, unix seconds, at which the reply to the last tracking
+        # command was received. AMCS statuses that were requested earlier are
+        # ignored by the tracker.
+        self.tracking_command_tai = -math.inf
+        # The task uploading the azimuth trajectory that the dome follows in
+        # chunks, if configured to upload trajectories.
+        self.trajectory_upload_task = salobj.make_done_future()
+        # The motion commands that are in flight, by the name of the lower
+        # level component.
+        self.motion_operations = {}
 
         self.amcs_limits = AmcsLimits()
         self.lwscs_limits = LwscsLimits()
@@ -137,10 +262,14 @@ class MTDomeCsc(salobj.ConfigurableCsc):
         else:
             host = self.config.host
             port = self.config.port
-        connect_coro = asyncio.open_connection(host=host, port=port)
-        self.reader, self.writer = await asyncio.wait_for(
-            connect_coro, timeout=self.config.connection_timeout
-        )
+        self.controller_host = host
+        self.controller_port = port
+        self.control_connection = ControllerConnection("control", self.log)
+        if self.config.separate_telemetry_connection:
+            self.telemetry_connection = ControllerConnection("telemetry", self.log)
+        else:
+            self.telemetry_connection = self.control_connection
+        await self.open_connections()
 
         # DM-26374: Send enabled events for az and el since they are always
         # enabled.
@@ -160,46 +289,487 @@ class MTDomeCsc(salobj.ConfigurableCsc):
 
         self.log.info("connected")
 
+    async def open_connections(self):
+        """Open the connections to the controller, start reading from them
+        and configure the wire format and status deltas.
+        """
+        for connection in self.connections:
+            await connection.connect(
+                host=self.controller_host,
+                port=self.controller_port,
+                timeout=self.config.connection_timeout,
+            )
+            connection.read_loop_task = asyncio.create_task(self.read_loop(connection))
+        if self.config.wire_format != encoding_tools.WireFormat.JSON.value:
+            for connection in self.connections:
+                await self.negotiate_wire_format(connection)
+        self.status_cache.clear()
+        if self.config.status_keyframe_interval > 0:
+            try:
+                await self.write_then_read_reply(
+                    command="setStatusDelta",
+                    keyframeInterval=self.config.status_keyframe_interval,
+                )
+            except (KeyError, ValueError, asyncio.TimeoutError):
+                self.log.warning(
+                    "The controller doesn't support status deltas so "
+                    "receiving full statuses instead."
+                )
+
+    def start_reconnecting(self):
+        """Start reconnecting to the controller, unless already doing so."""
+        if self.reconnect_task.done():
+            self.reconnect_task = asyncio.create_task(self.reconnect())
+
+    async def reconnect(self):
+        """Reconnect to the controller after a connection was lost.
+
+        Stop polling, close all connections and try to open them again, with a
+        random backoff time between attempts which doubles after each failed
+        attempt, up to a maximum. Once reconnected, get the status of all
+        lower level components at once and then resume polling. The summary
+        state doesn't change.
+
+        The motion commands that wait to be sent are discarded and those in
+        flight are aborted, since they may not have reached the controller.
+        """
+        lost_time = time.monotonic()
+        await self.cancel_status_tasks()
+        self.status_subscriptions.clear()
+        self.discard_pending_motion_commands("az", "el")
+        self.abort_motion_operations(
+            LlcName.AMCS,
+            LlcName.LWSCS,
+            exception=ConnectionError("The connection to the controller was lost."),
+        )
+        backoff = _RECONNECT_MIN_BACKOFF
+        num_attempts = 0
+        while True:
+            for connection in self.connections:
+                try:
+                    await connection.disconnect(timeout=_TIMEOUT)
+                except (OSError, asyncio.TimeoutError):
+                    pass
+            num_attempts += 1
+            try:
+                await self.open_connections()
+                break
+            except (OSError, asyncio.TimeoutError) as e:
+                delay = random.uniform(0.5, 1) * backoff
+                self.log.warning(
+                    f"Reconnect attempt {num_attempts} failed: {e!r}; retrying in "
+                    f"{delay:0.1f} sec."
+                )
+                await asyncio.sleep(delay)
+                backoff = min(backoff * 2, _RECONNECT_MAX_BACKOFF)
+        await self.resync_status()
+        await self.start_status_tasks()
+
+        duration = time.monotonic() - lost_time
+        self.num_reconnects += 1
+        self.last_reconnect_duration = duration
+        if (
+            self.max_reconnect_duration is None
+            or duration > self.max_reconnect_duration
+        ):
+            self.max_reconnect_duration = duration
+        self.log.info(
+            f"Reconnected to the controller in {duration:0.2f} sec after "
+            f"{num_attempts} attempts; {self.num_reconnects} reconnects so far."
+        )
+
+    async def resync_status(self):
+        """Get and publish the status of all lower level components at once.
+
+        The status is requested with a single statusAll command, or with all
+        individual status commands at the same time if the controller doesn't
+        support statusAll.
+        """
+        try:
+            try:
+                await self.statusAll()
+            except KeyError:
+                await asyncio.gather(
+                    self.statusAMCS(),
+                    self.statusApSCS(),
+                    self.statusLCS(),
+                    self.statusLWSCS(),
+                    self.statusMonCS(),
+                    self.statusThCS(),
+                )
+        except Exception:
+            self.log.exception("Could not resync the status after reconnecting.")
+
     async def cancel_status_tasks(self):
         """Cancel all status tasks."""
-        while self.status_tasks:
-            self.status_tasks.pop().cancel()
+        for handle in self.transition_poll_handles.values():
+            handle.cancel()
+        self.transition_poll_handles = {}
+        if self.status_scheduler is not None:
+            self.status_scheduler.stop()
+            self.log.info(
+                f"Status poll statistics: {self.status_scheduler.get_statistics()}"
+            )
+            self.status_scheduler = None
 
     async def start_status_tasks(self):
-        """Start all status tasks."""
+        """Start all status tasks.
+
+        If configured to do so, subscribe to the status of the lower level
+        components instead. If the controller doesn't support that, or if not
+        configured to subscribe, the status gets polled.
+
+        The status of each lower level component is polled by a
+        `StatusScheduler` at the period in the configuration. If configured to
+        do so, the status of all lower level components is polled with a
+        single statusAll command at the shortest of their periods instead. The
+        AMCS status is polled separately in any case, so the AMCS status in
+        the reply to statusAll is not published.
+
+        If configured to do so, the position of AMCS and LWSCS is polled as
+        well, at a shorter period than their full status, by requesting only
+        the items in the status that change fast. These get merged into the
+        last full status before it is published.
+
+        The statistics of the polls get logged at the configured statistics
+        interval while polling and when polling stops.
+        """
         await self.cancel_status_tasks()
-        for method, interval in (
-            (self.statusAMCS, _AMCS_STATUS_PERIOD),
-            (self.statusApSCS, _APsCS_STATUS_PERIOD),
-            (self.statusLCS, _LCS_STATUS_PERIOD),
-            (self.statusLWSCS, _LWSCS_STATUS_PERIOD),
-            (self.statusMonCS, _MONCS_STATUS_PERIOD),
-            (self.statusThCS, _THCS_STATUS_PERIOD),
+        if self.config.subscribe_to_status:
+            try:
+                await self.subscribe_to_status()
+                return
+            except (KeyError, ValueError, asyncio.TimeoutError):
+                self.log.warning(
+                    "The controller doesn't support status subscriptions so "
+                    "polling for the status instead."
+                )
+        status_periods = self.get_status_periods()
+        self.status_scheduler = StatusScheduler(
+            self.log, statistics_interval=self.config.status_statistics_interval
+        )
+        self.status_scheduler.add(
+            LlcName.AMCS.value, self.statusAMCS, status_periods[LlcName.AMCS]
+        )
+        if self.config.poll_status_all:
+            self.status_scheduler.add(
+                "All",
+                functools.partial(
+                    self.statusAll,
+                    [
+                        llc_name
+                        for llc_name in self.llc_topics
+                        if llc_name != LlcName.AMCS
+                    ],
+                ),
+                min(
+                    period
+                    for llc_name, period in status_periods.items()
+                    if llc_name != LlcName.AMCS
+                ),
+            )
+        else:
+            for llc_name, method in (
+                (LlcName.APSCS, self.statusApSCS),
+                (LlcName.LCS, self.statusLCS),
+                (LlcName.LWSCS, self.statusLWSCS),
+                (LlcName.MONCS, self.statusMonCS),
+                (LlcName.THCS, self.statusThCS),
+            ):
+                self.status_scheduler.add(
+                    llc_name.value, method, status_periods[llc_name]
+                )
+        for llc_name, period in self.get_position_periods().items():
+            if period > 0:
+                self.status_scheduler.add(
+                    f"{llc_name.value}Position",
+                    functools.partial(
+                        self.request_and_send_llc_status,
+                        llc_name,
+                        self.llc_topics[llc_name],
+                        _POSITION_STATUS_FIELDS[llc_name],
+                    ),
+                    period,
+                )
+        self.status_scheduler.start()
+
+    def get_status_periods(self):
+        """Get the configured status periods.
+
+        Returns
+        -------
+        status_periods: `dict`
+            The period (sec) at which to poll for the status of each lower
+            level component, by `LlcName`.
+        """
+        return {
+            LlcName.AMCS: self.config.amcs_status_period,
+            LlcName.APSCS: self.config.apscs_status_period,
+            LlcName.LCS: self.config.lcs_status_period,
+            LlcName.LWSCS: self.config.lwscs_status_period,
+            LlcName.MONCS: self.config.moncs_status_period,
+            LlcName.THCS: self.config.thcs_status_period,
+        }
+
+    def get_position_periods(self):
+        """Get the configured position periods.
+
+        Returns
+        -------
+        position_periods: `dict`
+            The period (sec) at which to poll for the position of AMCS and
+            LWSCS, by `LlcName`. 0 means that the position is not polled
+            separately from the full status.
+        """
+        return {
+            LlcName.AMCS: self.config.amcs_position_period,
+            LlcName.LWSCS: self.config.lwscs_position_period,
+        }
+
+    def set_status_period(self, llc_name, moving):
+        """Poll the status of a lower level component at the moving or normal
+        status period.
+
+        Only the status of AMCS and LWSCS, if polled separately, has a moving
+        status period. If their position is polled, the moving status period
+        applies to the position poll instead of to the full status poll. The
+        status period is logged when it changes.
+
+        Parameters
+        ----------
+        llc_name: `LlcName`
+            The name of the lower level component.
+        moving: `bool`
+            Poll at the moving status period if True, at the normal status
+            period otherwise.
+        """
+        moving_status_periods = {
+            LlcName.AMCS: self.config.amcs_moving_status_period,
+            LlcName.LWSCS: self.config.lwscs_moving_status_period,
+        }
+        poll_name = self.get_status_poll_name(llc_name)
+        if (
+            self.status_scheduler is None
+            or llc_name not in moving_status_periods
+            or poll_name not in self.status_scheduler.polls
+        ):
+            return
+        if moving:
+            period = moving_status_periods[llc_name]
+        elif poll_name == llc_name.value:
+            period = self.get_status_periods()[llc_name]
+        else:
+            period = self.get_position_periods()[llc_name]
+        if self.status_scheduler.polls[poll_name].period != period:
+            self.status_scheduler.set_period(poll_name, period)
+            self.log.info(
+                f"Polling the {llc_name.value} status every {period} sec since "
+                f"it is {'moving' if moving else 'not moving'}."
+            )
+
+    def is_moving(self, llc_name, motion_state):
+        """Determine whether a lower level component is moving, or has been
+        commanded to move, for the status period.
+
+        Right after a move command the lower level component may still report
+        that it is stopped, so a motion command that is in flight counts as
+        moving until it has completed.
+
+        Parameters
+        ----------
+        llc_name: `LlcName`
+            The name of the lower level component.
+        motion_state: `MotionState`
+            The motion state in the latest status.
+
+        Returns
+        -------
+        moving: `bool`
+            True if the lower level component is moving or has been commanded
+            to move.
+        """
+        return motion_state in _MOVING_STATES or llc_name in self.motion_operations
+
+    def poll_status_now(self, llc_name):
+        """Poll the status of a lower level component that was commanded to
+        move right away, and at the moving status period after that.
+
+        Parameters
+        ----------
+        llc_name: `LlcName`
+            The name of the lower level component.
+        """
+        self.set_status_period(llc_name, moving=True)
+        poll_name = self.get_status_poll_name(llc_name)
+        if (
+            self.status_scheduler is not None
+            and poll_name in self.status_scheduler.polls
+        ):
+            self.status_scheduler.poll_now(poll_name)
+
+    def schedule_transition_poll(self, llc_name, time_to_transition):
+        """Poll the status of a lower level component right after its motion
+        state changes, instead of up to one status period later.
+
+        The time until the transition is relative, so it doesn't depend on
+        the clock of the controller. If the poll turns out to be a bit early,
+        the status it returns schedules another one. Nothing is scheduled if
+        the status is not polled, since the controller then pushes the status
+        at the transition.
+
+        Parameters
+        ----------
+        llc_name: `LlcName`
+            The name of the lower level component.
+        time_to_transition: `float` or None
+            The time (sec) until the motion state changes, as reported in the
+            latest status, or None if it doesn't change anymore or if the
+            controller doesn't report it.
+        """
+        handle = self.transition_poll_handles.pop(llc_name, None)
+        if handle is not None:
+            handle.cancel()
+        poll_name = self.get_status_poll_name(llc_name)
+        if (
+            time_to_transition is None
+            or self.status_scheduler is None
+            or poll_name not in self.status_scheduler.polls
         ):
-            self.status_tasks.append(
-                asyncio.create_task(self.one_status_loop(method, interval))
+            return
+        loop = asyncio.get_running_loop()
+        self.transition_poll_handles[llc_name] = loop.call_later(
+            max(time_to_transition, 0), self.status_scheduler.poll_now, poll_name
+        )
+
+    def get_status_poll_name(self, llc_name):
+        """Get the name of the poll that follows the motion of a lower level
+        component.
+
+        Parameters
+        ----------
+        llc_name: `LlcName`
+            The name of the lower level component.
+
+        Returns
+        -------
+        poll_name: `str`
+            The name of the position poll if the position of the lower level
+            component is polled, the name of its status poll otherwise.
+        """
+        if self.get_position_periods().get(llc_name, 0) > 0:
+            return f"{llc_name.value}Position"
+        return llc_name.value
+
+    async def subscribe_to_status(self):
+        """Subscribe to the status of all lower level components.
+
+        The controller then pushes the status of each lower level component at
+        the same period at which it otherwise would be polled. The pushed
+        statuses are handled by `read_loop`. If subscribing to any of them
+        fails, the subscriptions that were accepted are cancelled again, so
+        the controller doesn't push the statuses that then get polled.
+
+        Raises
+        ------
+        KeyError
+            If the controller doesn't support the subscribe command.
+        """
+        accepted_llc_names = []
+        try:
+            for llc_name, period in self.get_status_periods().items():
+                # Add the subscription before sending the command so a status
+                # that gets pushed before the reply is read is handled
+                # correctly.
+                self.status_subscriptions.add(llc_name)
+                await self.write_then_read_reply(
+                    command="subscribe", system=llc_name.value, period=period
+                )
+                accepted_llc_names.append(llc_name)
+        except Exception:
+            # A period of 0 unsubscribes. The subscriptions are only forgotten
+            # afterwards, so a status that still gets pushed in the meantime
+            # isn't taken for a reply.
+            for llc_name in accepted_llc_names:
+                try:
+                    await self.write_then_read_reply(
+                        command="subscribe", system=llc_name.value, period=0
+                    )
+                except Exception:
+                    self.log.exception(
+                        f"Could not unsubscribe from the {llc_name.value} status."
+                    )
+            self.status_subscriptions.clear()
+            raise
+
+    async def negotiate_wire_format(self, connection):
+        """Ask the controller to send its replies on a connection in the
+        configured wire format, falling back to JSON.
+
+        The controller keeps the wire format per connection, so this is done
+        for each connection. This needs to be done before any other command is
+        sent on the connection, since the controller switches format right
+        after the reply. If the controller doesn't support the setWireFormat
+        command, JSON is used.
+
+        Parameters
+        ----------
+        connection: `ControllerConnection`
+            The connection to negotiate the wire format for.
+        """
+        supported_formats = [
+            wire_format.value
+            for wire_format in encoding_tools.get_supported_wire_formats()
+        ]
+        formats = [
+            wire_format
+            for wire_format in (self.config.wire_format, "json")
+            if wire_format in supported_formats
+        ]
+        try:
+            data = await connection.send_command(
+                "setWireFormat",
+                dict(formats=formats),
+                timeout=_TIMEOUT,
+                priority=NORMAL_PRIORITY,
+            )
+            self.check_reply("setWireFormat", data)
+        except (KeyError, ValueError, asyncio.TimeoutError):
+            self.log.warning(
+                "The controller doesn't support the setWireFormat command so "
+                f"using JSON on the {connection.name} connection instead."
             )
+        self.log.info(
+            f"Using wire format {connection.frame_reader.wire_format.value} on "
+            f"the {connection.name} connection."
+        )
 
     async def disconnect(self):
         """Disconnect from the TCP/IP controller, if connected, and stop the
         mock controller, if running.
         """
         self.log.info("disconnect")
+        self.reconnect_task.cancel()
 
         # Stop polling for the status of the lower level components
         # periodically.
         await self.cancel_status_tasks()
+        self.status_subscriptions.clear()
+
+        self.stop_tracking()
+        self.discard_pending_motion_commands("az", "el")
+        self.abort_motion_operations(LlcName.AMCS, LlcName.LWSCS)
+        if self.config is not None and self.config.coalesce_motion_commands:
+            statistics = {
+                axis: coalescer.get_statistics()
+                for axis, coalescer in self.motion_coalescers.items()
+            }
+            self.log.info(f"Motion command statistics: {statistics}")
 
-        writer = self.writer
-        self.reader = None
-        self.writer = None
-        await self.stop_mock_ctrl()
-        if writer:
-            try:
-                writer.write_eof()
-                await asyncio.wait_for(writer.drain(), timeout=_TIMEOUT)
-            finally:
-                writer.close()
+        try:
+            for connection in self.connections:
+                await connection.disconnect(timeout=_TIMEOUT)
+        finally:
+            await self.stop_mock_ctrl()
 
     async def start_mock_ctrl(self):
         """Start the mock controller.
@@ -237,7 +807,7 @@ class MTDomeCsc(salobj.ConfigurableCsc):
         """
         self.log.info(f"handle_summary_state {self.summary_state}")
         if self.disabled_or_enabled:
-            if not self.connected:
+            if not self.connected and self.reconnect_task.done():
                 await self.connect()
         else:
             await self.disconnect()
@@ -245,6 +815,16 @@ class MTDomeCsc(salobj.ConfigurableCsc):
     async def write_then_read_reply(self, command, **params):
         """Write the cmd string and then read the reply to the command.
 
+        The command gets a unique id which the controller echoes in the reply.
+        The reply is read by `read_loop`, which matches it to this command, so
+        other commands can be sent while waiting for the reply.
+
+        The status commands are sent on the telemetry connection and all other
+        commands on the control connection, so a status command never holds
+        up a motion command. The stop commands jump ahead of all other
+        commands that still need to be written and discard the motion
+        commands of the stopped axes that still need to be written.
+
         Parameters
         ----------
         command: `str`
@@ -259,29 +839,590 @@ class MTDomeCsc(salobj.ConfigurableCsc):
             TimeoutValue} where "response" can be zero for "OK" or non-zero
             for "ERROR".
         """
-        command_dict = dict(command=command, parameters=params)
-        st = encoding_tools.encode(**command_dict)
-        async with self.communication_lock:
-            self.log.debug(f"Sending command {st}")
-            self.writer.write(st.encode() + b"\r\n")
-            await self.writer.drain()
-            read_bytes = await asyncio.wait_for(
-                self.reader.readuntil(b"\r\n"), timeout=_TIMEOUT
+        if command in _TELEMETRY_COMMANDS:
+            connection = self.telemetry_connection
+        else:
+            connection = self.control_connection
+        priority = HIGH_PRIORITY if command in _STOP_COMMANDS else NORMAL_PRIORITY
+        self.discard_queued_motion_commands(connection, [command])
+        data = await connection.send_command(
+            command, params, timeout=_TIMEOUT, priority=priority
+        )
+        self.log.debug(f"Received reply {data}")
+        self.check_reply(command, data)
+        return data
+
+    async def write_then_read_batch(self, commands):
+        """Write several commands in one batch frame and then read the
+        replies to all of them in one reply.
+
+        The controller executes the commands in order and stops at the first
+        command that fails. This saves a round trip to the controller per
+        command, for instance when opening the dome for the night. The batch
+        is sent on the telemetry connection if it only contains status
+        commands and on the control connection otherwise, and it jumps ahead
+        of the other commands that still need to be written if it contains a
+        stop command, like `write_then_read_reply` does.
+
+        Parameters
+        ----------
+        commands: `list` [`tuple`]
+            The commands, as (command, params) with the name of the command
+            and a `dict` with its parameters, which may be empty.
+
+        Returns
+        -------
+        replies: `list` [`dict`]
+            The reply to each command, see `write_then_read_reply`.
+
+        Raises
+        ------
+        KeyError
+            If a command is unsupported.
+        ValueError
+            If a command contains an incorrect parameter. The commands after
+            it have not been executed.
+        """
+        names = [command for command, _ in commands]
+        if all(command in _TELEMETRY_COMMANDS for command in names):
+            connection = self.telemetry_connection
+        else:
+            connection = self.control_connection
+        priority = NORMAL_PRIORITY
+        if any(command in _STOP_COMMANDS for command in names):
+            priority = HIGH_PRIORITY
+        self.discard_queued_motion_commands(connection, names)
+        data = await connection.send_command(
+            "batch",
+            dict(
+                commands=[
+                    dict(command=command, parameters=params)
+                    for command, params in commands
+                ]
+            ),
+            timeout=_TIMEOUT,
+            priority=priority,
+        )
+        self.log.debug(f"Received reply {data}")
+        self.check_reply("batch", data)
+        replies = data["replies"]
+        for command, reply in zip(names, replies):
+            self.check_reply(command, reply)
+        return replies
+
+    def discard_queued_motion_commands(self, connection, commands):
+        """Discard the motion commands that wait to be written for the axes
+        that the commands stop, if any.
+
+        Parameters
+        ----------
+        connection: `ControllerConnection`
+            The connection on which the commands are sent.
+        commands: `list` [`str`]
+            The commands that are about to be sent.
+        """
+        discarded_commands = set()
+        for command in commands:
+            discarded_commands |= _MOTION_COMMANDS_DISCARDED_BY_STOP.get(
+                command, frozenset()
             )
-            data = encoding_tools.decode(read_bytes.decode())
-            self.log.debug(f"Received reply {data}")
-
-            response = data["response"]
-            if response > ResponseCode.OK:
-                self.log.error(f"Received ERROR {data}.")
-                if response == ResponseCode.INCORRECT_PARAMETER:
-                    raise ValueError(
-                        f"The command {command} contains an incorrect parameter."
-                    )
-                elif response == ResponseCode.UNSUPPORTED_COMMAND:
-                    raise KeyError(f"The command {command} is unsupported.")
+        if not discarded_commands:
+            return
+        for discarded in connection.discard_queued_commands(discarded_commands):
+            self.log.info(f"Discarded the queued {discarded} command.")
 
-            return data
+    def check_reply(self, command, data):
+        """Check the response code in the reply to a command.
+
+        Parameters
+        ----------
+        command: `str`
+            The command.
+        data: `dict`
+            The reply.
+
+        Raises
+        ------
+        KeyError
+            If the command is unsupported.
+        ValueError
+            If the command contains an incorrect parameter.
+        """
+        response = data["response"]
+        if response > ResponseCode.OK:
+            self.log.error(f"Received ERROR {data}.")
+            if response == ResponseCode.INCORRECT_PARAMETER:
+                raise ValueError(
+                    f"The command {command} contains an incorrect parameter."
+                )
+            elif response == ResponseCode.UNSUPPORTED_COMMAND:
+                raise KeyError(f"The command {command} is unsupported.")
+
+    async def send_motion_command(self, axis, command, **params):
+        """Send a motion command for an axis.
+
+        If configured to coalesce motion commands, the command is sent by the
+        `CommandCoalescer` of the axis, so it waits for the previous motion
+        command of the axis to get its reply and is superseded if another
+        motion command for the axis is sent in the meantime. Otherwise it is
+        sent right away.
+
+        Parameters
+        ----------
+        axis: `str`
+            The axis, "az" or "el".
+        command: `str`
+            The command to send.
+        **params:
+            The parameters for the command. This may be empty.
+
+        Returns
+        -------
+        data: `dict`
+            The reply.
+
+        Raises
+        ------
+        asyncio.CancelledError
+            If the command was superseded, in which case the SAL command is
+            acknowledged as aborted.
+        """
+        if self.config.coalesce_motion_commands:
+            return await self.motion_coalescers[axis].send(command, **params)
+        return await self.write_then_read_reply(command=command, **params)
+
+    def discard_pending_motion_commands(self, *axes):
+        """Discard the motion commands that wait to be sent, for instance
+        because the axes are commanded to stop.
+
+        Parameters
+        ----------
+        *axes: `str`
+            The axes, "az" and/or "el".
+        """
+        for axis in axes:
+            if self.motion_coalescers[axis].discard_pending():
+                self.log.info(f"Discarded the pending {axis} motion command.")
+
+    def start_tracking(self, trajectory):
+        """Make the dome azimuth follow a trajectory of the telescope.
+
+        Each AMCS status is compared with the trajectory and only if the dome
+        deviates, or is about to deviate, from it, a correction move or a new
+        crawl velocity is commanded, see `AzimuthTracker`. If configured to
+        upload trajectories, the trajectory is uploaded to the controller in
+        chunks instead, see `upload_trajectory`. If already tracking, the
+        trajectory is replaced, for instance by a newer prediction. Any other
+        azimuth motion command stops tracking.
+
+        Parameters
+        ----------
+        trajectory: `AzimuthTrajectory`
+            The trajectory to follow.
+        """
+        self.assert_enabled()
+        if self.config.upload_azimuth_trajectories:
+            if self.trajectory_upload_task.done():
+                self.log.info("Started uploading an azimuth trajectory.")
+            self.trajectory_upload_task.cancel()
+            self.trajectory_upload_task = asyncio.create_task(
+                self.upload_trajectory(trajectory)
+            )
+            return
+        if self.azimuth_tracker is not None:
+            self.azimuth_tracker.trajectory = trajectory
+            return
+        self.azimuth_tracker = AzimuthTracker(
+            trajectory=trajectory,
+            max_speed=math.degrees(self.amcs_limits.vmax),
+            tolerance=self.config.azimuth_tracking_tolerance,
+            horizon=self.config.azimuth_tracking_horizon,
+            max_acceleration=math.degrees(self.amcs_limits.amax),
+            max_jerk=math.degrees(self.amcs_limits.jmax),
+        )
+        self.tracking_command_tai = salobj.current_tai()
+        self.log.info("Started tracking an azimuth trajectory.")
+        self.poll_status_now(LlcName.AMCS)
+
+    def stop_tracking(self):
+        """Stop following the azimuth trajectory, if tracking, without
+        stopping the dome.
+        """
+        if not self.trajectory_upload_task.done():
+            self.trajectory_upload_task.cancel()
+            self.log.info("Stopped uploading an azimuth trajectory.")
+        if self.azimuth_tracker is None:
+            return
+        self.tracking_task.cancel()
+        self.log.info(
+            "Stopped tracking an azimuth trajectory. Tracking statistics: "
+            f"{self.azimuth_tracker.get_statistics()}"
+        )
+        self.azimuth_tracker = None
+
+    def update_tracking(self, request_tai):
+        """Compare the latest AMCS status with the azimuth trajectory that is
+        being tracked and send the command the tracker computes, if any.
+
+        The status is taken to be measured when it is received, so the
+        tracker only uses TAI times of the CSC, like the trajectory. The
+        timestamp of the status comes from the clock of the controller.
+
+        Parameters
+        ----------
+        request_tai: `float`
+            The TAI time, unix seconds, at which the status was requested.
+        """
+        if self.azimuth_tracker is None or not self.tracking_task.done():
+            return
+        if request_tai < self.tracking_command_tai:
+            # The status doesn't reflect the last tracking command yet.
+            return
+        amcs_status = self.lower_level_status[LlcName.AMCS.value]
+        command = self.azimuth_tracker.update(
+            tai=salobj.current_tai(),
+            position=math.degrees(amcs_status["positionActual"]),
+            velocity=math.degrees(amcs_status["velocityActual"]),
+        )
+        if command is not None:
+            self.tracking_task = asyncio.create_task(
+                self.send_tracking_command(*command)
+            )
+
+    async def send_tracking_command(self, command, params):
+        """Send an azimuth command computed by the tracker.
+
+        Parameters
+        ----------
+        command: `str`
+            The command, "moveAz" or "crawlAz".
+        params: `dict`
+            The parameters of the command, in deg and deg/s.
+        """
+        try:
+            data = await self.send_motion_command(
+                "az",
+                command,
+                **{key: math.radians(value) for key, value in params.items()},
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.log.exception(f"Sending tracking command {command} failed.")
+            return
+        if command == "moveAz":
+            self.azimuth_tracker.set_move_duration(data["timeout"])
+        self.tracking_command_tai = salobj.current_tai()
+        self.evt_azTarget.set_put(
+            position=params.get("position", float("nan")), velocity=params["velocity"]
+        )
+        self.poll_status_now(LlcName.AMCS)
+
+    async def upload_trajectory(self, trajectory):
+        """Upload an azimuth trajectory to the controller in chunks, so the
+        dome follows it without a command for each correction.
+
+        Each chunk samples the trajectory at the configured sample interval
+        up to the configured chunk duration ahead and the next chunk is
+        uploaded when half of that time remains, so the controller never runs
+        out of samples. The first sample is far enough ahead for the dome to
+        get there from its current azimuth.
+
+        Parameters
+        ----------
+        trajectory: `AzimuthTrajectory`
+            The trajectory to follow.
+        """
+        interval = self.config.trajectory_sample_interval
+        chunk_duration = self.config.trajectory_chunk_duration
+        max_speed = math.degrees(self.amcs_limits.vmax)
+        self.abort_motion_operations(LlcName.AMCS)
+        try:
+            await self.request_and_send_llc_status(LlcName.AMCS, self.tel_azimuth)
+            amcs_status = self.lower_level_status[LlcName.AMCS.value]
+            position = math.degrees(amcs_status["positionActual"])
+            tai = salobj.current_tai()
+            # The cubic interpolation from standstill to the first sample
+            # peaks at 1.5 times the mean velocity.
+            duration = interval
+            for _ in range(3):
+                first_position, _ = trajectory.evaluate(tai + duration)
+                distance = salobj.angle_diff(first_position, position).deg
+                duration = max(interval, 1.5 * math.fabs(distance) / max_speed)
+            sample_tai = tai + duration
+            while True:
+                end_tai = salobj.current_tai() + chunk_duration
+                tais = np.arange(
+                    sample_tai, max(end_tai, sample_tai + interval), interval
+                )
+                positions, velocities = zip(
+                    *[trajectory.evaluate(value) for value in tais]
+                )
+                await self.send_motion_command(
+                    "az",
+                    "trackTrajectory",
+                    system=LlcName.AMCS.value,
+                    tai=tais.tolist(),
+                    position=np.radians(positions).tolist(),
+                    velocity=np.radians(
+                        np.clip(velocities, -max_speed, max_speed)
+                    ).tolist(),
+                )
+                self.poll_status_now(LlcName.AMCS)
+                sample_tai = tais[-1] + interval
+                await asyncio.sleep(
+                    max(tais[-1] - chunk_duration / 2 - salobj.current_tai(), 0)
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.log.exception("Uploading the azimuth trajectory failed.")
+
+    def start_motion_operation(self, llc_name, command, reply, target_states):
+        """Track a motion command that was accepted by the controller until
+        the motion has completed.
+
+        The status of the lower level component is checked at the end of the
+        motion, as estimated by the controller, so the motion completes
+        without waiting for the next status poll. Any earlier motion command
+        of the lower level component that still is in flight is aborted.
+
+        Parameters
+        ----------
+        llc_name: `LlcName`
+            The name of the lower level component.
+        command: `str`
+            The motion command.
+        reply: `dict`
+            The reply to the command, with the estimated duration (sec) as
+            "timeout".
+        target_states: `frozenset` [`MotionState`]
+            The motion states that the lower level component reports once the
+            motion has completed.
+        """
+        self.abort_motion_operations(llc_name)
+        operation = MotionOperation(
+            llc_name=llc_name,
+            command=command,
+            target_states=target_states,
+            command_tai=salobj.current_tai(),
+            duration=max(reply["timeout"], 0),
+        )
+        operation.check_task = asyncio.create_task(
+            self.check_motion_operation(operation)
+        )
+        self.motion_operations[llc_name] = operation
+
+    def abort_motion_operations(self, *llc_names, exception=None):
+        """Abort the motion commands that are in flight.
+
+        Parameters
+        ----------
+        *llc_names: `LlcName`
+            The names of the lower level components.
+        exception: `Exception` or None
+            The exception to raise to code waiting for the motion to complete,
+            or None to cancel the waiting.
+        """
+        for llc_name in llc_names:
+            operation = self.motion_operations.pop(llc_name, None)
+            if operation is not None:
+                operation.abort(exception)
+
+    async def check_motion_operation(self, operation):
+        """Check the status of a lower level component at the expected end of
+        its motion.
+
+        Parameters
+        ----------
+        operation: `MotionOperation`
+            The motion command that is in flight.
+        """
+        await asyncio.sleep(max(operation.expected_end_tai - salobj.current_tai(), 0))
+        try:
+            await self.request_and_send_llc_status(
+                operation.llc_name, self.llc_topics[operation.llc_name]
+            )
+        except Exception:
+            self.log.exception(
+                f"Checking the {operation.llc_name.value} status at the "
+                f"expected end of {operation.command} failed."
+            )
+
+    def update_motion_operation(self, llc_name, motion_state):
+        """Complete the motion command of a lower level component that is in
+        flight, if the latest status reports that the motion has completed.
+
+        Parameters
+        ----------
+        llc_name: `LlcName`
+            The name of the lower level component.
+        motion_state: `MotionState`
+            The motion state in the latest status.
+        """
+        operation = self.motion_operations.get(llc_name)
+        if operation is None:
+            return
+        if operation.update(motion_state, salobj.current_tai()):
+            del self.motion_operations[llc_name]
+            self.log.info(
+                f"{operation.command} completed {operation.end_tai - operation.command_tai:0.3f} "
+                f"sec after it was sent, {operation.end_tai - operation.expected_end_tai:0.3f} "
+                "sec after the expected end."
+            )
+
+    async def wait_for_motion(self, llc_name, timeout=None):
+        """Wait until the last motion command of a lower level component has
+        completed.
+
+        Parameters
+        ----------
+        llc_name: `LlcName`
+            The name of the lower level component.
+        timeout: `float` or None
+            The maximum time (sec) to wait, or None to wait forever.
+
+        Returns
+        -------
+        motion_state: `MotionState` or None
+            The motion state that the lower level component reported when the
+            motion completed, or None if no motion command is in flight.
+
+        Raises
+        ------
+        asyncio.CancelledError
+            If the motion command was superseded by another command, e.g. a
+            stop command.
+        asyncio.TimeoutError
+            If the motion didn't complete in time.
+        RuntimeError
+            If the lower level component reported an error.
+        """
+        operation = self.motion_operations.get(llc_name)
+        if operation is None:
+            return None
+        return await asyncio.wait_for(
+            asyncio.shield(operation.done_future), timeout=timeout
+        )
+
+    async def read_loop(self, connection):
+        """Read the replies from the controller on a connection and hand each
+        one to the command waiting for it.
+
+        Replies are matched to commands by the echoed command id. Replies
+        without an id are assumed to come from a controller that doesn't
+        support ids and that therefore replies in the order in which the
+        commands were sent. However, if subscribed to the status of the lower
+        level components, messages without an id are statuses that were
+        pushed by the controller and they get published.
+
+        A reply that can't be handled is logged and skipped. If reading from
+        the connection fails, the CSC reconnects to the controller.
+
+        Parameters
+        ----------
+        connection: `ControllerConnection`
+            The connection to read from.
+        """
+        try:
+            while True:
+                for frame in await connection.frame_reader.read_frames():
+                    try:
+                        self.handle_reply(connection, frame)
+                    except Exception:
+                        self.log.exception(f"Could not handle reply {frame!r}")
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self.log.error(
+                f"The {connection.name} connection to the controller was lost: {e!r}"
+            )
+            self.start_reconnecting()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.log.exception(
+                f"Reading from the {connection.name} connection to the controller "
+                "failed."
+            )
+            self.start_reconnecting()
+        finally:
+            connection.fail_pending_replies()
+
+    def handle_reply(self, connection, frame):
+        """Decode a reply read by `read_loop` and hand it to the command
+        waiting for it, or publish it if it is a pushed status.
+
+        Parameters
+        ----------
+        connection: `ControllerConnection`
+            The connection the reply was read from.
+        frame: `bytes`
+            The reply, without terminator.
+        """
+        frame_reader = connection.frame_reader
+        try:
+            data = encoding_tools.decode(
+                frame,
+                frame_reader.wire_format,
+                validated_callback=functools.partial(
+                    self.report_validation_failures_soon, asyncio.get_running_loop()
+                ),
+            )
+        except Exception:
+            self.log.exception(f"Could not decode reply {frame!r}")
+            return
+        finally:
+            self.report_validation_failures()
+        if not isinstance(data, dict):
+            self.log.warning(f"Ignoring reply {data!r} that is not an object.")
+            return
+        if "wireFormat" in data:
+            # The controller writes all frames after this one in the new
+            # format so switch before reading them.
+            frame_reader.wire_format = encoding_tools.WireFormat(data.pop("wireFormat"))
+        if self.config.status_keyframe_interval > 0 or any(
+            self.get_position_periods().values()
+        ):
+            self.merge_status_deltas(data)
+        command_id = data.pop("id", None)
+        if command_id is None and "timeout" not in data and self.status_subscriptions:
+            self.send_pushed_status(data)
+            return
+        reply_future = connection.pop_reply_future(command_id)
+        if reply_future is None:
+            self.log.warning(f"Ignoring unexpected reply {data}")
+        elif not reply_future.done():
+            reply_future.set_result(data)
+
+    def merge_status_deltas(self, data):
+        """Merge the status deltas in a reply into the cached full statuses
+        and replace them by the merged statuses.
+
+        The status of the lower level components listed under the "delta" key
+        only contains the items that changed since the previous status. All
+        other statuses are full statuses, which replace the cached statuses.
+
+        Parameters
+        ----------
+        data: `dict`
+            The decoded reply. It is modified in place.
+        """
+        deltas = data.pop("delta", ())
+        for llc_name in self.llc_topics:
+            status = data.get(llc_name.value)
+            if status is None:
+                continue
+            if llc_name.value in deltas:
+                cached_status = self.status_cache.get(llc_name)
+                if cached_status is None:
+                    self.log.warning(
+                        f"Ignoring {llc_name.value} status delta since no full "
+                        "status has been received yet."
+                    )
+                    del data[llc_name.value]
+                    continue
+                status = {**cached_status, **status}
+                data[llc_name.value] = status
+            self.status_cache[llc_name] = status
 
     async def do_moveAz(self, data):
         """Move AZ.
@@ -292,15 +1433,21 @@ class MTDomeCsc(salobj.ConfigurableCsc):
             Contains the data as defined in the SAL XML file.
         """
         self.assert_enabled()
+        self.stop_tracking()
         self.log.debug(
             f"Moving Dome to azimuth {data.position} and then start crawling at azRate {data.velocity}"
         )
-        await self.write_then_read_reply(
-            command="moveAz",
+        reply = await self.send_motion_command(
+            "az",
+            "moveAz",
             position=math.radians(data.position),
             velocity=math.radians(data.velocity),
         )
+        self.start_motion_operation(
+            LlcName.AMCS, "moveAz", reply, _AZ_IN_POSITION_STATES
+        )
         self.evt_azTarget.set_put(position=data.position, velocity=data.velocity)
+        self.poll_status_now(LlcName.AMCS)
 
     async def do_moveEl(self, data):
         """Move El.
@@ -312,10 +1459,63 @@ class MTDomeCsc(salobj.ConfigurableCsc):
         """
         self.assert_enabled()
         self.log.debug(f"Moving LWS to elevation {data.position}")
-        await self.write_then_read_reply(
-            command="moveEl", position=math.radians(data.position)
+        reply = await self.send_motion_command(
+            "el", "moveEl", position=math.radians(data.position)
+        )
+        self.start_motion_operation(
+            LlcName.LWSCS, "moveEl", reply, frozenset((MotionState.STOPPED,))
         )
         self.evt_elTarget.set_put(position=data.position, velocity=0)
+        self.poll_status_now(LlcName.LWSCS)
+
+    async def move_az_el(self, azimuth, elevation, velocity=0.0):
+        """Move the dome in azimuth and the light and wind screen in elevation
+        at the same time.
+
+        Both motions start at the same time and are sent in one command, so
+        the dome is ready for a new field after the longest of both motions
+        instead of after both motions one after the other. Like the moveAz
+        command, this stops tracking.
+
+        Parameters
+        ----------
+        azimuth: `float`
+            The azimuth (deg) to move to.
+        elevation: `float`
+            The elevation (deg) to move to.
+        velocity: `float`
+            The velocity (deg/s) at which to crawl once the azimuth has been
+            reached.
+
+        Returns
+        -------
+        duration: `float`
+            The estimated duration (sec) of the motions, which is the longest
+            of the durations of both motions.
+        """
+        self.assert_enabled()
+        self.stop_tracking()
+        self.discard_pending_motion_commands("az", "el")
+        self.log.debug(
+            f"Moving Dome to azimuth {azimuth} and LWS to elevation {elevation}"
+        )
+        reply = await self.write_then_read_reply(
+            command="moveAzEl",
+            azimuth=math.radians(azimuth),
+            azimuthVelocity=math.radians(velocity),
+            elevation=math.radians(elevation),
+        )
+        self.start_motion_operation(
+            LlcName.AMCS, "moveAzEl", reply, _AZ_IN_POSITION_STATES
+        )
+        self.start_motion_operation(
+            LlcName.LWSCS, "moveAzEl", reply, frozenset((MotionState.STOPPED,))
+        )
+        self.evt_azTarget.set_put(position=azimuth, velocity=velocity)
+        self.evt_elTarget.set_put(position=elevation, velocity=0)
+        self.poll_status_now(LlcName.AMCS)
+        self.poll_status_now(LlcName.LWSCS)
+        return reply["timeout"]
 
     async def do_stopAz(self, data):
         """Stop AZ.
@@ -326,6 +1526,9 @@ class MTDomeCsc(salobj.ConfigurableCsc):
             Contains the data as defined in the SAL XML file.
         """
         self.assert_enabled()
+        self.stop_tracking()
+        self.discard_pending_motion_commands("az")
+        self.abort_motion_operations(LlcName.AMCS)
         await self.write_then_read_reply(command="stopAz")
 
     async def do_stopEl(self, data):
@@ -337,6 +1540,8 @@ class MTDomeCsc(salobj.ConfigurableCsc):
             Contains the data as defined in the SAL XML file.
         """
         self.assert_enabled()
+        self.discard_pending_motion_commands("el")
+        self.abort_motion_operations(LlcName.LWSCS)
         await self.write_then_read_reply(command="stopEl")
 
     async def do_stop(self, data):
@@ -348,6 +1553,9 @@ class MTDomeCsc(salobj.ConfigurableCsc):
             Contains the data as defined in the SAL XML file.
         """
         self.assert_enabled()
+        self.stop_tracking()
+        self.discard_pending_motion_commands("az", "el")
+        self.abort_motion_operations(LlcName.AMCS, LlcName.LWSCS)
         await self.write_then_read_reply(command="stop")
 
     async def do_crawlAz(self, data):
@@ -359,10 +1567,13 @@ class MTDomeCsc(salobj.ConfigurableCsc):
             Contains the data as defined in the SAL XML file.
         """
         self.assert_enabled()
-        await self.write_then_read_reply(
-            command="crawlAz", velocity=math.radians(data.velocity)
+        self.stop_tracking()
+        self.abort_motion_operations(LlcName.AMCS)
+        await self.send_motion_command(
+            "az", "crawlAz", velocity=math.radians(data.velocity)
         )
         self.evt_azTarget.set_put(position=float("nan"), velocity=data.velocity)
+        self.poll_status_now(LlcName.AMCS)
 
     async def do_crawlEl(self, data):
         """Crawl El.
@@ -373,10 +1584,12 @@ class MTDomeCsc(salobj.ConfigurableCsc):
             Contains the data as defined in the SAL XML file.
         """
         self.assert_enabled()
-        await self.write_then_read_reply(
-            command="crawlEl", velocity=math.radians(data.velocity)
+        self.abort_motion_operations(LlcName.LWSCS)
+        await self.send_motion_command(
+            "el", "crawlEl", velocity=math.radians(data.velocity)
         )
         self.evt_elTarget.set_put(position=float("nan"), velocity=data.velocity)
+        self.poll_status_now(LlcName.LWSCS)
 
     async def do_setLouvers(self, data):
         """Set Louver.
@@ -453,7 +1666,13 @@ class MTDomeCsc(salobj.ConfigurableCsc):
             Contains the data as defined in the SAL XML file.
         """
         self.assert_enabled()
-        await self.write_then_read_reply(command="park")
+        self.stop_tracking()
+        self.discard_pending_motion_commands("az")
+        reply = await self.write_then_read_reply(command="park")
+        self.start_motion_operation(
+            LlcName.AMCS, "park", reply, frozenset((MotionState.PARKED,))
+        )
+        self.poll_status_now(LlcName.AMCS)
         self.evt_azTarget.set_put(position=0, velocity=0)
 
     async def do_setTemperature(self, data):
@@ -575,20 +1794,97 @@ class MTDomeCsc(salobj.ConfigurableCsc):
         """
         await self.request_and_send_llc_status(LlcName.THCS, self.tel_thermal)
 
-    async def request_and_send_llc_status(self, llc_name, topic):
+    async def statusAll(self, llc_names=None):
+        """Status command for all lower level components not to be executed by
+        SAL.
+
+        This command will be used to request the full status of all lower
+        level components in a single reply and publish each of them on the
+        corresponding telemetry topic.
+
+        Parameters
+        ----------
+        llc_names: `list` [`LlcName`] or None
+            The names of the lower level components of which to publish the
+            status, or None for all of them. The status of the others is
+            ignored, e.g. because it is polled separately.
+        """
+        if llc_names is None:
+            llc_names = list(self.llc_topics)
+        request_tai = salobj.current_tai()
+        status = await self.write_then_read_reply(command="statusAll")
+        for llc_name in llc_names:
+            self.send_llc_status(
+                llc_name, self.llc_topics[llc_name], status, request_tai
+            )
+
+    async def request_and_send_llc_status(self, llc_name, topic, fields=None):
         """Generic method for retrieving the status of a lower level component
         and publish that on the corresponding telemetry topic.
 
+        If fields are given, only those items of the status are requested and
+        they get merged into the last full status received, by `read_loop`,
+        before it is published. The full status is requested instead if none
+        has been received yet.
+
         Parameters
         ----------
         llc_name: `LlcName`
             The name of the lower level component.
         topic: SAL topic
             The SAL topic to publish the telemetry to.
-
+        fields: `list` [`str`] or None
+            The items of the status to request, or None for the full status.
         """
         command = f"status{llc_name.value}"
-        status = await self.write_then_read_reply(command=command)
+        request_tai = salobj.current_tai()
+        if fields is None or llc_name not in self.status_cache:
+            status = await self.write_then_read_reply(command=command)
+        else:
+            status = await self.write_then_read_reply(command=command, fields=fields)
+        if llc_name.value in status:
+            self.send_llc_status(llc_name, topic, status, request_tai)
+
+    def send_pushed_status(self, status):
+        """Publish a status that was pushed by the controller.
+
+        Parameters
+        ----------
+        status: `dict`
+            The pushed status, which contains the status of one or more lower
+            level components with their names as key.
+        """
+        for llc_name in self.status_subscriptions:
+            if llc_name.value in status:
+                try:
+                    self.send_llc_status(
+                        llc_name,
+                        self.llc_topics[llc_name],
+                        status,
+                        salobj.current_tai(),
+                    )
+                except Exception:
+                    self.log.exception(
+                        f"Could not publish pushed {llc_name.value} status."
+                    )
+
+    def send_llc_status(self, llc_name, topic, status, request_tai):
+        """Publish the status of a lower level component on the corresponding
+        telemetry topic and send the events derived from it.
+
+        Parameters
+        ----------
+        llc_name: `LlcName`
+            The name of the lower level component.
+        topic: SAL topic
+            The SAL topic to publish the telemetry to.
+        status: `dict`
+            The reply to a status command, which contains the status of the
+            lower level component with its name as key.
+        request_tai: `float`
+            The TAI time, unix seconds, at which the status was requested, or
+            at which it was received if the controller pushed it.
+        """
         # Store the status for unit tests.
         self.lower_level_status[llc_name.value] = status[llc_name.value]
 
@@ -609,6 +1905,10 @@ class MTDomeCsc(salobj.ConfigurableCsc):
         telemetry = self.remove_keys_from_dict(telemetry_in_degrees)
         # Send the telemetry.
         self.send_telemetry(telemetry, topic)
+        if llc_name in [LlcName.AMCS, LlcName.LWSCS]:
+            self.schedule_transition_poll(
+                llc_name, telemetry_in_radians.get("timeToTransition")
+            )
 
         # DM-26374: Check for errors and send the events.
         if llc_name == LlcName.AMCS:
@@ -620,16 +1920,18 @@ class MTDomeCsc(salobj.ConfigurableCsc):
                 self.evt_azEnabled.set_put(
                     state=EnabledState.FAULT, faultCode=fault_code
                 )
+                self.stop_tracking()
+                self.abort_motion_operations(
+                    LlcName.AMCS,
+                    exception=RuntimeError(f"The AMCS reported {fault_code}."),
+                )
             else:
                 motion_state = MotionState[status["status"]]
-                in_position = False
-                if motion_state in [
-                    MotionState.STOPPED,
-                    MotionState.CRAWLING,
-                    MotionState.PARKED,
-                ]:
-                    in_position = True
+                in_position = motion_state in _AZ_IN_POSITION_STATES
                 self.evt_azMotion.set_put(state=motion_state, inPosition=in_position)
+                self.update_motion_operation(llc_name, motion_state)
+                self.set_status_period(llc_name, self.is_moving(llc_name, motion_state))
+                self.update_tracking(request_tai)
         elif llc_name == LlcName.LWSCS:
             status = status[llc_name.value]["status"]
             motion_state = MotionState[status]
@@ -640,6 +1942,8 @@ class MTDomeCsc(salobj.ConfigurableCsc):
             ]:
                 in_position = True
             self.evt_elMotion.set_put(state=motion_state, inPosition=in_position)
+            self.update_motion_operation(llc_name, motion_state)
+            self.set_status_period(llc_name, self.is_moving(llc_name, motion_state))
 
     # noinspection PyMethodMayBeStatic
     def remove_keys_from_dict(self, dict_with_too_many_keys):
@@ -686,32 +1990,73 @@ class MTDomeCsc(salobj.ConfigurableCsc):
         await super().close_tasks()
         await self.disconnect()
 
-    async def configure(self, config):
-        self.config = config
+    def report_validation_failures(self):
+        """Log the number of validation failures per schema if it changed
+        since the previous report.
+
+        Validation failures don't necessarily raise an exception, for
+        instance if the validation is done in the background, so they are
+        counted by `encoding_tools` and reported here, after each reply is
+        decoded and after each background validation, see
+        `report_validation_failures_soon`.
+        """
+        num_failures = sum(encoding_tools.validation_failures.values())
+        if num_failures != self.num_reported_validation_failures:
+            self.num_reported_validation_failures = num_failures
+            self.log.warning(
+                "Number of validation failures per schema: "
+                f"{dict(encoding_tools.validation_failures)}"
+            )
+
+    def report_validation_failures_soon(self, loop):
+        """Report the validation failures from the event loop once a reply
+        has been validated in the background.
 
-    async def one_status_loop(self, method, interval):
-        """Run one status method forever at the specified interval.
+        This is called from the validation thread, so a failure is reported
+        even if no other reply arrives.
 
         Parameters
         ----------
-        method: coro
-            The status method to run
-        interval: `float`
-            The interval (sec) at which to run the status method.
-
+        loop: `asyncio.AbstractEventLoop`
+            The event loop of the CSC.
         """
         try:
-            while True:
-                await method()
-                await asyncio.sleep(interval)
-        except Exception:
-            self.log.exception(f"one_status_loop({method}) failed")
+            loop.call_soon_threadsafe(self.report_validation_failures)
+        except RuntimeError:
+            # The event loop has been closed.
+            pass
+
+    async def configure(self, config):
+        self.config = config
+        # The motion commands can only be coalesced if a new command gets
+        # handled while the previous one still is waiting for its turn.
+        for command in (
+            self.cmd_moveAz,
+            self.cmd_crawlAz,
+            self.cmd_moveEl,
+            self.cmd_crawlEl,
+        ):
+            command.allow_multiple_callbacks = config.coalesce_motion_commands
+        encoding_tools.set_validation_policy(
+            encoding_tools.ValidationPolicy(config.validation_policy),
+            config.validation_sample_percentage,
+        )
+
+    @property
+    def connections(self):
+        """The connections to the controller, without duplicates."""
+        connections = []
+        for connection in (self.control_connection, self.telemetry_connection):
+            if connection is not None and connection not in connections:
+                connections.append(connection)
+        return connections
 
     @property
     def connected(self):
-        if None in (self.reader, self.writer):
+        connections = self.connections
+        if not connections:
             return False
-        return True
+        return all(connection.connected for connection in connections)
 
     @staticmethod
     def get_config_pkg():
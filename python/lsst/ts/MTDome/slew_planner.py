@@ -0,0 +1,194 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = [
+    "move_durations",
+    "azimuth_slew_durations",
+    "elevation_slew_durations",
+    "slew_durations",
+]
+
+import numpy as np
+
+
+def move_durations(distance, max_speed, max_acceleration=None, max_jerk=None):
+    """Compute the durations of moves from standstill to standstill.
+
+    If the maximum acceleration and jerk are set, the moves follow the same
+    seven segment S-curves as `MotionProfile.plan_move`, for which the
+    durations are computed in closed form. Otherwise the moves are made at
+    maximum speed all the way. The distances and limits may be in any
+    angular unit, as long as it is the same for all of them.
+
+    Parameters
+    ----------
+    distance: `float` or `numpy.ndarray`
+        The distances to move.
+    max_speed: `float`
+        The maximum speed.
+    max_acceleration: `float` or None
+        The maximum acceleration, or None to move at maximum speed all the
+        way.
+    max_jerk: `float` or None
+        The maximum jerk, or None to move at maximum speed all the way.
+
+    Returns
+    -------
+    durations: `numpy.ndarray`
+        The durations [s] of the moves.
+    """
+    distance = np.abs(distance)
+    if max_acceleration is None or max_jerk is None:
+        return distance / max_speed
+    # The duration of the change from standstill to the maximum speed and
+    # the distance covered by speeding up and slowing down again.
+    if max_speed * max_jerk >= max_acceleration ** 2:
+        speed_up_duration = max_speed / max_acceleration + max_acceleration / max_jerk
+    else:
+        speed_up_duration = 2 * np.sqrt(max_speed / max_jerk)
+    max_speed_distance = max_speed * speed_up_duration
+    # If the distance is too short to reach the maximum speed, the peak
+    # velocity v covers the distance with v * speed up duration(v). The
+    # maximum acceleration only is reached for v >= amax^2 / jmax, so for
+    # distances of at least 2 amax^3 / jmax^2.
+    max_acceleration_distance = 2 * max_acceleration ** 3 / max_jerk ** 2
+    peak_velocity = (
+        max_acceleration
+        / 2
+        * (
+            np.sqrt(
+                (max_acceleration / max_jerk) ** 2 + 4 * distance / max_acceleration
+            )
+            - max_acceleration / max_jerk
+        )
+    )
+    return np.where(
+        distance >= max_speed_distance,
+        2 * speed_up_duration + (distance - max_speed_distance) / max_speed,
+        np.where(
+            distance >= max_acceleration_distance,
+            2 * (peak_velocity / max_acceleration + max_acceleration / max_jerk),
+            4 * np.cbrt(distance / (2 * max_jerk)),
+        ),
+    )
+
+
+def azimuth_slew_durations(start_position, target_position, amcs_limits):
+    """Compute the durations of azimuth moves.
+
+    The durations are computed like `AzimuthMotion` does with the same
+    limits: the dome moves the shortest way around from standstill to
+    standstill, following a jerk and acceleration limited S-curve if the
+    maximum acceleration and jerk are set and at maximum speed all the way
+    otherwise. The positions may be scalars or arrays, which are broadcast
+    against each other.
+
+    Parameters
+    ----------
+    start_position: `float` or `numpy.ndarray`
+        The start azimuths [rad].
+    target_position: `float` or `numpy.ndarray`
+        The target azimuths [rad].
+    amcs_limits: `AmcsLimits`
+        The limits of the AMCS, of which the maximum velocity, acceleration
+        and jerk are used.
+
+    Returns
+    -------
+    durations: `numpy.ndarray`
+        The durations [s] of the moves, taking the 0/2pi boundary into
+        account.
+    """
+    distance = np.asarray(target_position, dtype=float) - start_position
+    # The same wrap to [-pi, pi) as salobj.angle_diff.
+    distance = np.remainder(distance + np.pi, 2 * np.pi) - np.pi
+    return move_durations(
+        distance, amcs_limits.vmax, amcs_limits.amax, amcs_limits.jmax
+    )
+
+
+def elevation_slew_durations(start_position, target_position, lwscs_limits):
+    """Compute the durations of elevation moves.
+
+    The durations are computed like `ElevationMotion` does with the same
+    limits: the light and wind screen moves from standstill to standstill,
+    following a jerk and acceleration limited S-curve if the maximum
+    acceleration and jerk are set and at maximum speed all the way
+    otherwise. The positions may be scalars or arrays, which are broadcast
+    against each other.
+
+    Parameters
+    ----------
+    start_position: `float` or `numpy.ndarray`
+        The start elevations [rad].
+    target_position: `float` or `numpy.ndarray`
+        The target elevations [rad].
+    lwscs_limits: `LwscsLimits`
+        The limits of the LWSCS, of which the maximum velocity, acceleration
+        and jerk are used.
+
+    Returns
+    -------
+    durations: `numpy.ndarray`
+        The durations [s] of the moves.
+    """
+    distance = np.asarray(target_position, dtype=float) - start_position
+    return move_durations(
+        distance, lwscs_limits.vmax, lwscs_limits.amax, lwscs_limits.jmax
+    )
+
+
+def slew_durations(
+    start_azimuth,
+    target_azimuth,
+    start_elevation,
+    target_elevation,
+    amcs_limits,
+    lwscs_limits,
+):
+    """Compute the durations of dome slews, for which the azimuth and the
+    elevation move at the same time.
+
+    Parameters
+    ----------
+    start_azimuth: `float` or `numpy.ndarray`
+        The start azimuths [rad].
+    target_azimuth: `float` or `numpy.ndarray`
+        The target azimuths [rad].
+    start_elevation: `float` or `numpy.ndarray`
+        The start elevations [rad].
+    target_elevation: `float` or `numpy.ndarray`
+        The target elevations [rad].
+    amcs_limits: `AmcsLimits`
+        The limits of the AMCS.
+    lwscs_limits: `LwscsLimits`
+        The limits of the LWSCS.
+
+    Returns
+    -------
+    durations: `numpy.ndarray`
+        The durations [s] of the slews, which is the longest of the durations
+        of the azimuth and elevation moves.
+    """
+    return np.maximum(
+        azimuth_slew_durations(start_azimuth, target_azimuth, amcs_limits),
+        elevation_slew_durations(start_elevation, target_elevation, lwscs_limits),
+    )
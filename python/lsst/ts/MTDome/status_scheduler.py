@@ -0,0 +1,339 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["StatusScheduler", "MAX_BACKOFF"]
+
+import asyncio
+import math
+
+from lsst.ts import salobj
+
+# The maximum time (sec) to wait before polling again after a poll failed.
+MAX_BACKOFF = 60.0
+
+
+class _StatusPoll:
+    """A status method that gets polled periodically, together with its
+    statistics.
+
+    Parameters
+    ----------
+    name: `str`
+        The name of the poll, used in log messages and statistics.
+    method: coro
+        The status method to poll.
+    period: `float`
+        The period (sec) at which to poll.
+    """
+
+    def __init__(self, name, method, period):
+        self.name = name
+        self.method = method
+        self.period = period
+        # The time, in the clock of the event loop, at which to poll next.
+        self.deadline = None
+        # The time, in the clock of the event loop, before which not to poll
+        # because the previous polls failed.
+        self.retry_time = 0.0
+        # The time (sec) waited before polling again after the last failure,
+        # or 0 if the last poll succeeded.
+        self.backoff = 0.0
+        self.task = salobj.make_done_future()
+        self.num_polls = 0
+        self.num_skipped = 0
+        self.num_missed_deadlines = 0
+        self.num_failures = 0
+        self.num_consecutive_failures = 0
+        self.max_jitter = 0.0
+        self.total_jitter = 0.0
+
+    def get_statistics(self):
+        """Get the statistics of the poll.
+
+        Returns
+        -------
+        statistics: `dict`
+            The period, the number of polls that were started, skipped because
+            the previous poll still was outstanding and that failed, the
+            fraction of the polls that failed, the number of polls that
+            failed since the last successful poll, the current backoff time
+            (sec), the number of deadlines that were missed completely and
+            the maximum and mean delay (sec) of the start of the polls with
+            respect to their deadlines.
+        """
+        return dict(
+            period=self.period,
+            num_polls=self.num_polls,
+            num_skipped=self.num_skipped,
+            num_missed_deadlines=self.num_missed_deadlines,
+            num_failures=self.num_failures,
+            error_rate=self.num_failures / self.num_polls if self.num_polls else 0.0,
+            num_consecutive_failures=self.num_consecutive_failures,
+            backoff=self.backoff,
+            max_jitter=self.max_jitter,
+            mean_jitter=self.total_jitter / self.num_polls if self.num_polls else 0.0,
+        )
+
+
+class StatusScheduler:
+    """Poll several status methods periodically from a single task.
+
+    Each status method is polled at absolute deadlines, which are a whole
+    number of periods after the start of the scheduler, so the time it takes
+    to poll doesn't make the polls drift. The first deadlines of the status
+    methods are spread over their periods so the polls don't all get sent at
+    the same time. If the previous poll of a status method still is
+    outstanding when its next deadline is reached, that poll is skipped
+    instead of queued, and if the scheduler falls behind by more than a
+    period, the deadlines that were missed are skipped.
+
+    If a poll fails, the status method is polled again after a backoff time
+    which doubles with each consecutive failure, up to ``max_backoff``, so a
+    lower level component that keeps failing doesn't take up the connection
+    to the controller at the expense of the others. The other status methods
+    keep getting polled in the meantime. The first failure and the recovery
+    of each status method are logged, together with its statistics, and the
+    statistics of all status methods are logged periodically while polling,
+    if configured to do so, so the health of the polls can be followed
+    while the CSC runs.
+
+    The period of a status method may be changed while polling, with
+    `set_period`, and a status method may be polled right away, with
+    `poll_now`.
+
+    Parameters
+    ----------
+    log: `logging.Logger`
+        The logger to use.
+    max_backoff: `float`
+        The maximum time (sec) to wait before polling again after a poll
+        failed.
+    statistics_interval: `float`
+        The interval (sec) at which to log the statistics of all polls while
+        polling, or 0 to not log them periodically.
+    """
+
+    def __init__(self, log, max_backoff=MAX_BACKOFF, statistics_interval=0):
+        self.log = log
+        self.max_backoff = max_backoff
+        self.statistics_interval = statistics_interval
+        self.polls = {}
+        self.run_task = salobj.make_done_future()
+        self.statistics_task = salobj.make_done_future()
+        # Future that wakes up the run loop when a deadline changed.
+        self.deadline_changed = salobj.make_done_future()
+
+    def add(self, name, method, period):
+        """Add a status method to poll.
+
+        Parameters
+        ----------
+        name: `str`
+            The name of the poll, used in log messages and statistics.
+        method: coro
+            The status method to poll.
+        period: `float`
+            The period (sec) at which to poll.
+
+        Raises
+        ------
+        RuntimeError
+            If the scheduler is running.
+        ValueError
+            If there already is a poll with the same name or if the period is
+            not positive.
+        """
+        if not self.run_task.done():
+            raise RuntimeError("Cannot add a poll while the scheduler is running.")
+        if name in self.polls:
+            raise ValueError(f"There already is a poll named {name}.")
+        if period <= 0:
+            raise ValueError(f"The period {period} of poll {name} is not positive.")
+        self.polls[name] = _StatusPoll(name=name, method=method, period=period)
+
+    def start(self):
+        """Start polling."""
+        if not self.run_task.done():
+            raise RuntimeError("The scheduler already is running.")
+        self.run_task = asyncio.create_task(self.run())
+        if self.statistics_interval > 0:
+            self.statistics_task = asyncio.create_task(self.log_statistics_loop())
+
+    def stop(self):
+        """Stop polling and cancel the polls that are outstanding."""
+        self.run_task.cancel()
+        self.statistics_task.cancel()
+        for poll in self.polls.values():
+            poll.task.cancel()
+
+    def set_period(self, name, period):
+        """Change the period of a poll.
+
+        If the new period is shorter, the next poll is moved forward so it is
+        no later than one new period from now, unless the poll is backing off
+        after a failure. After that, the poll is done at the new period.
+
+        Parameters
+        ----------
+        name: `str`
+            The name of the poll.
+        period: `float`
+            The new period (sec).
+
+        Raises
+        ------
+        KeyError
+            If there is no poll with the name.
+        ValueError
+            If the period is not positive.
+        """
+        poll = self.polls[name]
+        if period <= 0:
+            raise ValueError(f"The period {period} of poll {name} is not positive.")
+        poll.period = period
+        if poll.deadline is not None:
+            now = asyncio.get_running_loop().time()
+            if poll.deadline > now + period:
+                poll.deadline = max(now + period, poll.retry_time)
+                self.wake_up()
+
+    def poll_now(self, name):
+        """Poll right away, unless the previous poll still is outstanding or
+        the poll is backing off after a failure.
+
+        The next polls are done at the period of the poll after this one.
+
+        Parameters
+        ----------
+        name: `str`
+            The name of the poll.
+
+        Raises
+        ------
+        KeyError
+            If there is no poll with the name.
+        """
+        poll = self.polls[name]
+        if poll.deadline is not None:
+            poll.deadline = max(asyncio.get_running_loop().time(), poll.retry_time)
+            self.wake_up()
+
+    def wake_up(self):
+        """Make the run loop check the deadlines again."""
+        if not self.deadline_changed.done():
+            self.deadline_changed.set_result(None)
+
+    async def run(self):
+        """Start each status method at its deadlines."""
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        num_polls = len(self.polls)
+        for index, poll in enumerate(self.polls.values()):
+            poll.deadline = start_time + poll.period * index / num_polls
+        try:
+            while self.polls:
+                # The first poll with the earliest deadline goes first.
+                poll = min(self.polls.values(), key=lambda poll: poll.deadline)
+                delay = poll.deadline - loop.time()
+                if delay > 0:
+                    # Unlike asyncio.wait_for, asyncio.wait never swallows a
+                    # cancellation.
+                    self.deadline_changed = loop.create_future()
+                    await asyncio.wait([self.deadline_changed], timeout=delay)
+                    if self.deadline_changed.done():
+                        continue
+                now = loop.time()
+                jitter = now - poll.deadline
+                if poll.task.done():
+                    poll.num_polls += 1
+                    poll.total_jitter += jitter
+                    poll.max_jitter = max(poll.max_jitter, jitter)
+                    poll.task = asyncio.create_task(self.poll_once(poll))
+                else:
+                    poll.num_skipped += 1
+                # Skip the deadlines that already have passed, keeping the
+                # deadlines on the same grid.
+                num_periods = max(1, math.ceil(jitter / poll.period))
+                poll.num_missed_deadlines += num_periods - 1
+                poll.deadline += num_periods * poll.period
+        finally:
+            for poll in self.polls.values():
+                poll.deadline = None
+
+    async def poll_once(self, poll):
+        """Poll a status method once and back off if that fails.
+
+        Parameters
+        ----------
+        poll: `_StatusPoll`
+            The poll.
+        """
+        try:
+            await poll.method()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            poll.num_failures += 1
+            poll.num_consecutive_failures += 1
+            poll.backoff = min(
+                poll.period * 2 ** poll.num_consecutive_failures, self.max_backoff
+            )
+            if poll.num_consecutive_failures == 1:
+                self.log.exception(
+                    f"Polling {poll.name} failed; retrying in {poll.backoff:0.1f} "
+                    f"sec. Statistics: {poll.get_statistics()}"
+                )
+            else:
+                self.log.debug(
+                    f"Polling {poll.name} failed {poll.num_consecutive_failures} "
+                    f"times in a row; retrying in {poll.backoff:0.1f} sec."
+                )
+            poll.retry_time = asyncio.get_running_loop().time() + poll.backoff
+            if poll.deadline is not None and poll.deadline < poll.retry_time:
+                poll.deadline = poll.retry_time
+                self.wake_up()
+        else:
+            if poll.num_consecutive_failures > 0:
+                num_consecutive_failures = poll.num_consecutive_failures
+                poll.num_consecutive_failures = 0
+                poll.backoff = 0.0
+                self.log.info(
+                    f"Polling {poll.name} succeeded again after "
+                    f"{num_consecutive_failures} failures. "
+                    f"Statistics: {poll.get_statistics()}"
+                )
+
+    async def log_statistics_loop(self):
+        """Log the statistics of all polls at the statistics interval."""
+        while True:
+            await asyncio.sleep(self.statistics_interval)
+            self.log.info(f"Status poll statistics: {self.get_statistics()}")
+
+    def get_statistics(self):
+        """Get the statistics of all polls.
+
+        Returns
+        -------
+        statistics: `dict`
+            The statistics of each poll by name, see
+            `_StatusPoll.get_statistics`.
+        """
+        return {name: poll.get_statistics() for name, poll in self.polls.items()}
@@ -23,6 +23,8 @@ import asynctest
 import logging
 import math
 
+import numpy as np
+
 from lsst.ts.MTDome.mock_llc.mock_motion import AzimuthMotion
 from lsst.ts.idl.enums.MTDome import MotionState
 
@@ -893,3 +895,98 @@ class AzimuthMotionTestCase(asynctest.TestCase):
             self.fail("Expected a ValueError.")
         except ValueError:
             pass
+
+    async def test_move_while_crawling(self):
+        """Test the AzimuthMotion when moving while crawling, which starts
+        the move from the position reached by crawling.
+        """
+        start_position = math.radians(10.0)
+        start_tai = _start_tai
+        max_speed = _MAX_SPEED
+        crawl_velocity = math.radians(1.0)
+        await self.prepare_azimuth_motion(
+            start_position=start_position, max_speed=max_speed, start_tai=start_tai,
+        )
+        await self.verify_azimuth_motion_duration(
+            start_tai=start_tai,
+            target_position=math.inf,
+            crawl_velocity=crawl_velocity,
+            expected_duration=0.0,
+            motion_state=MotionState.CRAWLING,
+        )
+        await self.verify_azimuth_motion(
+            tai=_start_tai + 2.0,
+            expected_position=math.radians(12.0),
+            expected_velocity=crawl_velocity,
+            expected_motion_state=MotionState.CRAWLING,
+        )
+        target_position = math.radians(16.0)
+        await self.verify_azimuth_motion_duration(
+            start_tai=_start_tai + 2.0,
+            target_position=target_position,
+            crawl_velocity=crawl_velocity,
+            expected_duration=1.0,
+            motion_state=MotionState.MOVING,
+        )
+        await self.verify_azimuth_motion(
+            tai=_start_tai + 2.5,
+            expected_position=math.radians(14.0),
+            expected_velocity=_MAX_SPEED,
+            expected_motion_state=MotionState.MOVING,
+        )
+        await self.verify_azimuth_motion(
+            tai=_start_tai + 4.0,
+            expected_position=math.radians(17.0),
+            expected_velocity=crawl_velocity,
+            expected_motion_state=MotionState.CRAWLING,
+        )
+
+    async def test_batch(self):
+        """Test computing the positions of the AzimuthMotion for an array of
+        TAI times at once, when moving from position 350 to 10 degrees and
+        then crawling in positive direction.
+        """
+        crawl_velocity = math.radians(0.1)
+        await self.prepare_azimuth_motion(
+            start_position=math.radians(350.0),
+            max_speed=_MAX_SPEED,
+            start_tai=_start_tai,
+        )
+        await self.verify_azimuth_motion_duration(
+            start_tai=_start_tai,
+            target_position=math.radians(10.0),
+            crawl_velocity=crawl_velocity,
+            expected_duration=5.0,
+            motion_state=MotionState.MOVING,
+        )
+        tai = _start_tai + np.array([0.0, 1.0, 2.5, 5.0, 15.0])
+        (
+            positions,
+            velocities,
+            motion_states,
+        ) = self.azimuth_motion.get_positions_velocities_and_motion_states(tai)
+        np.testing.assert_allclose(
+            positions, np.radians([350.0, 354.0, 0.0, 10.0, 11.0]), atol=1e-12
+        )
+        np.testing.assert_allclose(
+            velocities,
+            [_MAX_SPEED, _MAX_SPEED, _MAX_SPEED, crawl_velocity, crawl_velocity],
+        )
+        np.testing.assert_array_equal(
+            motion_states, [MotionState.MOVING] * 3 + [MotionState.CRAWLING] * 2,
+        )
+        # The batch and scalar computations agree.
+        for i, tai_i in enumerate(tai):
+            (
+                position,
+                velocity,
+                motion_state,
+            ) = self.azimuth_motion.get_position_velocity_and_motion_state(tai_i)
+            self.assertEqual(position, positions[i])
+            self.assertEqual(velocity, velocities[i])
+            self.assertEqual(motion_state, motion_states[i])
+
+        with self.assertRaises(ValueError):
+            self.azimuth_motion.get_positions_velocities_and_motion_states(
+                _start_tai + np.array([-1.0, 1.0])
+            )
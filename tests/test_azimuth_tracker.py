@@ -0,0 +1,196 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import asynctest
+import logging
+import math
+
+from lsst.ts import MTDome
+from lsst.ts import salobj
+
+logging.basicConfig(
+    format="%(asctime)s:%(levelname)s:%(name)s:%(message)s", level=logging.INFO
+)
+
+START_TAI = 10001.0
+TOLERANCE = 0.5
+HORIZON = 30.0
+# The time (sec) between the measurements of the dome azimuth, which is the
+# period at which the status of a moving dome is polled.
+UPDATE_PERIOD = 0.2
+# The time step (sec) of the simulation.
+TIME_STEP = 0.1
+
+
+class AzimuthTrackerTestCase(asynctest.TestCase):
+    async def track(self, trajectory, start_position, duration):
+        """Track a trajectory with the simulator of the mock controller and
+        check that the dome stays within the tolerance.
+
+        Parameters
+        ----------
+        trajectory: `MTDome.AzimuthTrajectory`
+            The trajectory to track.
+        start_position: `float`
+            The azimuth (deg) at which the dome starts.
+        duration: `float`
+            The duration (sec) of the simulation.
+
+        Returns
+        -------
+        tracker: `MTDome.AzimuthTracker`
+            The tracker.
+        """
+        amcs = MTDome.mock_llc.AmcsStatus(start_tai=START_TAI - 1000)
+        # Move with the jerk and acceleration limits of the dome, so the
+        # correction moves take longer than at maximum speed all the way.
+        amcs.azimuth_motion.set_motion_limits(
+            max_speed=amcs.vmax, max_acceleration=amcs.amax, max_jerk=amcs.jmax
+        )
+        await amcs.moveAz(
+            position=math.radians(start_position),
+            velocity=0,
+            start_tai=START_TAI - 1000,
+        )
+        tracker = MTDome.AzimuthTracker(
+            trajectory=trajectory,
+            max_speed=math.degrees(amcs.vmax),
+            tolerance=TOLERANCE,
+            horizon=HORIZON,
+            max_acceleration=math.degrees(amcs.amax),
+            max_jerk=math.degrees(amcs.jmax),
+        )
+        acquired = False
+        max_error = 0.0
+        steps_per_update = round(UPDATE_PERIOD / TIME_STEP)
+        for step in range(round(duration / TIME_STEP)):
+            tai = START_TAI + step * TIME_STEP
+            await amcs.determine_status(tai)
+            position = math.degrees(amcs.llc_status["positionActual"])
+            velocity = math.degrees(amcs.llc_status["velocityActual"])
+            if tai >= tracker.move_end_tai:
+                target_position, _ = trajectory.evaluate(tai)
+                error = math.fabs(salobj.angle_diff(target_position, position).deg)
+                # The dome is aligned once the correction move has ended.
+                acquired = acquired or error <= TOLERANCE
+                if acquired:
+                    max_error = max(max_error, error)
+            if step % steps_per_update != 0:
+                continue
+            command = tracker.update(tai, position, velocity)
+            if command is None:
+                continue
+            command, params = command
+            if command == "moveAz":
+                duration = await amcs.moveAz(
+                    position=math.radians(params["position"]),
+                    velocity=math.radians(params["velocity"]),
+                    start_tai=tai,
+                )
+                tracker.set_move_duration(duration)
+            else:
+                await amcs.crawlAz(
+                    velocity=math.radians(params["velocity"]), start_tai=tai
+                )
+        logging.info(f"Tracking statistics: {tracker.get_statistics()}")
+        self.assertTrue(acquired)
+        self.assertLessEqual(max_error, TOLERANCE)
+        self.assertLessEqual(tracker.max_error, TOLERANCE)
+        return tracker
+
+    async def test_polynomial(self):
+        # A trajectory with an accelerating velocity which crosses azimuth 0.
+        trajectory = MTDome.AzimuthTrajectory.from_polynomial(
+            reference_tai=START_TAI, coefficients=[350.0, 0.02, 5.0e-5]
+        )
+        position, velocity = trajectory.evaluate(START_TAI + 100)
+        self.assertAlmostEqual(position, 352.5)
+        self.assertAlmostEqual(velocity, 0.03)
+        position, velocity = trajectory.evaluate(START_TAI + 600)
+        self.assertAlmostEqual(position, 20.0)
+        self.assertAlmostEqual(velocity, 0.08)
+
+        duration = 600
+        tracker = await self.track(
+            trajectory=trajectory, start_position=330.0, duration=duration
+        )
+        self.assertEqual(tracker.num_moves, 1)
+        # Moving the dome at each update of a telescope position sent at 1 Hz
+        # would take a command per second.
+        self.assertLess(tracker.num_moves + tracker.num_crawls, duration / 20)
+
+    async def test_samples(self):
+        # A trajectory with a velocity which varies sinusoidally, sampled
+        # every 10 seconds.
+        def position_function(dt):
+            return 180.0 + 30.0 * math.sin(dt / 300)
+
+        def velocity_function(dt):
+            return 0.1 * math.cos(dt / 300)
+
+        sample_dt = [10.0 * i for i in range(61)]
+        trajectory = MTDome.AzimuthTrajectory.from_samples(
+            tai=[START_TAI + dt for dt in sample_dt],
+            position=[position_function(dt) for dt in sample_dt],
+            velocity=[velocity_function(dt) for dt in sample_dt],
+        )
+        for dt in (0.0, 3.0, 55.5, 599.0):
+            position, velocity = trajectory.evaluate(START_TAI + dt)
+            self.assertAlmostEqual(position, position_function(dt), 4)
+            self.assertAlmostEqual(velocity, velocity_function(dt), 4)
+        # Before the first and after the last sample the position is
+        # extrapolated.
+        position, velocity = trajectory.evaluate(START_TAI - 10)
+        self.assertAlmostEqual(position, 179.0)
+        self.assertAlmostEqual(velocity, 0.1)
+
+        duration = 600
+        tracker = await self.track(
+            trajectory=trajectory, start_position=175.0, duration=duration
+        )
+        self.assertEqual(tracker.num_moves, 1)
+        self.assertLess(tracker.num_moves + tracker.num_crawls, duration / 20)
+
+    async def test_wrapping_samples(self):
+        trajectory = MTDome.AzimuthTrajectory.from_samples(
+            tai=[START_TAI, START_TAI + 100], position=[355.0, 5.0], velocity=[0.1, 0.1]
+        )
+        position, velocity = trajectory.evaluate(START_TAI + 50)
+        self.assertAlmostEqual(salobj.angle_diff(position, 0.0).deg, 0.0)
+        self.assertAlmostEqual(velocity, 0.1)
+
+        await self.track(trajectory=trajectory, start_position=355.0, duration=100)
+
+    async def test_invalid_trajectories(self):
+        with self.assertRaises(ValueError):
+            MTDome.AzimuthTrajectory.from_samples(tai=[], position=[], velocity=[])
+        with self.assertRaises(ValueError):
+            MTDome.AzimuthTrajectory.from_samples(
+                tai=[START_TAI, START_TAI + 1], position=[0.0], velocity=[0.0]
+            )
+        with self.assertRaises(ValueError):
+            MTDome.AzimuthTrajectory.from_samples(
+                tai=[START_TAI, START_TAI], position=[0.0, 0.0], velocity=[0.0, 0.0],
+            )
+        with self.assertRaises(ValueError):
+            MTDome.AzimuthTrajectory.from_polynomial(
+                reference_tai=START_TAI, coefficients=[]
+            )
@@ -0,0 +1,98 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import asyncio
+import asynctest
+import logging
+
+from lsst.ts import MTDome
+
+logging.basicConfig(
+    format="%(asctime)s:%(levelname)s:%(name)s:%(message)s", level=logging.DEBUG
+)
+
+STD_TIMEOUT = 1
+
+
+class CommandCoalescerTestCase(asynctest.TestCase):
+    async def setUp(self):
+        # The commands that were sent, in the order of sending.
+        self.sent_commands = []
+        # Future that needs to be done before a sent command gets its reply.
+        self.reply_allowed = asyncio.get_running_loop().create_future()
+        self.log = logging.getLogger("CommandCoalescerTestCase")
+        self.coalescer = MTDome.CommandCoalescer("az", self.send_command, self.log)
+
+    async def send_command(self, command, **params):
+        self.sent_commands.append((command, params))
+        await self.reply_allowed
+        if command == "fail":
+            raise ValueError("Failed on purpose.")
+        return dict(response=0, timeout=0.0)
+
+    async def test_latest_wins(self):
+        tasks = []
+        for position in range(5):
+            tasks.append(
+                asyncio.create_task(self.coalescer.send("moveAz", position=position))
+            )
+            await asyncio.sleep(0)
+        # The first command is sent right away. The next ones wait for its
+        # reply and each one supersedes the one before.
+        self.assertEqual(self.sent_commands, [("moveAz", dict(position=0))])
+        self.reply_allowed.set_result(None)
+        replies = await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertEqual(replies[0], dict(response=0, timeout=0.0))
+        self.assertEqual(replies[-1], dict(response=0, timeout=0.0))
+        for reply in replies[1:-1]:
+            self.assertIsInstance(reply, asyncio.CancelledError)
+        self.assertEqual(
+            self.sent_commands,
+            [("moveAz", dict(position=0)), ("moveAz", dict(position=4))],
+        )
+        self.assertEqual(
+            self.coalescer.get_statistics(), dict(num_sent=2, num_superseded=3)
+        )
+
+    async def test_discard_pending(self):
+        self.assertFalse(self.coalescer.discard_pending())
+        first_task = asyncio.create_task(self.coalescer.send("moveAz", position=0))
+        await asyncio.sleep(0)
+        second_task = asyncio.create_task(self.coalescer.send("crawlAz", velocity=0))
+        await asyncio.sleep(0)
+        self.assertTrue(self.coalescer.discard_pending())
+        self.reply_allowed.set_result(None)
+        await asyncio.wait_for(first_task, timeout=STD_TIMEOUT)
+        with self.assertRaises(asyncio.CancelledError):
+            await second_task
+        self.assertEqual(self.sent_commands, [("moveAz", dict(position=0))])
+
+    async def test_failure(self):
+        self.reply_allowed.set_result(None)
+        with self.assertRaises(ValueError):
+            await self.coalescer.send("fail")
+        reply = await self.coalescer.send("moveAz", position=0)
+        self.assertEqual(reply["response"], 0)
+
+
+if __name__ == "__main__":
+    asynctest.main()
@@ -0,0 +1,197 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import asyncio
+import asynctest
+import logging
+
+from lsst.ts import MTDome
+
+logging.basicConfig(
+    format="%(asctime)s:%(levelname)s:%(name)s:%(message)s", level=logging.DEBUG
+)
+
+STD_TIMEOUT = 1
+
+# Schema-valid parameters of the commands used in the tests.
+COMMAND_PARAMS = {
+    "moveAz": {"position": 0.1, "velocity": 0.0},
+    "moveEl": {"position": 0.1},
+    "crawlAz": {"velocity": 0.1},
+    "crawlEl": {"velocity": 0.1},
+    "stop": {},
+    "stopAz": {},
+    "stopEl": {},
+}
+
+
+class ControllerConnectionTestCase(asynctest.TestCase):
+    async def setUp(self):
+        self.validation_raises_exception = (
+            MTDome.encoding_tools.validation_raises_exception
+        )
+        MTDome.encoding_tools.validation_raises_exception = True
+        # The commands received by the server, in the order of receiving.
+        self.received_commands = []
+        # Whether the server echoes the command id in its replies.
+        self.reply_with_id = True
+        self.server = await asyncio.start_server(
+            self.handle_client, host="127.0.0.1", port=0
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.log = logging.getLogger("ControllerConnectionTestCase")
+        self.connection = MTDome.ControllerConnection("test", self.log)
+        await self.connection.connect(
+            host="127.0.0.1", port=self.port, timeout=STD_TIMEOUT
+        )
+        self.connection.read_loop_task = asyncio.create_task(self.read_loop())
+
+    async def tearDown(self):
+        await self.connection.disconnect(timeout=STD_TIMEOUT)
+        self.server.close()
+        MTDome.encoding_tools.validation_raises_exception = (
+            self.validation_raises_exception
+        )
+
+    async def handle_client(self, reader, writer):
+        """Reply to all commands, with the number of commands received so far
+        as timeout."""
+        frame_reader = MTDome.encoding_tools.FrameReader(reader)
+        try:
+            while True:
+                for frame in await frame_reader.read_frames():
+                    command = MTDome.encoding_tools.decode(frame)
+                    self.received_commands.append(command["command"])
+                    reply = dict(response=0, timeout=float(len(self.received_commands)))
+                    if self.reply_with_id:
+                        reply["id"] = command["id"]
+                    writer.write(
+                        MTDome.encoding_tools.encode_into(bytearray(), **reply)
+                    )
+                    await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    async def read_loop(self):
+        """Hand the replies to the commands waiting for them."""
+        while True:
+            for frame in await self.connection.frame_reader.read_frames():
+                data = MTDome.encoding_tools.decode(frame)
+                reply_future = self.connection.pop_reply_future(data.get("id"))
+                if reply_future is not None and not reply_future.done():
+                    reply_future.set_result(data)
+
+    async def test_send_command(self):
+        data = await self.connection.send_command("stopAz", {}, timeout=STD_TIMEOUT)
+        self.assertEqual(data["response"], 0)
+        self.assertEqual(self.received_commands, ["stopAz"])
+        self.assertEqual(self.connection.pending_replies, {})
+
+    async def test_priority(self):
+        # Queue several commands before any of them can be written. The stop
+        # command is written first, even though it was queued last.
+        commands = ["moveAz", "moveEl", "crawlAz", "stop"]
+        priorities = [MTDome.NORMAL_PRIORITY] * 3 + [MTDome.HIGH_PRIORITY]
+        await asyncio.gather(
+            *[
+                self.connection.send_command(
+                    command,
+                    COMMAND_PARAMS[command],
+                    timeout=STD_TIMEOUT,
+                    priority=priority,
+                )
+                for command, priority in zip(commands, priorities)
+            ]
+        )
+        self.assertEqual(
+            self.received_commands, ["stop", "moveAz", "moveEl", "crawlAz"]
+        )
+
+    async def test_discard_queued_commands(self):
+        # Queue several motion commands before any of them can be written,
+        # then stop the azimuth like the CSC does. The queued azimuth motion
+        # commands are discarded, so they don't get written after the stop
+        # command.
+        async def stop_az():
+            discarded = self.connection.discard_queued_commands({"moveAz", "crawlAz"})
+            self.assertEqual(discarded, ["moveAz", "crawlAz"])
+            return await self.connection.send_command(
+                "stopAz", {}, timeout=STD_TIMEOUT, priority=MTDome.HIGH_PRIORITY
+            )
+
+        results = await asyncio.gather(
+            *[
+                self.connection.send_command(
+                    command, COMMAND_PARAMS[command], timeout=STD_TIMEOUT
+                )
+                for command in ["moveAz", "moveEl", "crawlAz"]
+            ],
+            stop_az(),
+            return_exceptions=True,
+        )
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertEqual(results[1]["response"], 0)
+        self.assertIsInstance(results[2], asyncio.CancelledError)
+        self.assertEqual(results[3]["response"], 0)
+        self.assertEqual(self.received_commands, ["stopAz", "moveEl"])
+        self.assertEqual(self.connection.pending_replies, {})
+
+    async def test_reply_without_id(self):
+        # Replies without id are matched with the commands in the order of
+        # writing, in which the stop command jumped ahead.
+        self.reply_with_id = False
+        commands = ["moveAz", "moveEl", "stop"]
+        priorities = [MTDome.NORMAL_PRIORITY] * 2 + [MTDome.HIGH_PRIORITY]
+        replies = await asyncio.gather(
+            *[
+                self.connection.send_command(
+                    command,
+                    COMMAND_PARAMS[command],
+                    timeout=STD_TIMEOUT,
+                    priority=priority,
+                )
+                for command, priority in zip(commands, priorities)
+            ]
+        )
+        self.assertEqual(self.received_commands, ["stop", "moveAz", "moveEl"])
+        self.assertEqual([reply["timeout"] for reply in replies], [2.0, 3.0, 1.0])
+        self.assertEqual(self.connection.pending_replies, {})
+        self.assertEqual(self.connection.written_command_ids, {})
+
+    async def test_disconnect(self):
+        # Commands waiting for their reply fail when disconnecting.
+        self.connection.read_loop_task.cancel()
+        send_task = asyncio.create_task(
+            self.connection.send_command("stopAz", {}, timeout=STD_TIMEOUT)
+        )
+        await asyncio.sleep(0.1)
+        await self.connection.disconnect(timeout=STD_TIMEOUT)
+        with self.assertRaises(ConnectionError):
+            await send_task
+        self.assertFalse(self.connection.connected)
+
+        # Commands fail right away when not connected.
+        with self.assertRaises(ConnectionError):
+            await self.connection.send_command("stopAz", {}, timeout=STD_TIMEOUT)
+
+
+if __name__ == "__main__":
+    asynctest.main()
@@ -23,6 +23,8 @@ import asynctest
 import logging
 import math
 
+import numpy as np
+
 from lsst.ts.MTDome.mock_llc.mock_motion import ElevationMotion
 from lsst.ts.idl.enums.MTDome import MotionState
 
@@ -412,3 +414,82 @@ class ElevationMotionTestCase(asynctest.TestCase):
             self.fail("Expected a ValueError.")
         except ValueError:
             pass
+
+    async def test_batch(self):
+        """Test computing the positions of the ElevationMotion for an array of
+        TAI times at once.
+        """
+        max_speed = math.radians(3.5)
+        velocity = math.radians(1.0)
+        await self.prepare_elevation_motion(
+            start_position=math.radians(80.0),
+            min_position=_MIN_POSITION,
+            max_position=_MAX_POSITION,
+            max_speed=max_speed,
+            start_tai=_start_tai,
+        )
+        await self.verify_elevation_motion_duration(
+            start_tai=_start_tai,
+            target_position=math.radians(85.0),
+            velocity=velocity,
+            expected_duration=0,
+            motion_state=MotionState.CRAWLING,
+        )
+        tai = _start_tai + np.array([1.0, 9.5, 10.0, 20.0])
+        (
+            positions,
+            velocities,
+            motion_states,
+        ) = self.elevation_motion.get_positions_velocities_and_motion_states(tai)
+        np.testing.assert_allclose(positions, np.radians([81.0, 89.5, 90.0, 90.0]))
+        np.testing.assert_allclose(velocities, [velocity, velocity, 0, 0])
+        np.testing.assert_array_equal(
+            motion_states,
+            [
+                MotionState.CRAWLING,
+                MotionState.CRAWLING,
+                MotionState.STOPPED,
+                MotionState.STOPPED,
+            ],
+        )
+        # The batch and scalar computations agree.
+        for i, tai_i in enumerate(tai):
+            (
+                position,
+                velocity,
+                motion_state,
+            ) = self.elevation_motion.get_position_velocity_and_motion_state(tai_i)
+            self.assertEqual(position, positions[i])
+            self.assertEqual(velocity, velocities[i])
+            self.assertEqual(motion_state, motion_states[i])
+
+        await self.prepare_elevation_motion(
+            start_position=math.radians(90.0),
+            min_position=_MIN_POSITION,
+            max_position=_MAX_POSITION,
+            max_speed=max_speed,
+            start_tai=_start_tai + 20.0,
+        )
+        await self.verify_elevation_motion_duration(
+            start_tai=_start_tai + 20.0,
+            target_position=math.radians(55.0),
+            velocity=0,
+            expected_duration=(math.radians(90.0) - math.radians(55.0)) / max_speed,
+            motion_state=MotionState.MOVING,
+        )
+        (
+            positions,
+            velocities,
+            motion_states,
+        ) = self.elevation_motion.get_positions_velocities_and_motion_states(
+            _start_tai + np.array([21.0, 35.0])
+        )
+        np.testing.assert_allclose(positions, np.radians([86.5, 55.0]))
+        np.testing.assert_allclose(velocities, [-max_speed, 0])
+        np.testing.assert_array_equal(
+            motion_states, [MotionState.MOVING, MotionState.STOPPED]
+        )
+        with self.assertRaises(ValueError):
+            self.elevation_motion.get_positions_velocities_and_motion_states(
+                _start_tai + np.array([19.0, 21.0])
+            )
@@ -0,0 +1,279 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import asyncio
+import json
+import threading
+import unittest
+
+import asynctest
+import jsonschema
+
+from lsst.ts.MTDome import encoding_tools
+from lsst.ts.MTDome import mock_llc
+
+
+class EncodingToolsTestCase(asynctest.TestCase):
+    def setUp(self):
+        self.validation_raises_exception = encoding_tools.validation_raises_exception
+        encoding_tools.validation_raises_exception = True
+
+    def tearDown(self):
+        encoding_tools.set_validation_policy(encoding_tools.ValidationPolicy.ALWAYS)
+        encoding_tools.validation_raises_exception = self.validation_raises_exception
+
+    def wait_for_background_validation(self):
+        """Wait until all background validations are done."""
+        if encoding_tools._validation_executor is not None:
+            encoding_tools._validation_executor.submit(lambda: None).result()
+
+    def test_command_schemas(self):
+        # There is a schema for each command in the command schema.
+        self.assertEqual(
+            set(encoding_tools.command_schemas),
+            set(encoding_tools.schemas["command"]["properties"]["command"]["enum"]),
+        )
+
+        encoding_tools.validate(
+            dict(command="moveAz", id=1, parameters=dict(position=0.1, velocity=0))
+        )
+        for command in (
+            # Missing parameter.
+            dict(command="moveAz", parameters=dict(position=0.1)),
+            # Too many parameters.
+            dict(command="moveEl", parameters=dict(position=0.1, velocity=0)),
+            # Unknown command.
+            dict(command="non-existent_command", parameters={}),
+        ):
+            with self.assertRaises(jsonschema.ValidationError):
+                encoding_tools.validate(command)
+
+    def test_cached_validators(self):
+        validator = encoding_tools.get_validator(("command", "stopAz"))
+        self.assertIs(validator, encoding_tools.get_validator(("command", "stopAz")))
+        self.assertIs(
+            encoding_tools.get_validator("timeout"),
+            encoding_tools.get_validator("timeout"),
+        )
+
+    def test_unknown_key(self):
+        with self.assertRaises(RuntimeError):
+            encoding_tools.validate(dict(response=0))
+
+    def test_validation_policy(self):
+        invalid_command = json.dumps(dict(command="moveAz", parameters={}))
+        other_invalid_command = json.dumps(
+            dict(command="moveAz", parameters=dict(position="0"))
+        )
+
+        # By default all messages are validated and validation failures raise
+        # an exception in unit tests.
+        with self.assertRaises(jsonschema.ValidationError):
+            encoding_tools.decode(invalid_command)
+
+        encoding_tools.set_validation_policy(encoding_tools.ValidationPolicy.OFF)
+        num_failures = encoding_tools.validation_failures["command"]
+        data = encoding_tools.decode(invalid_command)
+        self.assertEqual(data["command"], "moveAz")
+        self.assertEqual(encoding_tools.validation_failures["command"], num_failures)
+
+        # Background validation failures are counted but not raised.
+        encoding_tools.set_validation_policy(
+            encoding_tools.ValidationPolicy.SAMPLE, sample_percentage=100
+        )
+        encoding_tools.decode(invalid_command)
+        self.wait_for_background_validation()
+        self.assertEqual(
+            encoding_tools.validation_failures["command"], num_failures + 1
+        )
+
+        encoding_tools.set_validation_policy(
+            encoding_tools.ValidationPolicy.SAMPLE, sample_percentage=0
+        )
+        encoding_tools.decode(invalid_command)
+        self.wait_for_background_validation()
+        self.assertEqual(
+            encoding_tools.validation_failures["command"], num_failures + 1
+        )
+
+        # Only the first message of each shape is validated.
+        encoding_tools.set_validation_policy(
+            encoding_tools.ValidationPolicy.FIRST_OF_EACH_SHAPE
+        )
+        for i in range(3):
+            encoding_tools.decode(invalid_command)
+            encoding_tools.decode(other_invalid_command)
+        self.wait_for_background_validation()
+        self.assertEqual(
+            encoding_tools.validation_failures["command"], num_failures + 3
+        )
+
+    def test_validated_callback(self):
+        invalid_reply = json.dumps(dict(response=0, timeout="0"))
+        validated = threading.Event()
+
+        # The callback isn't called if the reply is validated right away.
+        with self.assertRaises(jsonschema.ValidationError):
+            encoding_tools.decode(invalid_reply, validated_callback=validated.set)
+        self.assertFalse(validated.is_set())
+
+        # The callback is called once the reply has been validated in the
+        # background, after the failure has been counted.
+        encoding_tools.set_validation_policy(
+            encoding_tools.ValidationPolicy.SAMPLE, sample_percentage=100
+        )
+        num_failures = encoding_tools.validation_failures["timeout"]
+        encoding_tools.decode(invalid_reply, validated_callback=validated.set)
+        self.assertTrue(validated.wait(timeout=5))
+        self.assertEqual(
+            encoding_tools.validation_failures["timeout"], num_failures + 1
+        )
+
+    def test_status_delta(self):
+        delta = {"response": 0, "id": 3, "LCS": dict(positionActual=[0.0] * 34)}
+        with self.assertRaises(jsonschema.ValidationError):
+            encoding_tools.validate(delta)
+        encoding_tools.validate(dict(delta=["LCS"], **delta))
+        with self.assertRaises(jsonschema.ValidationError):
+            encoding_tools.validate(
+                {"response": 0, "delta": ["LCS"], "LCS": dict(position=[0.0])}
+            )
+
+    def test_batch(self):
+        encoding_tools.validate(
+            dict(
+                command="batch",
+                id=1,
+                parameters=dict(
+                    commands=[
+                        dict(command="openShutter", parameters={}),
+                        dict(command="moveEl", parameters=dict(position=0.1)),
+                    ]
+                ),
+            )
+        )
+        encoding_tools.validate(
+            dict(
+                response=0,
+                id=1,
+                replies=[dict(response=0, timeout=20), dict(response=0, timeout=2.5)],
+            )
+        )
+        # The commands and replies in a batch are validated as well.
+        with self.assertRaises(jsonschema.ValidationError):
+            encoding_tools.validate(
+                dict(
+                    command="batch",
+                    parameters=dict(
+                        commands=[dict(command="moveEl", parameters=dict(position="0"))]
+                    ),
+                )
+            )
+        with self.assertRaises(jsonschema.ValidationError):
+            encoding_tools.validate(
+                dict(response=0, replies=[dict(response="0", timeout=2.5)])
+            )
+
+    def test_get_shape(self):
+        self.assertEqual(
+            encoding_tools.get_shape(dict(response=0, timeout=2.0)),
+            encoding_tools.get_shape(dict(response=3, timeout=-1)),
+        )
+        self.assertNotEqual(
+            encoding_tools.get_shape(dict(command="stopAz", parameters={})),
+            encoding_tools.get_shape(dict(command="stopEl", parameters={})),
+        )
+        self.assertNotEqual(
+            encoding_tools.get_shape(dict(response=0, LCS=dict(position=[0.0] * 2))),
+            encoding_tools.get_shape(dict(response=0, LCS=dict(position=[0.0] * 3))),
+        )
+
+    def test_encode_into(self):
+        buffer = bytearray(b"left over data")
+        frame = encoding_tools.encode_into(
+            buffer, command="moveEl", id=2, parameters=dict(position=0.1)
+        )
+        self.assertIs(frame, buffer)
+        self.assertTrue(frame.endswith(encoding_tools.TERMINATOR))
+        self.assertEqual(
+            encoding_tools.decode(frame[: -len(encoding_tools.TERMINATOR)]),
+            dict(command="moveEl", id=2, parameters=dict(position=0.1)),
+        )
+
+    async def test_frame_reader(self):
+        reader = asyncio.StreamReader()
+        frame_reader = encoding_tools.FrameReader(reader)
+        frames = [
+            json.dumps(dict(response=0, id=i, timeout=2.0)).encode() for i in range(3)
+        ]
+
+        # Several frames and the start of another frame in a single read.
+        reader.feed_data(b"\r\n".join(frames) + b"\r\n" + frames[0][:5])
+        self.assertEqual(await frame_reader.read_frames(), frames)
+
+        # The rest of the frame is returned once it has been read.
+        reader.feed_data(frames[0][5:])
+        read_task = asyncio.create_task(frame_reader.read_frames())
+        await asyncio.sleep(0)
+        self.assertFalse(read_task.done())
+        reader.feed_data(b"\r\n")
+        self.assertEqual(await read_task, [frames[0]])
+
+        reader.feed_data(frames[1][:5])
+        reader.feed_eof()
+        with self.assertRaises(asyncio.IncompleteReadError) as cm:
+            await frame_reader.read_frames()
+        self.assertEqual(cm.exception.partial, frames[1][:5])
+
+    @unittest.skipIf(encoding_tools.msgpack is None, "msgpack is not installed")
+    async def test_msgpack_frames(self):
+        reader = asyncio.StreamReader()
+        frame_reader = encoding_tools.FrameReader(reader)
+        frame_reader.wire_format = encoding_tools.WireFormat.MSGPACK
+        lcs = mock_llc.LcsStatus()
+        await lcs.determine_status(current_tai=0)
+        replies = [
+            dict(response=0, id=1, timeout=2.0),
+            {"response": 0, "id": 2, "LCS": lcs.llc_status},
+        ]
+        data = bytearray()
+        buffer = bytearray()
+        for reply in replies:
+            data += encoding_tools.encode_msgpack_into(buffer, **reply)
+
+        # A frame which is split over several reads.
+        reader.feed_data(data[:-5])
+        self.assertEqual(len(await frame_reader.read_frames()), 1)
+        reader.feed_data(data[-5:])
+        frames = await frame_reader.read_frames()
+        self.assertEqual(
+            encoding_tools.decode(frames[0], encoding_tools.WireFormat.MSGPACK),
+            replies[1],
+        )
+
+        # MessagePack data are validated against the same schemas as JSON.
+        encoding_tools.encode_msgpack_into(buffer, response=0, timeout="2.0")
+        with self.assertRaises(jsonschema.ValidationError):
+            encoding_tools.decode(buffer[4:], encoding_tools.WireFormat.MSGPACK)
+
+
+if __name__ == "__main__":
+    unittest.main()
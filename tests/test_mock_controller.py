@@ -25,6 +25,7 @@ from asynctest.mock import CoroutineMock
 import logging
 import math
 import pytest
+import unittest
 
 import numpy as np
 
@@ -134,6 +135,36 @@ class MockTestCase(asynctest.TestCase):
         self.assertEqual(self.data["response"], 3)
         self.assertEqual(self.data["timeout"], -1)
 
+    async def test_command_id(self):
+        # The id of a command is echoed in the reply so the client can match
+        # the reply to the command.
+        command_id = 42
+        await self.write(command="stopAz", id=command_id, parameters={})
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+        self.assertEqual(self.data["id"], command_id)
+
+        await self.write(command="statusAMCS", id=command_id + 1, parameters={})
+        self.data = await self.read()
+        self.assertEqual(self.data["id"], command_id + 1)
+        self.assertIn(LlcName.AMCS.value, self.data)
+
+        # A command without id results in a reply without id.
+        await self.write(command="stopAz", parameters={})
+        self.data = await self.read()
+        self.assertNotIn("id", self.data)
+
+    def disable_acceleration_limits(self):
+        """Make AMCS and LWSCS move at maximum speed all the way, so the
+        positions during a move are easy to compute."""
+        for motion in (
+            self.mock_ctrl.amcs.azimuth_motion,
+            self.mock_ctrl.lwscs.elevation_motion,
+        ):
+            motion.set_motion_limits(
+                max_speed=motion._max_speed, max_acceleration=None, max_jerk=None
+            )
+
     async def prepare_amcs_move(
         self, start_position, target_position, target_velocity,
     ):
@@ -154,6 +185,7 @@ class MockTestCase(asynctest.TestCase):
         -------
 
         """
+        self.disable_acceleration_limits()
         # Set the TAI time in the mock controller for easier control
         self.mock_ctrl.current_tai = _CURRENT_TAI
         self.mock_ctrl.amcs.azimuth_motion._start_tai = self.mock_ctrl.current_tai
@@ -360,6 +392,45 @@ class MockTestCase(asynctest.TestCase):
             amcs_status["status"]["error"], expected_error,
         )
 
+    async def test_moveAz_s_curve(self):
+        # Without a config command the default jerk and acceleration limits
+        # are used, so a 10 degree move takes 2.25 s to accelerate to 1.5
+        # deg/s over 1.6875 degrees, 2.25 s to decelerate over 1.6875 degrees
+        # and cruises over the remaining 6.625 degrees.
+        self.mock_ctrl.current_tai = _CURRENT_TAI
+        await self.write(
+            command="moveAz", parameters={"position": math.radians(10), "velocity": 0},
+        )
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+        self.assertAlmostEqual(self.data["timeout"], 4.5 + 6.625 / 1.5)
+        (
+            position,
+            velocity,
+            motion_state,
+        ) = self.mock_ctrl.amcs.azimuth_motion.get_position_velocity_and_motion_state(
+            _CURRENT_TAI + 2.25
+        )
+        self.assertAlmostEqual(position, math.radians(1.6875))
+        self.assertAlmostEqual(velocity, math.radians(1.5))
+        self.assertEqual(motion_state, MotionState.MOVING)
+
+        # The status reports the time until the move ends, and once it has
+        # ended that the motion state doesn't change anymore.
+        self.mock_ctrl.current_tai = _CURRENT_TAI + 2.25
+        await self.write(command="statusAMCS", parameters={})
+        self.data = await self.read()
+        amcs_status = self.data[LlcName.AMCS.value]
+        self.assertAlmostEqual(
+            amcs_status["timeToTransition"], 2.25 + 6.625 / 1.5,
+        )
+        self.mock_ctrl.current_tai = _CURRENT_TAI + 10
+        await self.write(command="statusAMCS", parameters={})
+        self.data = await self.read()
+        amcs_status = self.data[LlcName.AMCS.value]
+        self.assertEqual(amcs_status["status"]["status"], MotionState.STOPPED.name)
+        self.assertIsNone(amcs_status["timeToTransition"])
+
     async def test_crawlAz(self):
         # Set the TAI time in the mock controller for easier control
         self.mock_ctrl.current_tai = _CURRENT_TAI
@@ -389,6 +460,7 @@ class MockTestCase(asynctest.TestCase):
         )
 
     async def test_stopAz(self):
+        self.disable_acceleration_limits()
         # Set the TAI time in the mock controller for easier control
         self.mock_ctrl.current_tai = _CURRENT_TAI
         # Set the mock device status TAI time to the mock controller time for
@@ -455,6 +527,7 @@ class MockTestCase(asynctest.TestCase):
         -------
 
         """
+        self.disable_acceleration_limits()
         # Set the TAI time in the mock controller for easier control
         self.mock_ctrl.current_tai = _CURRENT_TAI
         self.mock_ctrl.lwscs.elevation_motion._start_position = start_position
@@ -551,6 +624,70 @@ class MockTestCase(asynctest.TestCase):
         except Exception:
             pass
 
+    async def test_moveAzEl(self):
+        self.mock_ctrl.current_tai = _CURRENT_TAI
+        await self.write(
+            command="moveAzEl",
+            parameters={
+                "azimuth": math.radians(10),
+                "azimuthVelocity": 0,
+                "elevation": math.radians(5),
+            },
+        )
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+        self.assertEqual(
+            self.data["timeout"],
+            max(self.mock_ctrl.amcs.duration, self.mock_ctrl.lwscs.duration),
+        )
+        self.assertGreater(self.mock_ctrl.amcs.duration, 0)
+        self.assertGreater(self.mock_ctrl.lwscs.duration, 0)
+
+        # Both axes move until the end of their own motion.
+        for time_diff, expected_status in [
+            (self.mock_ctrl.amcs.duration - 0.1, MotionState.MOVING),
+            (self.mock_ctrl.amcs.duration + 0.1, MotionState.STOPPED),
+        ]:
+            self.mock_ctrl.current_tai = _CURRENT_TAI + time_diff
+            await self.write(command="statusAMCS", parameters={})
+            self.data = await self.read()
+            amcs_status = self.data[LlcName.AMCS.value]
+            self.assertEqual(amcs_status["status"]["status"], expected_status.name)
+        for time_diff, expected_status in [
+            (self.mock_ctrl.lwscs.duration - 0.1, MotionState.MOVING),
+            (self.mock_ctrl.lwscs.duration + 0.1, MotionState.STOPPED),
+        ]:
+            self.mock_ctrl.current_tai = _CURRENT_TAI + time_diff
+            await self.write(command="statusLWSCS", parameters={})
+            self.data = await self.read()
+            lwscs_status = self.data[LlcName.LWSCS.value]
+            self.assertEqual(lwscs_status["status"], expected_status.name)
+
+    async def test_moveAzEl_error(self):
+        self.mock_ctrl.current_tai = _CURRENT_TAI
+        # Neither axis moves if one of the parameters is incorrect.
+        for azimuth_velocity, elevation in [(0, -1.0), (1.0, 0.1)]:
+            await self.write(
+                command="moveAzEl",
+                parameters={
+                    "azimuth": 0.1,
+                    "azimuthVelocity": azimuth_velocity,
+                    "elevation": elevation,
+                },
+            )
+            self.data = await self.read()
+            self.assertEqual(self.data["response"], 3)
+            self.mock_ctrl.current_tai = self.mock_ctrl.current_tai + 0.1
+            await self.write(command="statusAll", parameters={})
+            self.data = await self.read()
+            self.assertEqual(
+                self.data[LlcName.AMCS.value]["status"]["status"],
+                MotionState.STOPPED.name,
+            )
+            self.assertEqual(
+                self.data[LlcName.LWSCS.value]["status"], MotionState.STOPPED.name
+            )
+
     async def test_stopEl(self):
         start_position = 0
         target_position = math.radians(5)
@@ -578,6 +715,7 @@ class MockTestCase(asynctest.TestCase):
         )
 
     async def test_stop(self):
+        self.disable_acceleration_limits()
         # Set the TAI time in the mock controller for easier control
         self.mock_ctrl.current_tai = _CURRENT_TAI
         # Set the mock device statuses TAI time to the mock controller time for
@@ -719,6 +857,60 @@ class MockTestCase(asynctest.TestCase):
             expected_position=math.radians(0.2),
         )
 
+    async def test_trackTrajectory(self):
+        self.mock_ctrl.current_tai = _CURRENT_TAI
+        # Upload a trajectory in two chunks, of which the second one replaces
+        # the last sample of the first one.
+        for tai, position in [
+            ([1.0, 2.0, 3.0], [10.0, 10.1, 10.2]),
+            ([3.0, 4.0], [10.3, 10.4]),
+        ]:
+            await self.write(
+                command="trackTrajectory",
+                parameters={
+                    "system": LlcName.AMCS.value,
+                    "tai": [_CURRENT_TAI + value for value in tai],
+                    "position": np.radians(position).tolist(),
+                    "velocity": [math.radians(0.1)] * len(tai),
+                },
+            )
+            self.data = await self.read()
+            self.assertEqual(self.data["response"], 0)
+            self.assertAlmostEqual(self.data["timeout"], tai[-1])
+
+        for time_diff, expected_position in [(2.0, 10.1), (3.0, 10.3), (5.0, 10.5)]:
+            self.mock_ctrl.current_tai = _CURRENT_TAI + time_diff
+            await self.write(command="statusAMCS", parameters={})
+            self.data = await self.read()
+            amcs_status = self.data[LlcName.AMCS.value]
+            self.assertEqual(
+                amcs_status["status"]["status"], MotionState.CRAWLING.name,
+            )
+            self.assertAlmostEqual(
+                amcs_status["positionActual"], math.radians(expected_position)
+            )
+            self.assertAlmostEqual(amcs_status["velocityActual"], math.radians(0.1))
+
+        # Samples in the past are rejected, without changing the commanded
+        # position.
+        for llc_name, llc in [
+            (LlcName.AMCS, self.mock_ctrl.amcs),
+            (LlcName.LWSCS, self.mock_ctrl.lwscs),
+        ]:
+            position_commanded = llc.position_commanded
+            await self.write(
+                command="trackTrajectory",
+                parameters={
+                    "system": llc_name.value,
+                    "tai": [_CURRENT_TAI],
+                    "position": [0.1],
+                    "velocity": [0.0],
+                },
+            )
+            self.data = await self.read()
+            self.assertEqual(self.data["response"], 3)
+            self.assertEqual(llc.position_commanded, position_commanded)
+
     async def prepare_louvers(self, louver_ids, target_positions):
         """Utility method for preparing the louvers for easier testing.
 
@@ -998,6 +1190,29 @@ class MockTestCase(asynctest.TestCase):
         self.assertEqual(self.mock_ctrl.amcs.amcs_limits.amax, amcs_amax)
         self.assertEqual(self.mock_ctrl.amcs.amcs_limits.vmax, amcs_vmax)
 
+        # The configured jerk and acceleration limits are used for moving, so
+        # a 10 degree move takes 1 s to accelerate, 1 s to decelerate and
+        # cruises for the remaining 9.625 degrees.
+        self.mock_ctrl.current_tai = _CURRENT_TAI
+        self.mock_ctrl.amcs.azimuth_motion._start_tai = self.mock_ctrl.current_tai
+        await self.write(
+            command="moveAz",
+            parameters={"position": math.radians(10.0), "velocity": 0},
+        )
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+        self.assertAlmostEqual(self.data["timeout"], 2.0 + 9.625 / 0.375)
+        (
+            position,
+            velocity,
+            motion_state,
+        ) = self.mock_ctrl.amcs.azimuth_motion.get_position_velocity_and_motion_state(
+            _CURRENT_TAI + 1.0
+        )
+        self.assertAlmostEqual(position, math.radians(0.1875))
+        self.assertAlmostEqual(velocity, amcs_vmax)
+        self.assertEqual(motion_state, MotionState.MOVING)
+
         # All LWSCS values within the limits.
         lwscs_jmax = math.radians(2.5)
         lwscs_amax = math.radians(0.75)
@@ -1192,6 +1407,336 @@ class MockTestCase(asynctest.TestCase):
             thcs_status["temperature"], [0.0] * NUM_THERMO_SENSORS,
         )
 
+    async def test_status_all(self):
+        await self.write(command="statusAll", parameters={})
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+        for llc_name in LlcName:
+            self.assertIn(llc_name.value, self.data)
+        amcs_status = self.data[LlcName.AMCS.value]
+        self.assertEqual(
+            amcs_status["status"]["status"], MotionState.STOPPED.name,
+        )
+        lcs_status = self.data[LlcName.LCS.value]
+        self.assertEqual(
+            lcs_status["positionActual"], [0.0] * NUM_LOUVERS,
+        )
+        thcs_status = self.data[LlcName.THCS.value]
+        self.assertEqual(
+            thcs_status["temperature"], [0.0] * NUM_THERMO_SENSORS,
+        )
+
+    @unittest.skipIf(MTDome.encoding_tools.msgpack is None, "msgpack is not installed")
+    async def test_set_wire_format(self):
+        await self.write(
+            command="setWireFormat", parameters={"formats": ["unknown", "msgpack"]}
+        )
+        # The reply to the setWireFormat command is written as JSON.
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+        self.assertEqual(self.data["wireFormat"], "msgpack")
+
+        # All frames after that are written as MessagePack.
+        frame_reader = MTDome.encoding_tools.FrameReader(self.reader)
+        frame_reader.wire_format = MTDome.encoding_tools.WireFormat.MSGPACK
+        await self.write(command="statusLCS", parameters={})
+        frames = await asyncio.wait_for(frame_reader.read_frames(), timeout=1)
+        self.assertEqual(len(frames), 1)
+        self.data = MTDome.encoding_tools.decode(
+            frames[0], MTDome.encoding_tools.WireFormat.MSGPACK
+        )
+        self.assertEqual(self.data["response"], 0)
+        self.assertEqual(
+            self.data[LlcName.LCS.value]["positionActual"], [0.0] * NUM_LOUVERS,
+        )
+
+    async def test_set_wire_format_unsupported(self):
+        await self.write(command="setWireFormat", parameters={"formats": ["unknown"]})
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 3)
+        self.assertNotIn("wireFormat", self.data)
+        self.assertEqual(
+            self.mock_ctrl.connections[0].wire_format,
+            MTDome.encoding_tools.WireFormat.JSON,
+        )
+
+    async def test_subscribe(self):
+        period = 0.1
+        await self.write(
+            command="subscribe",
+            parameters={"system": LlcName.LWSCS.value, "period": period},
+        )
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+        self.assertIn(LlcName.LWSCS, self.mock_ctrl.connections[0].subscription_tasks)
+
+        # The status now gets pushed without sending status commands.
+        for i in range(2):
+            self.data = await self.read()
+            self.assertEqual(self.data["response"], 0)
+            lwscs_status = self.data[LlcName.LWSCS.value]
+            self.assertEqual(
+                lwscs_status["status"], MotionState.STOPPED.name,
+            )
+
+        # A period of 0 unsubscribes.
+        await self.write(
+            command="subscribe",
+            parameters={"system": LlcName.LWSCS.value, "period": 0},
+        )
+        # Skip any status that got pushed before the reply.
+        self.data = await self.read()
+        while "timeout" not in self.data:
+            self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+        self.assertNotIn(
+            LlcName.LWSCS, self.mock_ctrl.connections[0].subscription_tasks
+        )
+
+    async def test_subscribe_motion_transition(self):
+        # The status gets pushed as soon as the motion state changes, long
+        # before the next period.
+        period = 10.0
+        self.mock_ctrl.current_tai = _CURRENT_TAI
+        self.mock_ctrl.amcs.azimuth_motion._start_tai = self.mock_ctrl.current_tai
+        await self.write(
+            command="subscribe",
+            parameters={"system": LlcName.AMCS.value, "period": period},
+        )
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+
+        target_velocity = math.radians(0.1)
+        await self.write(
+            command="moveAz",
+            parameters={"position": math.radians(0.05), "velocity": target_velocity},
+        )
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+        duration = self.data["timeout"]
+        self.assertLess(duration, 1.0)
+        self.assertEqual(
+            self.mock_ctrl.amcs.azimuth_motion.next_transition_tai(_CURRENT_TAI),
+            _CURRENT_TAI + duration,
+        )
+        # Let the time pass for the mock controller.
+        self.mock_ctrl.current_tai = _CURRENT_TAI + duration
+
+        self.data = await self.read()
+        amcs_status = self.data[LlcName.AMCS.value]
+        self.assertEqual(amcs_status["status"]["status"], MotionState.CRAWLING.name)
+        # Crawling goes on forever.
+        self.assertIsNone(
+            self.mock_ctrl.amcs.azimuth_motion.next_transition_tai(
+                self.mock_ctrl.current_tai
+            )
+        )
+
+    async def test_set_status_delta(self):
+        await self.write(command="setStatusDelta", parameters={"keyframeInterval": 3})
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+
+        self.mock_ctrl.current_tai = _CURRENT_TAI
+        deltas = []
+        for i in range(4):
+            if i == 2:
+                await self.mock_ctrl.lcs.setLouvers([50.0] * NUM_LOUVERS)
+            await self.write(command="statusLCS", parameters={})
+            self.data = await self.read()
+            self.assertEqual(self.data["response"], 0)
+            deltas.append(self.data)
+
+        # The first status is a full status.
+        self.assertNotIn("delta", deltas[0])
+        self.assertEqual(
+            deltas[0][LlcName.LCS.value]["positionActual"], [0.0] * NUM_LOUVERS
+        )
+        # The second one contains nothing since nothing changed.
+        self.assertEqual(deltas[1]["delta"], [LlcName.LCS.value])
+        self.assertEqual(deltas[1][LlcName.LCS.value], {})
+        # The third one only contains what changed.
+        self.assertEqual(deltas[2]["delta"], [LlcName.LCS.value])
+        self.assertIn("positionCommanded", deltas[2][LlcName.LCS.value])
+        self.assertNotIn("timestampUTC", deltas[2][LlcName.LCS.value])
+        # The fourth one is a full status again.
+        self.assertNotIn("delta", deltas[3])
+        self.assertIn("timestampUTC", deltas[3][LlcName.LCS.value])
+
+    async def test_status_fields(self):
+        fields = ["status", "positionActual", "velocityActual", "timestampUTC"]
+        await self.write(command="statusAMCS", parameters={"fields": fields})
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+        # Only the requested items are returned, as a delta to merge into the
+        # last full status.
+        self.assertEqual(self.data["delta"], [LlcName.AMCS.value])
+        amcs_status = self.data[LlcName.AMCS.value]
+        self.assertEqual(sorted(amcs_status), sorted(fields))
+        self.assertEqual(
+            amcs_status["status"]["status"], MotionState.STOPPED.name,
+        )
+
+        # Unknown fields are rejected.
+        await self.write(command="statusLWSCS", parameters={"fields": ["unknown"]})
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 3)
+
+    async def test_batch(self):
+        # Open the dome for the night in one batch.
+        await self.write(
+            command="batch",
+            parameters={
+                "commands": [
+                    {"command": "openShutter", "parameters": {}},
+                    {
+                        "command": "setLouvers",
+                        "parameters": {"position": [100.0] * NUM_LOUVERS},
+                    },
+                    {"command": "moveEl", "parameters": {"position": 0.1}},
+                    {
+                        "command": "moveAz",
+                        "parameters": {"position": 0.1, "velocity": 0},
+                    },
+                ]
+            },
+            id=1,
+        )
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+        self.assertEqual(self.data["id"], 1)
+        replies = self.data["replies"]
+        self.assertEqual(len(replies), 4)
+        self.assertEqual([reply["response"] for reply in replies], [0] * 4)
+        self.assertEqual(replies[2]["timeout"], self.mock_ctrl.lwscs.duration)
+        self.assertEqual(replies[3]["timeout"], self.mock_ctrl.amcs.duration)
+        self.assertEqual(self.mock_ctrl.amcs.position_commanded, 0.1)
+
+        # Execution stops at the first command that fails.
+        await self.write(
+            command="batch",
+            parameters={
+                "commands": [
+                    {"command": "stopAz", "parameters": {}},
+                    {"command": "moveEl", "parameters": {"position": -1.0}},
+                    {"command": "stopEl", "parameters": {}},
+                ]
+            },
+        )
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+        self.assertEqual(
+            [reply["response"] for reply in self.data["replies"]], [0, 3],
+        )
+
+        # A batch may not contain a batch.
+        await self.write(
+            command="batch",
+            parameters={
+                "commands": [
+                    {
+                        "command": "batch",
+                        "parameters": {
+                            "commands": [{"command": "stopAz", "parameters": {}}]
+                        },
+                    },
+                ]
+            },
+        )
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 3)
+
+    async def test_batch_missing_items(self):
+        # Temporarily disable validation exceptions for the unit test.
+        # Validation of the commands should be done by the client and the
+        # simulator has such validation built in.
+        MTDome.encoding_tools.validation_raises_exception = False
+        # A command in a batch without parameters is executed without any. A
+        # command without name is unsupported, which stops the execution.
+        await self.write(
+            command="batch",
+            parameters={
+                "commands": [
+                    {"command": "stopAz"},
+                    {"parameters": {}},
+                    {"command": "stopEl"},
+                ]
+            },
+            id=1,
+        )
+        self.data = await self.read()
+        self.assertEqual(self.data["response"], 0)
+        self.assertEqual(self.data["id"], 1)
+        self.assertEqual(
+            [reply["response"] for reply in self.data["replies"]], [0, 2],
+        )
+
+    async def test_several_clients(self):
+        num_clients = 3
+        num_commands = 5
+        clients = [(self.reader, self.writer)]
+        for i in range(num_clients - 1):
+            clients.append(
+                await asyncio.wait_for(
+                    asyncio.open_connection(host="127.0.0.1", port=self.mock_ctrl.port),
+                    timeout=1,
+                )
+            )
+        await asyncio.sleep(0.1)
+        self.assertEqual(len(self.mock_ctrl.connections), num_clients)
+
+        async def send_status_commands(client_id, reader, writer):
+            """Send status commands with ids that are unique to the client and
+            return the ids of the replies."""
+            for i in range(num_commands):
+                writer.write(
+                    MTDome.encoding_tools.encode_into(
+                        bytearray(),
+                        command="statusAMCS",
+                        id=client_id * 100 + i,
+                        parameters={},
+                    )
+                )
+            await writer.drain()
+            reply_ids = []
+            for i in range(num_commands):
+                read_bytes = await asyncio.wait_for(reader.readuntil(b"\r\n"), 1)
+                reply_ids.append(MTDome.encoding_tools.decode(read_bytes)["id"])
+            return reply_ids
+
+        # Each client only gets the replies to its own commands.
+        all_reply_ids = await asyncio.gather(
+            *[
+                send_status_commands(client_id, reader, writer)
+                for client_id, (reader, writer) in enumerate(clients)
+            ]
+        )
+        for client_id, reply_ids in enumerate(all_reply_ids):
+            self.assertEqual(
+                reply_ids, [client_id * 100 + i for i in range(num_commands)]
+            )
+        for statistics in self.mock_ctrl.get_statistics():
+            self.assertEqual(statistics["num_commands"], num_commands)
+            self.assertEqual(statistics["num_messages_written"], num_commands)
+            self.assertGreater(statistics["num_bytes_read"], 0)
+            self.assertGreater(statistics["num_bytes_written"], 0)
+
+        # All clients control the same lower level components.
+        reader, writer = clients[1]
+        writer.write(
+            MTDome.encoding_tools.encode_into(
+                bytearray(), command="crawlAz", parameters={"velocity": 0.01}
+            )
+        )
+        await writer.drain()
+        await asyncio.wait_for(reader.readuntil(b"\r\n"), 1)
+        self.assertEqual(self.mock_ctrl.amcs.position_commanded, math.inf)
+
+        for reader, writer in clients[1:]:
+            writer.close()
+        await asyncio.sleep(0.1)
+        self.assertEqual(len(self.mock_ctrl.connections), 1)
+
 
 if __name__ == "__main__":
     asynctest.main()
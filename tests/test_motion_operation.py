@@ -0,0 +1,70 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import asynctest
+
+from lsst.ts import MTDome
+from lsst.ts.MTDome.llc_name import LlcName
+from lsst.ts.idl.enums.MTDome import MotionState
+
+COMMAND_TAI = 10001.0
+DURATION = 10.0
+
+
+class MotionOperationTestCase(asynctest.TestCase):
+    async def setUp(self):
+        self.operation = MTDome.MotionOperation(
+            llc_name=LlcName.LWSCS,
+            command="moveEl",
+            target_states=frozenset((MotionState.STOPPED,)),
+            command_tai=COMMAND_TAI,
+            duration=DURATION,
+        )
+
+    async def test_motion_seen(self):
+        # The STOPPED state before the move starts doesn't complete the move.
+        self.assertFalse(self.operation.update(MotionState.STOPPED, COMMAND_TAI + 1))
+        self.assertFalse(self.operation.update(MotionState.MOVING, COMMAND_TAI + 2))
+        self.assertTrue(self.operation.update(MotionState.STOPPED, COMMAND_TAI + 3))
+        self.assertEqual(self.operation.end_tai, COMMAND_TAI + 3)
+        self.assertEqual(self.operation.done_future.result(), MotionState.STOPPED)
+        # Later statuses are ignored.
+        self.assertFalse(self.operation.update(MotionState.STOPPED, COMMAND_TAI + 4))
+
+    async def test_expected_end(self):
+        # If no other motion state is reported, for instance because the move
+        # was too short, the move completes at the expected end.
+        self.assertFalse(
+            self.operation.update(MotionState.STOPPED, COMMAND_TAI + DURATION - 1)
+        )
+        self.assertTrue(
+            self.operation.update(MotionState.STOPPED, COMMAND_TAI + DURATION + 1)
+        )
+
+    async def test_abort(self):
+        self.operation.abort()
+        self.assertTrue(self.operation.done_future.cancelled())
+        self.assertFalse(self.operation.update(MotionState.MOVING, COMMAND_TAI + 1))
+        self.assertFalse(self.operation.update(MotionState.STOPPED, COMMAND_TAI + 2))
+
+
+if __name__ == "__main__":
+    asynctest.main()
@@ -0,0 +1,467 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import asynctest
+import math
+
+import numpy as np
+
+from lsst.ts.MTDome.mock_llc.mock_motion import (
+    AzimuthMotion,
+    ElevationMotion,
+    MotionProfile,
+)
+from lsst.ts.idl.enums.MTDome import MotionState
+
+START_TAI = 10001.0
+MAX_SPEED = math.radians(1.5)
+MAX_ACCELERATION = math.radians(0.75)
+MAX_JERK = math.radians(3.0)
+# The time step (sec) at which the profiles are sampled.
+TIME_STEP = 0.001
+
+
+class MotionProfileTestCase(asynctest.TestCase):
+    def verify_profile(self, profile, duration, start_position, start_velocity):
+        """Verify that a profile is continuous and respects the limits.
+
+        Parameters
+        ----------
+        profile: `MotionProfile`
+            The profile to verify.
+        duration: `float`
+            The duration [s] of the profile.
+        start_position: `float`
+            The expected start position [rad].
+        start_velocity: `float`
+            The expected start velocity [rad/s].
+        """
+        self.assertAlmostEqual(profile.end_tai, START_TAI + duration)
+        tai = START_TAI + np.arange(0, duration + 1, TIME_STEP)
+        positions, velocities = profile.evaluate(tai)
+        self.assertAlmostEqual(positions[0], start_position)
+        self.assertAlmostEqual(velocities[0], start_velocity)
+        self.assertLessEqual(np.max(np.abs(velocities)), MAX_SPEED * (1 + 1e-9))
+        # The numerical derivatives of the position and velocity agree with
+        # the velocity and the limits.
+        np.testing.assert_allclose(
+            np.diff(positions) / TIME_STEP,
+            (velocities[1:] + velocities[:-1]) / 2,
+            atol=1e-8,
+        )
+        accelerations = np.diff(velocities) / TIME_STEP
+        self.assertLessEqual(
+            np.max(np.abs(accelerations)), MAX_ACCELERATION * (1 + 1e-6)
+        )
+        self.assertLessEqual(
+            np.max(np.abs(np.diff(accelerations) / TIME_STEP)), MAX_JERK * (1 + 1e-6),
+        )
+
+    def test_velocity_change(self):
+        # The maximum acceleration is reached.
+        profile, duration = MotionProfile.plan_velocity_change(
+            start_tai=START_TAI,
+            position=1.0,
+            velocity=-MAX_SPEED,
+            end_velocity=MAX_SPEED,
+            max_acceleration=MAX_ACCELERATION,
+            max_jerk=MAX_JERK,
+        )
+        jerk_duration = MAX_ACCELERATION / MAX_JERK
+        self.assertAlmostEqual(
+            duration, 2 * MAX_SPEED / MAX_ACCELERATION + jerk_duration
+        )
+        self.assertEqual(len(profile.tai), 4)
+        self.verify_profile(profile, duration, 1.0, -MAX_SPEED)
+        # The velocity profile is symmetric, so the position returns.
+        positions, velocities = profile.evaluate(np.array([START_TAI + duration]))
+        self.assertAlmostEqual(positions[0], 1.0)
+        self.assertAlmostEqual(velocities[0], MAX_SPEED)
+
+        # The maximum acceleration is not reached.
+        velocity_change = math.radians(0.1)
+        profile, duration = MotionProfile.plan_velocity_change(
+            start_tai=START_TAI,
+            position=1.0,
+            velocity=0.0,
+            end_velocity=velocity_change,
+            max_acceleration=MAX_ACCELERATION,
+            max_jerk=MAX_JERK,
+        )
+        self.assertAlmostEqual(duration, 2 * math.sqrt(velocity_change / MAX_JERK))
+        self.assertEqual(len(profile.tai), 3)
+        self.verify_profile(profile, duration, 1.0, 0.0)
+
+        # Without limits the velocity changes instantaneously.
+        profile, duration = MotionProfile.plan_velocity_change(
+            start_tai=START_TAI, position=1.0, velocity=0.0, end_velocity=MAX_SPEED
+        )
+        self.assertEqual(duration, 0.0)
+        positions, velocities = profile.evaluate(START_TAI + np.array([0.0, 2.0]))
+        np.testing.assert_allclose(positions, [1.0, 1.0 + 2 * MAX_SPEED])
+        np.testing.assert_allclose(velocities, [MAX_SPEED, MAX_SPEED])
+
+    def test_move(self):
+        for start_velocity, distance, end_velocity in [
+            # A long move which reaches the maximum speed.
+            (0.0, math.radians(20.0), 0.0),
+            (0.0, math.radians(-20.0), math.radians(-0.5)),
+            # A short move which doesn't.
+            (0.0, math.radians(0.5), 0.0),
+            (math.radians(0.5), math.radians(-0.5), 0.0),
+            # A move which overshoots because the start velocity is too high.
+            (MAX_SPEED, math.radians(0.5), 0.0),
+        ]:
+            with self.subTest(
+                start_velocity=start_velocity,
+                distance=distance,
+                end_velocity=end_velocity,
+            ):
+                profile, duration = MotionProfile.plan_move(
+                    start_tai=START_TAI,
+                    position=2.0,
+                    velocity=start_velocity,
+                    distance=distance,
+                    end_velocity=end_velocity,
+                    max_speed=MAX_SPEED,
+                    max_acceleration=MAX_ACCELERATION,
+                    max_jerk=MAX_JERK,
+                )
+                self.assertLessEqual(len(profile.tai), 8)
+                self.verify_profile(profile, duration, 2.0, start_velocity)
+                positions, velocities = profile.evaluate(
+                    START_TAI + duration + np.array([0.0, 10.0])
+                )
+                np.testing.assert_allclose(
+                    positions,
+                    [2.0 + distance, 2.0 + distance + 10 * end_velocity],
+                    atol=1e-9,
+                )
+                np.testing.assert_allclose(velocities, end_velocity, atol=1e-9)
+
+        # The duration of a long move from and to rest.
+        profile, duration = MotionProfile.plan_move(
+            start_tai=START_TAI,
+            position=0.0,
+            velocity=0.0,
+            distance=math.radians(20.0),
+            end_velocity=0.0,
+            max_speed=MAX_SPEED,
+            max_acceleration=MAX_ACCELERATION,
+            max_jerk=MAX_JERK,
+        )
+        acceleration_duration = (
+            MAX_SPEED / MAX_ACCELERATION + MAX_ACCELERATION / MAX_JERK
+        )
+        self.assertAlmostEqual(
+            duration, acceleration_duration + math.radians(20.0) / MAX_SPEED
+        )
+
+        # The duration of short moves from and to rest, which reach the
+        # maximum acceleration or not.
+        jerk_duration = MAX_ACCELERATION / MAX_JERK
+        for distance in np.radians([0.5, -0.5, 0.05, -0.05]):
+            with self.subTest(distance=distance):
+                profile, duration = MotionProfile.plan_move(
+                    start_tai=START_TAI,
+                    position=0.0,
+                    velocity=0.0,
+                    distance=distance,
+                    end_velocity=0.0,
+                    max_speed=MAX_SPEED,
+                    max_acceleration=MAX_ACCELERATION,
+                    max_jerk=MAX_JERK,
+                )
+                if abs(distance) >= 2 * MAX_ACCELERATION * jerk_duration ** 2:
+                    peak_speed = (
+                        MAX_ACCELERATION
+                        / 2
+                        * (
+                            math.sqrt(
+                                jerk_duration ** 2
+                                + 4 * abs(distance) / MAX_ACCELERATION
+                            )
+                            - jerk_duration
+                        )
+                    )
+                    expected_duration = 2 * (
+                        peak_speed / MAX_ACCELERATION + jerk_duration
+                    )
+                else:
+                    expected_duration = 4 * np.cbrt(abs(distance) / (2 * MAX_JERK))
+                self.assertAlmostEqual(duration, expected_duration)
+                self.verify_profile(profile, duration, 0.0, 0.0)
+                positions, velocities = profile.evaluate(
+                    np.array([START_TAI + duration])
+                )
+                self.assertAlmostEqual(positions[0], distance)
+                self.assertAlmostEqual(velocities[0], 0.0)
+
+        # Without limits the move is made at maximum speed.
+        profile, duration = MotionProfile.plan_move(
+            start_tai=START_TAI,
+            position=0.0,
+            velocity=0.0,
+            distance=math.radians(-3.0),
+            end_velocity=0.0,
+            max_speed=MAX_SPEED,
+        )
+        self.assertEqual(duration, math.radians(3.0) / MAX_SPEED)
+        positions, velocities = profile.evaluate(START_TAI + np.array([1.0, 3.0]))
+        np.testing.assert_allclose(positions, np.radians([-1.5, -3.0]))
+        np.testing.assert_allclose(velocities, [-MAX_SPEED, 0.0])
+
+    def test_from_samples(self):
+        tai = START_TAI + np.array([0.0, 1.0, 3.0])
+        position = np.array([1.0, 1.1, 1.2])
+        velocity = np.array([0.0, 0.1, 0.02])
+        profile = MotionProfile.from_samples(tai, position, velocity)
+        # The profile goes through the samples and is continuous.
+        positions, velocities = profile.evaluate(tai)
+        np.testing.assert_allclose(positions, position)
+        np.testing.assert_allclose(velocities, velocity)
+        positions, velocities = profile.evaluate(tai[1:] - 1e-9)
+        np.testing.assert_allclose(positions, position[1:])
+        np.testing.assert_allclose(velocities, velocity[1:], atol=1e-7)
+        # After the last sample the velocity is kept.
+        positions, velocities = profile.evaluate(tai[-1:] + 10.0)
+        np.testing.assert_allclose(positions, [1.2 + 10 * 0.02])
+        np.testing.assert_allclose(velocities, [0.02])
+
+    def test_azimuth_motion(self):
+        azimuth_motion = AzimuthMotion(
+            start_position=math.radians(355.0),
+            max_speed=MAX_SPEED,
+            start_tai=START_TAI,
+            max_acceleration=MAX_ACCELERATION,
+            max_jerk=MAX_JERK,
+        )
+        acceleration_duration = (
+            MAX_SPEED / MAX_ACCELERATION + MAX_ACCELERATION / MAX_JERK
+        )
+        duration = azimuth_motion.set_target_position_and_velocity(
+            start_tai=START_TAI,
+            end_position=math.radians(15.0),
+            crawl_velocity=0,
+            motion_state=MotionState.MOVING,
+        )
+        self.assertAlmostEqual(
+            duration, acceleration_duration + math.radians(20.0) / MAX_SPEED
+        )
+        (
+            position,
+            velocity,
+            motion_state,
+        ) = azimuth_motion.get_position_velocity_and_motion_state(START_TAI + 0.1)
+        self.assertGreater(velocity, 0)
+        self.assertLess(velocity, MAX_SPEED)
+        self.assertEqual(motion_state, MotionState.MOVING)
+
+        # Stopping takes time as well and starts from the current velocity.
+        azimuth_motion.stop(start_tai=START_TAI + 5.0)
+        (
+            position,
+            velocity,
+            motion_state,
+        ) = azimuth_motion.get_position_velocity_and_motion_state(START_TAI + 5.5)
+        self.assertGreater(velocity, 0)
+        self.assertEqual(motion_state, MotionState.STOPPING)
+        (
+            position,
+            velocity,
+            motion_state,
+        ) = azimuth_motion.get_position_velocity_and_motion_state(
+            START_TAI + 5.0 + acceleration_duration
+        )
+        self.assertAlmostEqual(velocity, 0)
+        self.assertEqual(motion_state, MotionState.STOPPED)
+        stop_position = position
+
+        # Parking returns the time at which the dome is parked, which is later
+        # than without acceleration.
+        end_tai = azimuth_motion.park(start_tai=START_TAI + 10.0)
+        self.assertGreater(end_tai, START_TAI + 10.0 + stop_position / MAX_SPEED)
+        (
+            position,
+            velocity,
+            motion_state,
+        ) = azimuth_motion.get_position_velocity_and_motion_state(end_tai - 1.0)
+        self.assertLess(velocity, 0)
+        self.assertEqual(motion_state, MotionState.PARKING)
+        (
+            position,
+            velocity,
+            motion_state,
+        ) = azimuth_motion.get_position_velocity_and_motion_state(end_tai)
+        self.assertAlmostEqual(position, 0)
+        self.assertAlmostEqual(velocity, 0)
+        self.assertEqual(motion_state, MotionState.PARKED)
+        self.assertEqual(azimuth_motion.next_transition_tai(START_TAI + 10.0), end_tai)
+        self.assertIsNone(azimuth_motion.next_transition_tai(end_tai))
+
+    def test_elevation_motion(self):
+        elevation_motion = ElevationMotion(
+            start_position=math.radians(85.0),
+            min_position=0,
+            max_position=math.radians(90.0),
+            max_speed=MAX_SPEED,
+            start_tai=START_TAI,
+            max_acceleration=MAX_ACCELERATION,
+            max_jerk=MAX_JERK,
+        )
+        # Changing to the crawl velocity takes time.
+        duration = elevation_motion.set_target_position_and_velocity(
+            start_tai=START_TAI,
+            end_position=math.radians(90.0),
+            crawl_velocity=MAX_SPEED,
+            motion_state=MotionState.CRAWLING,
+        )
+        self.assertAlmostEqual(
+            duration, MAX_SPEED / MAX_ACCELERATION + MAX_ACCELERATION / MAX_JERK
+        )
+        (
+            position,
+            velocity,
+            motion_state,
+        ) = elevation_motion.get_position_velocity_and_motion_state(START_TAI + 1.0)
+        self.assertLess(velocity, MAX_SPEED)
+        self.assertEqual(motion_state, MotionState.CRAWLING)
+        # Crawling stops at the position limits.
+        (
+            position,
+            velocity,
+            motion_state,
+        ) = elevation_motion.get_position_velocity_and_motion_state(START_TAI + 10.0)
+        self.assertAlmostEqual(position, math.radians(90.0))
+        self.assertEqual(velocity, 0)
+        self.assertEqual(motion_state, MotionState.STOPPED)
+        # The motion state changed when the position limit was reached.
+        transition_tai = elevation_motion.next_transition_tai(START_TAI)
+        self.assertGreater(transition_tai, START_TAI + duration)
+        (
+            position,
+            velocity,
+            motion_state,
+        ) = elevation_motion.get_position_velocity_and_motion_state(transition_tai)
+        self.assertAlmostEqual(position, math.radians(90.0))
+        self.assertEqual(motion_state, MotionState.STOPPED)
+        (
+            position,
+            velocity,
+            motion_state,
+        ) = elevation_motion.get_position_velocity_and_motion_state(
+            transition_tai - 0.001
+        )
+        self.assertEqual(motion_state, MotionState.CRAWLING)
+        self.assertIsNone(elevation_motion.next_transition_tai(transition_tai))
+
+        # A move starts from rest at the position limit.
+        duration = elevation_motion.set_target_position_and_velocity(
+            start_tai=START_TAI + 20.0,
+            end_position=math.radians(60.0),
+            crawl_velocity=0,
+            motion_state=MotionState.MOVING,
+        )
+        (
+            position,
+            velocity,
+            motion_state,
+        ) = elevation_motion.get_position_velocity_and_motion_state(
+            START_TAI + 20.0 + duration
+        )
+        self.assertAlmostEqual(position, math.radians(60.0))
+        self.assertAlmostEqual(velocity, 0)
+        self.assertEqual(motion_state, MotionState.STOPPED)
+        self.assertEqual(
+            elevation_motion.next_transition_tai(START_TAI + 20.0),
+            START_TAI + 20.0 + duration,
+        )
+
+    def test_follow_trajectory(self):
+        azimuth_motion = AzimuthMotion(
+            start_position=math.radians(359.0),
+            max_speed=MAX_SPEED,
+            start_tai=START_TAI,
+        )
+        # A trajectory across the 0/2pi boundary.
+        tai = START_TAI + np.arange(1.0, 6.0)
+        position = np.radians(np.remainder(np.arange(0.0, 5.0), 360.0))
+        velocity = np.full(5, math.radians(1.0))
+        duration = azimuth_motion.follow_trajectory(
+            start_tai=START_TAI, tai=tai, position=position, velocity=velocity
+        )
+        self.assertAlmostEqual(duration, 5.0)
+        (
+            positions,
+            velocities,
+            motion_states,
+        ) = azimuth_motion.get_positions_velocities_and_motion_states(tai)
+        np.testing.assert_allclose(positions, position, atol=1e-12)
+        np.testing.assert_allclose(velocities, velocity)
+        np.testing.assert_array_equal(motion_states, MotionState.CRAWLING)
+        (
+            position,
+            velocity,
+            motion_state,
+        ) = azimuth_motion.get_position_velocity_and_motion_state(START_TAI + 0.5)
+        self.assertGreater(velocity, 0)
+        self.assertEqual(motion_state, MotionState.CRAWLING)
+
+        # A chunk replaces the samples from its first sample on and keeps the
+        # earlier ones.
+        duration = azimuth_motion.follow_trajectory(
+            start_tai=START_TAI + 2.5,
+            tai=START_TAI + np.array([4.0, 6.0]),
+            position=np.radians([3.0, 3.0]),
+            velocity=[0.0, 0.0],
+        )
+        self.assertAlmostEqual(duration, 3.5)
+        (
+            positions,
+            velocities,
+            motion_states,
+        ) = azimuth_motion.get_positions_velocities_and_motion_states(
+            START_TAI + np.array([3.0, 4.0, 6.0, 10.0])
+        )
+        np.testing.assert_allclose(positions, np.radians([2.0, 3.0, 3.0, 3.0]))
+        np.testing.assert_allclose(velocities, [math.radians(1.0), 0, 0, 0])
+        np.testing.assert_array_equal(
+            motion_states, [MotionState.CRAWLING] * 2 + [MotionState.STOPPED] * 2
+        )
+
+        for tai, position, velocity in [
+            # Samples in the past.
+            ([START_TAI], [0.0], [0.0]),
+            # Times that are not increasing.
+            ([START_TAI + 12.0, START_TAI + 11.0], [0.0, 0.0], [0.0, 0.0]),
+            # Lengths that differ.
+            ([START_TAI + 11.0], [0.0, 0.0], [0.0]),
+            # Too fast.
+            ([START_TAI + 11.0], [0.0], [2 * MAX_SPEED]),
+        ]:
+            with self.subTest(tai=tai, position=position, velocity=velocity):
+                with self.assertRaises(ValueError):
+                    azimuth_motion.follow_trajectory(
+                        start_tai=START_TAI + 10.0,
+                        tai=tai,
+                        position=position,
+                        velocity=velocity,
+                    )
@@ -19,6 +19,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import asyncio
 import asynctest
 import logging
 import pytest
@@ -611,6 +612,265 @@ class CscTestCase(salobj.BaseCscTestCase, asynctest.TestCase):
                 thcs_status["temperature"], [0.0] * NUM_THERMO_SENSORS,
             )
 
+    async def test_concurrent_status(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+
+            # Many commands can be in flight at the same time and each reply
+            # is matched to its command by the command id.
+            await asyncio.gather(
+                self.csc.statusAMCS(),
+                self.csc.statusApSCS(),
+                self.csc.statusLCS(),
+                self.csc.statusLWSCS(),
+                self.csc.statusMonCS(),
+                self.csc.statusThCS(),
+            )
+            for llc_name in LlcName:
+                self.assertIn(llc_name.value, self.csc.lower_level_status)
+            self.assertEqual(
+                self.csc.lower_level_status[LlcName.LCS.value]["positionActual"],
+                [0.0] * NUM_LOUVERS,
+            )
+            self.assertEqual(self.csc.telemetry_connection.pending_replies, {})
+
+    async def test_stop_during_status(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+
+            # The status commands and the other commands are sent on separate
+            # connections, so a stop command doesn't need to wait for the
+            # replies to the status commands.
+            self.assertIsNot(self.csc.control_connection, self.csc.telemetry_connection)
+            self.assertEqual(len(self.csc.mock_ctrl.connections), 2)
+            status_task = asyncio.create_task(self.csc.statusAll())
+            await self.remote.cmd_stopAz.set_start(timeout=STD_TIMEOUT)
+            await status_task
+            self.assertEqual(self.csc.control_connection.pending_replies, {})
+
+    async def test_status_all(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+
+            await self.csc.statusAll()
+            for llc_name in LlcName:
+                self.assertIn(llc_name.value, self.csc.lower_level_status)
+            amcs_status = self.csc.lower_level_status[LlcName.AMCS.value]
+            self.assertEqual(
+                amcs_status["status"]["status"], MotionState.STOPPED.name,
+            )
+            await self.assert_next_sample(
+                topic=self.remote.evt_azMotion,
+                state=MotionState.STOPPED,
+                inPosition=True,
+            )
+            thcs_status = self.csc.lower_level_status[LlcName.THCS.value]
+            self.assertEqual(
+                thcs_status["temperature"], [0.0] * NUM_THERMO_SENSORS,
+            )
+
+            # Only the status of the given lower level components is
+            # published, so the AMCS status isn't published twice when it is
+            # polled separately.
+            await self.csc.cancel_status_tasks()
+            self.csc.lower_level_status = {}
+            await self.csc.statusAll([LlcName.LCS, LlcName.THCS])
+            self.assertEqual(
+                set(self.csc.lower_level_status),
+                {LlcName.LCS.value, LlcName.THCS.value},
+            )
+
+    async def test_status_scheduler(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+
+            # Each lower level component is polled at its configured period.
+            statistics = self.csc.status_scheduler.get_statistics()
+            self.assertEqual(
+                {name: stats["period"] for name, stats in statistics.items()},
+                {
+                    llc_name.value: period
+                    for llc_name, period in self.csc.get_status_periods().items()
+                },
+            )
+
+            await asyncio.sleep(self.csc.config.amcs_status_period * 2)
+            statistics = self.csc.status_scheduler.get_statistics()
+            self.assertGreater(statistics[LlcName.AMCS.value]["num_polls"], 1)
+            for stats in statistics.values():
+                self.assertEqual(stats["num_failures"], 0)
+
+    async def test_motion_adaptive_status_period(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+            amcs_poll = self.csc.status_scheduler.polls[LlcName.AMCS.value]
+            self.assertEqual(amcs_poll.period, self.csc.config.amcs_status_period)
+
+            await self.remote.cmd_moveAz.set_start(
+                position=10.0, velocity=0.0, timeout=STD_TIMEOUT
+            )
+            self.assertEqual(
+                amcs_poll.period, self.csc.config.amcs_moving_status_period
+            )
+
+            # A status from before the move started, which reports that AMCS
+            # is stopped, doesn't switch back to the normal status period.
+            self.assertIn(LlcName.AMCS, self.csc.motion_operations)
+            self.assertTrue(self.csc.is_moving(LlcName.AMCS, MotionState.STOPPED))
+
+            # Once AMCS has stopped, the normal status period is used again.
+            await self.remote.cmd_stopAz.set_start(timeout=STD_TIMEOUT)
+
+            async def wait_for_normal_status_period():
+                while amcs_poll.period != self.csc.config.amcs_status_period:
+                    await asyncio.sleep(0.1)
+
+            await asyncio.wait_for(wait_for_normal_status_period(), timeout=STD_TIMEOUT)
+
+    async def test_transition_poll(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+
+            # Poll the AMCS status far less often than the move takes.
+            status_period = 5.0
+            self.csc.config.amcs_status_period = status_period
+            self.csc.config.amcs_moving_status_period = status_period
+            await self.csc.start_status_tasks()
+            self.remote.evt_azMotion.flush()
+
+            await self.remote.cmd_moveAz.set_start(
+                position=1.0, velocity=0.0, timeout=STD_TIMEOUT
+            )
+            # Leave it to the status poll at the transition to notice that
+            # the move has ended.
+            operation = self.csc.motion_operations[LlcName.AMCS]
+            operation.check_task.cancel()
+
+            data = await self.remote.evt_azMotion.next(flush=False, timeout=STD_TIMEOUT)
+            while data.state != MotionState.STOPPED:
+                data = await self.remote.evt_azMotion.next(
+                    flush=False, timeout=STD_TIMEOUT
+                )
+            self.assertLess(data.private_sndStamp - operation.expected_end_tai, 1.0)
+
+    async def test_subscribe_to_status(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+
+            # Stop polling so all statuses are pushed by the controller.
+            await self.csc.cancel_status_tasks()
+            await self.csc.subscribe_to_status()
+            self.csc.lower_level_status = {}
+
+            async def wait_for_all_statuses():
+                while len(self.csc.lower_level_status) < len(LlcName):
+                    await asyncio.sleep(0.1)
+
+            await asyncio.wait_for(wait_for_all_statuses(), timeout=STD_TIMEOUT * 2)
+            for llc_name in LlcName:
+                self.assertIn(llc_name.value, self.csc.lower_level_status)
+
+    async def test_subscribe_to_status_fails(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+
+            # The controller rejects the subscription to the last lower level
+            # component, so the CSC falls back to polling and cancels the
+            # subscriptions that were accepted.
+            subscribe = self.csc.mock_ctrl.subscribe
+
+            async def subscribe_except_thcs(connection, system, period):
+                if system == LlcName.THCS.value and period > 0:
+                    raise ValueError("Subscribing to ThCS fails on purpose.")
+                return await subscribe(connection, system, period)
+
+            self.csc.mock_ctrl.dispatch_dict["subscribe"] = subscribe_except_thcs
+            await self.csc.cancel_status_tasks()
+            self.csc.config.subscribe_to_status = True
+            await self.csc.start_status_tasks()
+            self.assertEqual(self.csc.status_subscriptions, set())
+            for connection in self.csc.mock_ctrl.connections:
+                self.assertEqual(connection.subscription_tasks, {})
+            self.assertIn(LlcName.AMCS.value, self.csc.status_scheduler.polls)
+
+    async def test_status_delta(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+
+            await self.csc.cancel_status_tasks()
+            self.csc.config.status_keyframe_interval = 3
+            await self.csc.write_then_read_reply(
+                command="setStatusDelta", keyframeInterval=3
+            )
+            # The deltas get merged into the full status so the published
+            # status always is complete.
+            for i in range(4):
+                await self.csc.statusLCS()
+                lcs_status = self.csc.lower_level_status[LlcName.LCS.value]
+                self.assertEqual(
+                    lcs_status["positionActual"], [0.0] * NUM_LOUVERS,
+                )
+                self.assertIn("timestampUTC", lcs_status)
+
+    async def test_position_status(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+
+            await self.csc.cancel_status_tasks()
+            self.csc.config.amcs_position_period = 0.1
+            await self.csc.start_status_tasks()
+            self.assertIn(
+                f"{LlcName.AMCS.value}Position", self.csc.status_scheduler.polls
+            )
+
+            # The position gets merged into the last full status so the
+            # published status always is complete.
+            await self.csc.statusAMCS()
+            self.csc.mock_ctrl.amcs.drive_temperature[:] = 30.0
+            await self.csc.request_and_send_llc_status(
+                LlcName.AMCS,
+                self.csc.tel_azimuth,
+                ["status", "positionActual", "velocityActual", "timestampUTC"],
+            )
+            amcs_status = self.csc.lower_level_status[LlcName.AMCS.value]
+            self.assertIn("positionActual", amcs_status)
+            self.assertEqual(amcs_status["driveTemperature"][0], 20.0)
+
+            # The moving status period applies to the position poll.
+            await self.remote.cmd_moveAz.set_start(
+                position=10.0, velocity=0.0, timeout=STD_TIMEOUT
+            )
+            position_poll = self.csc.status_scheduler.polls[
+                f"{LlcName.AMCS.value}Position"
+            ]
+            self.assertEqual(
+                position_poll.period, self.csc.config.amcs_moving_status_period
+            )
+            self.assertEqual(
+                self.csc.status_scheduler.polls[LlcName.AMCS.value].period,
+                self.csc.config.amcs_status_period,
+            )
+
     async def test_status_error(self):
         async with self.make_csc(
             initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
@@ -642,5 +902,338 @@ class CscTestCase(salobj.BaseCscTestCase, asynctest.TestCase):
                 faultCode=expected_fault_code,
             )
 
+    async def test_status_failure(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+            scheduler = self.csc.status_scheduler
+            scheduler.max_backoff = 0.4
+            scheduler.set_period(LlcName.LCS.value, 0.1)
+
+            # Make the mock controller fail to determine the LCS status.
+            lcs = self.csc.mock_ctrl.lcs
+            determine_status = lcs.determine_status
+
+            async def fail(current_tai):
+                raise RuntimeError("Failed on purpose.")
+
+            lcs.determine_status = fail
+
+            async def wait_for_statistics(name, condition):
+                while not condition(scheduler.get_statistics()[name]):
+                    await asyncio.sleep(0.1)
+
+            await asyncio.wait_for(
+                wait_for_statistics(
+                    LlcName.LCS.value, lambda stats: stats["num_failures"] >= 3
+                ),
+                timeout=STD_TIMEOUT,
+            )
+            # The other lower level components still get polled.
+            statistics = scheduler.get_statistics()
+            self.assertEqual(statistics[LlcName.AMCS.value]["num_failures"], 0)
+            self.assertGreater(statistics[LlcName.AMCS.value]["num_polls"], 1)
+
+            # The LCS status gets polled again once the failures stop.
+            lcs.determine_status = determine_status
+            await asyncio.wait_for(
+                wait_for_statistics(
+                    LlcName.LCS.value,
+                    lambda stats: stats["num_consecutive_failures"] == 0,
+                ),
+                timeout=STD_TIMEOUT,
+            )
+            statistics = scheduler.get_statistics()
+            self.assertGreater(statistics[LlcName.LCS.value]["error_rate"], 0)
+
+    async def test_reconnect(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+            await self.remote.cmd_moveAz.set_start(
+                position=10.0, velocity=0.0, timeout=STD_TIMEOUT
+            )
+            wait_task = asyncio.create_task(self.csc.wait_for_motion(LlcName.AMCS))
+
+            # Kill the mock controller, which drops the connections.
+            port = self.csc.mock_ctrl.port
+            await self.csc.mock_ctrl.stop()
+
+            async def wait_for_connected(connected):
+                while self.csc.connected != connected:
+                    await asyncio.sleep(0.1)
+
+            await asyncio.wait_for(wait_for_connected(False), timeout=STD_TIMEOUT)
+            self.assertFalse(self.csc.reconnect_task.done())
+
+            # The move that was in flight is aborted.
+            with self.assertRaises(ConnectionError):
+                await asyncio.wait_for(wait_task, timeout=STD_TIMEOUT)
+            self.assertEqual(self.csc.motion_operations, {})
+
+            # The CSC reconnects once the controller is back, resyncs the
+            # status of all lower level components and resumes polling,
+            # without changing summary state.
+            self.csc.mock_ctrl = MTDome.MockMTDomeController(port=port)
+            await self.csc.mock_ctrl.start()
+            self.csc.lower_level_status = {}
+            await asyncio.wait_for(self.csc.reconnect_task, timeout=STD_TIMEOUT * 2)
+            self.assertTrue(self.csc.connected)
+            self.assertEqual(self.csc.num_reconnects, 1)
+            self.assertGreater(self.csc.last_reconnect_duration, 0)
+            self.assertEqual(
+                set(self.csc.lower_level_status),
+                {llc_name.value for llc_name in LlcName},
+            )
+            self.assertIsNotNone(self.csc.status_scheduler)
+            self.assertEqual(self.csc.summary_state, salobj.State.ENABLED)
+
+            await self.remote.cmd_stopAz.set_start(timeout=STD_TIMEOUT)
+
+    async def test_bad_reply(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+
+            # Replies that can't be decoded or that are not an object are
+            # skipped, without dropping the connection.
+            connection = self.csc.control_connection
+            self.assertEqual(
+                connection.frame_reader.wire_format,
+                MTDome.encoding_tools.WireFormat.JSON,
+            )
+            connection.reader.feed_data(b"not json" + MTDome.encoding_tools.TERMINATOR)
+            connection.reader.feed_data(b"[1, 2]" + MTDome.encoding_tools.TERMINATOR)
+            await self.remote.cmd_stopAz.set_start(timeout=STD_TIMEOUT)
+            self.assertFalse(connection.read_loop_task.done())
+            self.assertTrue(self.csc.reconnect_task.done())
+            self.assertEqual(self.csc.num_reconnects, 0)
+
+    async def test_background_validation_failure(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+            await self.csc.cancel_status_tasks()
+            MTDome.encoding_tools.set_validation_policy(
+                MTDome.encoding_tools.ValidationPolicy.SAMPLE, sample_percentage=100
+            )
+            try:
+                # An invalid reply is reported once it has been validated in
+                # the background, without waiting for the next reply.
+                num_failures = self.csc.num_reported_validation_failures
+                self.csc.telemetry_connection.reader.feed_data(
+                    b'{"response": 0, "timeout": "0"}'
+                    + MTDome.encoding_tools.TERMINATOR
+                )
+
+                async def wait_for_report():
+                    while self.csc.num_reported_validation_failures == num_failures:
+                        await asyncio.sleep(0.1)
+
+                await asyncio.wait_for(wait_for_report(), timeout=STD_TIMEOUT)
+            finally:
+                MTDome.encoding_tools.set_validation_policy(
+                    MTDome.encoding_tools.ValidationPolicy.ALWAYS
+                )
+
+    async def test_wire_format(self):
+        wire_format = MTDome.encoding_tools.WireFormat.MSGPACK
+        if wire_format not in MTDome.encoding_tools.get_supported_wire_formats():
+            self.skipTest("msgpack is not installed.")
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+
+            # The wire format is negotiated on the control connection as well
+            # as on the telemetry connection.
+            self.csc.config.wire_format = wire_format.value
+            self.assertEqual(len(self.csc.connections), 2)
+            for connection in self.csc.connections:
+                await self.csc.negotiate_wire_format(connection)
+                self.assertEqual(connection.frame_reader.wire_format, wire_format)
+            await self.csc.statusAMCS()
+            await self.remote.cmd_stopAz.set_start(timeout=STD_TIMEOUT)
+
+    async def test_coalesce_motion_commands(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+            self.csc.config.coalesce_motion_commands = True
+
+            # Only the first and the last of a burst of moveAz commands reach
+            # the controller. The others are superseded.
+            tasks = []
+            for position in (0.1, 0.2, 0.3, 0.4):
+                tasks.append(
+                    asyncio.create_task(
+                        self.csc.send_motion_command(
+                            "az", "moveAz", position=position, velocity=0.0
+                        )
+                    )
+                )
+                await asyncio.sleep(0)
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for result in results[1:-1]:
+                self.assertIsInstance(result, asyncio.CancelledError)
+            self.assertEqual(
+                self.csc.motion_coalescers["az"].get_statistics(),
+                dict(num_sent=2, num_superseded=2),
+            )
+            self.assertAlmostEqual(self.csc.mock_ctrl.amcs.position_commanded, 0.4)
+
+    async def test_azimuth_tracking(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+            tolerance = self.csc.config.azimuth_tracking_tolerance
+
+            # A trajectory that starts 5 degrees away from the dome.
+            start_tai = salobj.current_tai()
+            trajectory = MTDome.AzimuthTrajectory.from_polynomial(
+                reference_tai=start_tai, coefficients=[5.0, 0.3]
+            )
+            self.csc.start_tracking(trajectory)
+            data = await self.assert_next_sample(
+                topic=self.remote.evt_azTarget, flush=False, timeout=STD_TIMEOUT,
+            )
+            self.assertGreater(data.position, 5.0)
+
+            # The correction move takes less than 8 seconds, after which the
+            # dome crawls along with the trajectory.
+            await asyncio.sleep(9)
+            amcs_status = self.csc.lower_level_status[LlcName.AMCS.value]
+            position, _ = trajectory.evaluate(amcs_status["timestampUTC"])
+            error = salobj.angle_diff(
+                position, np.degrees(amcs_status["positionActual"])
+            ).deg
+            self.assertLessEqual(abs(error), tolerance)
+            statistics = self.csc.azimuth_tracker.get_statistics()
+            self.assertEqual(statistics["num_moves"], 1)
+            self.assertLess(statistics["num_crawls"], statistics["num_updates"])
+
+            # Any other azimuth command stops tracking.
+            await self.remote.cmd_stopAz.start()
+            self.assertIsNone(self.csc.azimuth_tracker)
+
+    async def test_batch(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+            replies = await self.csc.write_then_read_batch(
+                [
+                    ("openShutter", {}),
+                    ("setLouvers", dict(position=[100.0] * NUM_LOUVERS)),
+                    ("moveEl", dict(position=0.1)),
+                    ("moveAz", dict(position=0.1, velocity=0.0)),
+                ]
+            )
+            self.assertEqual(len(replies), 4)
+            self.assertEqual(replies[3]["timeout"], self.csc.mock_ctrl.amcs.duration)
+            self.assertEqual(self.csc.mock_ctrl.amcs.position_commanded, 0.1)
+
+            with self.assertRaises(ValueError):
+                await self.csc.write_then_read_batch(
+                    [("moveEl", dict(position=-1.0)), ("stopEl", {})]
+                )
+
+    async def test_move_az_el(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+            duration = await self.csc.move_az_el(azimuth=1.0, elevation=0.5)
+            self.assertGreater(duration, 0)
+            await self.assert_next_sample(
+                topic=self.remote.evt_azTarget, position=1.0, velocity=0
+            )
+            await self.assert_next_sample(
+                topic=self.remote.evt_elTarget, position=0.5, velocity=0
+            )
+            motion_states = await asyncio.gather(
+                self.csc.wait_for_motion(LlcName.AMCS, timeout=duration + STD_TIMEOUT),
+                self.csc.wait_for_motion(LlcName.LWSCS, timeout=duration + STD_TIMEOUT),
+            )
+            self.assertEqual(motion_states, [MotionState.STOPPED] * 2)
+
+    async def test_upload_azimuth_trajectory(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+            self.csc.config.upload_azimuth_trajectories = True
+            self.csc.config.trajectory_sample_interval = 0.5
+            self.csc.config.trajectory_chunk_duration = 2.0
+
+            trajectory = MTDome.AzimuthTrajectory.from_polynomial(
+                reference_tai=salobj.current_tai(), coefficients=[1.0, 0.3]
+            )
+            self.csc.start_tracking(trajectory)
+            self.assertIsNone(self.csc.azimuth_tracker)
+
+            # The dome follows the trajectory, also after the first chunk has
+            # ended.
+            await asyncio.sleep(4)
+            self.assertFalse(self.csc.trajectory_upload_task.done())
+            await self.csc.statusAMCS()
+            amcs_status = self.csc.lower_level_status[LlcName.AMCS.value]
+            self.assertEqual(amcs_status["status"]["status"], MotionState.CRAWLING.name)
+            position, velocity = trajectory.evaluate(amcs_status["timestampUTC"])
+            self.assertAlmostEqual(
+                np.degrees(amcs_status["positionActual"]), position, places=6
+            )
+            self.assertAlmostEqual(
+                np.degrees(amcs_status["velocityActual"]), velocity, places=6
+            )
+
+            # Any other azimuth command stops uploading.
+            await self.remote.cmd_stopAz.start()
+            self.assertTrue(self.csc.trajectory_upload_task.done())
+
+    async def test_wait_for_motion(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=1,
+        ):
+            await self.set_csc_to_enabled()
+
+            # Control the TAI time in the mock controller.
+            self.csc.mock_ctrl.determine_current_tai = asynctest.CoroutineMock()
+            self.csc.mock_ctrl.current_tai = salobj.current_tai()
+
+            await self.remote.cmd_moveAz.set_start(
+                position=1.0, velocity=0.0, timeout=STD_TIMEOUT
+            )
+            operation = self.csc.motion_operations[LlcName.AMCS]
+            self.assertGreater(operation.expected_end_tai, operation.command_tai)
+            await self.csc.statusAMCS()
+            self.assertFalse(operation.done_future.done())
+
+            # The AMCS reports STOPPED once the move has ended.
+            self.csc.mock_ctrl.current_tai = operation.expected_end_tai + 0.1
+            await self.csc.statusAMCS()
+            motion_state = await self.csc.wait_for_motion(
+                LlcName.AMCS, timeout=STD_TIMEOUT
+            )
+            self.assertEqual(motion_state, MotionState.STOPPED)
+            self.assertNotIn(LlcName.AMCS, self.csc.motion_operations)
+            self.assertIsNone(await self.csc.wait_for_motion(LlcName.AMCS))
+
+            # Stopping the dome aborts the move.
+            await self.remote.cmd_moveAz.set_start(
+                position=2.0, velocity=0.0, timeout=STD_TIMEOUT
+            )
+            wait_task = asyncio.create_task(self.csc.wait_for_motion(LlcName.AMCS))
+            await asyncio.sleep(0)
+            await self.remote.cmd_stopAz.set_start(timeout=STD_TIMEOUT)
+            with self.assertRaises(asyncio.CancelledError):
+                await wait_task
+
     async def test_bin_script(self):
         await self.check_bin_script(name="MTDome", index=None, exe_name="run_mtdome.py")
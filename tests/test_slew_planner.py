@@ -0,0 +1,163 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import asynctest
+import math
+
+import numpy as np
+
+from lsst.ts import MTDome
+from lsst.ts.MTDome.mock_llc.mock_motion import AzimuthMotion, ElevationMotion
+from lsst.ts.idl.enums.MTDome import MotionState
+
+START_TAI = 10001.0
+NUM_CANDIDATES = 100
+
+
+class SlewPlannerTestCase(asynctest.TestCase):
+    def setUp(self):
+        self.amcs_limits = MTDome.AmcsLimits()
+        self.lwscs_limits = MTDome.LwscsLimits()
+        self.rng = np.random.default_rng(seed=42)
+
+    def disable_acceleration_limits(self):
+        """Make the dome move at maximum speed all the way."""
+        for limits in (self.amcs_limits, self.lwscs_limits):
+            limits.amax = None
+            limits.jmax = None
+
+    def check_azimuth(self, start_position, target_position):
+        """Check that the azimuth slew durations are the same as those of the
+        mock controller."""
+        durations = MTDome.azimuth_slew_durations(
+            start_position, target_position, self.amcs_limits
+        )
+        self.assertEqual(durations.shape, target_position.shape)
+        for start, target, duration in zip(start_position, target_position, durations):
+            azimuth_motion = AzimuthMotion(
+                start_position=start,
+                max_speed=self.amcs_limits.vmax,
+                start_tai=START_TAI,
+                max_acceleration=self.amcs_limits.amax,
+                max_jerk=self.amcs_limits.jmax,
+            )
+            expected_duration = azimuth_motion.set_target_position_and_velocity(
+                start_tai=START_TAI,
+                end_position=target,
+                crawl_velocity=0,
+                motion_state=MotionState.MOVING,
+            )
+            self.assertAlmostEqual(duration, expected_duration)
+
+    def check_elevation(self, start_position, target_position):
+        """Check that the elevation slew durations are the same as those of
+        the mock controller."""
+        durations = MTDome.elevation_slew_durations(
+            start_position, target_position, self.lwscs_limits
+        )
+        self.assertEqual(durations.shape, target_position.shape)
+        for start, target, duration in zip(start_position, target_position, durations):
+            elevation_motion = ElevationMotion(
+                start_position=start,
+                min_position=0,
+                max_position=math.pi,
+                max_speed=self.lwscs_limits.vmax,
+                start_tai=START_TAI,
+                max_acceleration=self.lwscs_limits.amax,
+                max_jerk=self.lwscs_limits.jmax,
+            )
+            expected_duration = elevation_motion.set_target_position_and_velocity(
+                start_tai=START_TAI,
+                end_position=target,
+                crawl_velocity=0,
+                motion_state=MotionState.MOVING,
+            )
+            self.assertAlmostEqual(duration, expected_duration)
+
+    def test_azimuth(self):
+        self.disable_acceleration_limits()
+        start_position = self.rng.uniform(0, 2 * math.pi, NUM_CANDIDATES)
+        target_position = self.rng.uniform(0, 2 * math.pi, NUM_CANDIDATES)
+        self.check_azimuth(start_position, target_position)
+
+        # The dome takes the shortest way around.
+        durations = MTDome.azimuth_slew_durations(
+            math.radians(350), np.radians([10, 340, 170]), self.amcs_limits
+        )
+        np.testing.assert_allclose(
+            durations, np.radians([20, 10, 180]) / self.amcs_limits.vmax
+        )
+
+    def test_elevation(self):
+        self.disable_acceleration_limits()
+        start_position = self.rng.uniform(0, math.pi / 2, NUM_CANDIDATES)
+        target_position = self.rng.uniform(0, math.pi / 2, NUM_CANDIDATES)
+        self.check_elevation(start_position, target_position)
+
+    def test_s_curves(self):
+        # The distances cover the moves that don't reach the maximum
+        # acceleration, that don't reach the maximum speed and that cruise at
+        # maximum speed.
+        distances = np.radians([0, 0.01, 0.05, 0.2, 1, 3, 10, 60])
+        start_position = np.full(len(distances), math.pi / 2)
+        for target_position in (
+            start_position + distances,
+            start_position - distances,
+        ):
+            self.check_azimuth(start_position, target_position)
+            self.check_elevation(start_position, target_position)
+
+        start_position = self.rng.uniform(0, 2 * math.pi, NUM_CANDIDATES)
+        target_position = self.rng.uniform(0, 2 * math.pi, NUM_CANDIDATES)
+        self.check_azimuth(start_position, target_position)
+        start_position = self.rng.uniform(0, math.pi / 2, NUM_CANDIDATES)
+        target_position = self.rng.uniform(0, math.pi / 2, NUM_CANDIDATES)
+        self.check_elevation(start_position, target_position)
+
+        # Accelerating and decelerating takes longer than moving at maximum
+        # speed all the way.
+        long_durations = MTDome.azimuth_slew_durations(
+            0, np.radians([90, 180]), self.amcs_limits
+        )
+        self.disable_acceleration_limits()
+        np.testing.assert_array_less(
+            MTDome.azimuth_slew_durations(0, np.radians([90, 180]), self.amcs_limits),
+            long_durations,
+        )
+
+    def test_slew(self):
+        self.disable_acceleration_limits()
+        durations = MTDome.slew_durations(
+            start_azimuth=0,
+            target_azimuth=np.radians([10, 90]),
+            start_elevation=0,
+            target_elevation=np.radians([60, 30]),
+            amcs_limits=self.amcs_limits,
+            lwscs_limits=self.lwscs_limits,
+        )
+        # The slowest axis determines the duration.
+        np.testing.assert_allclose(
+            durations,
+            [
+                math.radians(60) / self.lwscs_limits.vmax,
+                math.radians(90) / self.amcs_limits.vmax,
+            ],
+        )
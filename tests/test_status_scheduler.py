@@ -0,0 +1,229 @@
+# This file is part of ts_MTDome.
+#
+# Developed for the Vera Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the Vera Rubin Observatory
+# Project (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import asyncio
+import asynctest
+import logging
+
+from lsst.ts import MTDome
+
+logging.basicConfig(
+    format="%(asctime)s:%(levelname)s:%(name)s:%(message)s", level=logging.DEBUG
+)
+
+PERIOD = 0.1
+
+
+class StatusSchedulerTestCase(asynctest.TestCase):
+    async def setUp(self):
+        self.log = logging.getLogger("StatusSchedulerTestCase")
+        self.scheduler = MTDome.StatusScheduler(self.log)
+        # The times at which the polls were started, by name.
+        self.poll_times = {}
+
+    async def tearDown(self):
+        self.scheduler.stop()
+
+    def make_method(self, name, duration=0):
+        """Make a status method which records the time at which it is
+        called and then takes the specified duration (sec)."""
+        self.poll_times[name] = []
+
+        async def method():
+            self.poll_times[name].append(asyncio.get_running_loop().time())
+            await asyncio.sleep(duration)
+
+        return method
+
+    async def test_no_drift(self):
+        # A method which takes most of the period doesn't delay the next
+        # polls.
+        self.scheduler.add("slow", self.make_method("slow", PERIOD * 0.8), PERIOD)
+        self.scheduler.start()
+        await asyncio.sleep(PERIOD * 10.5)
+        times = self.poll_times["slow"]
+        self.assertEqual(len(times), 11)
+        self.assertAlmostEqual(times[-1] - times[0], PERIOD * 10, delta=PERIOD / 2)
+
+    async def test_phase_offsets(self):
+        for name in ("a", "b"):
+            self.scheduler.add(name, self.make_method(name), PERIOD)
+        self.scheduler.start()
+        await asyncio.sleep(PERIOD * 0.75)
+        offset = self.poll_times["b"][0] - self.poll_times["a"][0]
+        self.assertAlmostEqual(offset, PERIOD / 2, delta=PERIOD / 4)
+
+    async def test_skip_outstanding(self):
+        # The polls of a method which takes longer than the period are
+        # skipped instead of queued.
+        self.scheduler.add("slower", self.make_method("slower", PERIOD * 2.5), PERIOD)
+        self.scheduler.start()
+        await asyncio.sleep(PERIOD * 5.5)
+        self.assertEqual(len(self.poll_times["slower"]), 2)
+        statistics = self.scheduler.get_statistics()["slower"]
+        self.assertEqual(statistics["num_polls"], 2)
+        self.assertEqual(statistics["num_skipped"], 4)
+
+    async def test_failures(self):
+        self.scheduler.max_backoff = PERIOD * 4
+        num_failures_to_inject = 4
+
+        async def fail():
+            self.poll_times["fail"].append(asyncio.get_running_loop().time())
+            if len(self.poll_times["fail"]) <= num_failures_to_inject:
+                raise RuntimeError("Failed on purpose.")
+
+        self.poll_times["fail"] = []
+        self.scheduler.add("fail", fail, PERIOD)
+        self.scheduler.add("ok", self.make_method("ok"), PERIOD)
+        self.scheduler.start()
+        await asyncio.sleep(PERIOD * 1.5)
+        statistics = self.scheduler.get_statistics()["fail"]
+        self.assertEqual(statistics["num_failures"], 1)
+        self.assertEqual(statistics["num_consecutive_failures"], 1)
+
+        # The time between the polls doubles with each failure, up to the
+        # maximum backoff, and the other polls continue at their period.
+        await asyncio.sleep(PERIOD * 15)
+        times = self.poll_times["fail"]
+        intervals = [t1 - t0 for t0, t1 in zip(times[:4], times[1:5])]
+        for interval, expected_interval in zip(intervals, (2, 4, 4, 4)):
+            self.assertAlmostEqual(
+                interval, PERIOD * expected_interval, delta=PERIOD / 2
+            )
+        self.assertGreaterEqual(len(self.poll_times["ok"]), 13)
+
+        # The poll continues at its period once it succeeds again.
+        statistics = self.scheduler.get_statistics()["fail"]
+        self.assertEqual(statistics["num_failures"], num_failures_to_inject)
+        self.assertEqual(statistics["num_consecutive_failures"], 0)
+        self.assertAlmostEqual(
+            statistics["error_rate"], num_failures_to_inject / statistics["num_polls"]
+        )
+        self.assertAlmostEqual(times[-1] - times[-2], PERIOD, delta=PERIOD / 2)
+
+    async def test_statistics_while_polling(self):
+        # The statistics are logged periodically and when a poll fails and
+        # recovers, and can be read while polling.
+        self.scheduler.statistics_interval = PERIOD * 3
+        num_failures_to_inject = 2
+
+        async def fail():
+            self.poll_times["fail"].append(asyncio.get_running_loop().time())
+            if len(self.poll_times["fail"]) <= num_failures_to_inject:
+                raise RuntimeError("Failed on purpose.")
+
+        self.poll_times["fail"] = []
+        self.scheduler.add("fail", fail, PERIOD)
+        with self.assertLogs(self.log, level=logging.INFO) as logs:
+            self.scheduler.start()
+            await asyncio.sleep(PERIOD * 4)
+            self.assertFalse(self.scheduler.run_task.done())
+            statistics = self.scheduler.get_statistics()["fail"]
+            self.assertEqual(statistics["num_failures"], 2)
+            self.assertEqual(statistics["num_consecutive_failures"], 2)
+            self.assertAlmostEqual(statistics["backoff"], PERIOD * 4)
+            await asyncio.sleep(PERIOD * 4)
+        statistics = self.scheduler.get_statistics()["fail"]
+        self.assertEqual(statistics["num_consecutive_failures"], 0)
+        self.assertEqual(statistics["backoff"], 0)
+
+        messages = [record.getMessage() for record in logs.records]
+        self.assertTrue(
+            any(
+                message.startswith("Polling fail failed;")
+                and "'num_failures': 1" in message
+                for message in messages
+            )
+        )
+        self.assertTrue(
+            any(
+                message.startswith("Polling fail succeeded again after 2 failures.")
+                and "'num_failures': 2" in message
+                for message in messages
+            )
+        )
+        periodic_messages = [
+            message
+            for message in messages
+            if message.startswith("Status poll statistics:")
+        ]
+        self.assertGreaterEqual(len(periodic_messages), 2)
+        self.assertIn("'backoff': ", periodic_messages[0])
+
+    async def test_missed_deadlines(self):
+        self.scheduler.add("blocked", self.make_method("blocked"), PERIOD)
+        self.scheduler.start()
+        await asyncio.sleep(PERIOD / 2)
+        # Block the event loop for several periods.
+        time_to_block = asyncio.get_running_loop().time() + PERIOD * 3
+        while asyncio.get_running_loop().time() < time_to_block:
+            pass
+        await asyncio.sleep(PERIOD / 4)
+        statistics = self.scheduler.get_statistics()["blocked"]
+        self.assertEqual(statistics["num_polls"], 2)
+        self.assertEqual(statistics["num_missed_deadlines"], 2)
+        self.assertGreater(statistics["max_jitter"], PERIOD * 2)
+
+    async def test_set_period(self):
+        self.scheduler.add("a", self.make_method("a"), PERIOD * 10)
+        self.scheduler.start()
+        await asyncio.sleep(PERIOD / 2)
+        self.assertEqual(len(self.poll_times["a"]), 1)
+
+        # A shorter period moves the next poll forward.
+        self.scheduler.set_period("a", PERIOD)
+        await asyncio.sleep(PERIOD * 2.5)
+        self.assertEqual(len(self.poll_times["a"]), 3)
+
+        # A longer period takes effect after the next poll.
+        self.scheduler.set_period("a", PERIOD * 10)
+        await asyncio.sleep(PERIOD * 2)
+        self.assertEqual(len(self.poll_times["a"]), 4)
+        self.assertEqual(self.scheduler.get_statistics()["a"]["period"], PERIOD * 10)
+
+        with self.assertRaises(ValueError):
+            self.scheduler.set_period("a", -PERIOD)
+
+    async def test_poll_now(self):
+        self.scheduler.add("a", self.make_method("a"), PERIOD * 10)
+        self.scheduler.start()
+        await asyncio.sleep(PERIOD / 2)
+        self.scheduler.poll_now("a")
+        await asyncio.sleep(PERIOD / 2)
+        times = self.poll_times["a"]
+        self.assertEqual(len(times), 2)
+        self.assertAlmostEqual(times[1] - times[0], PERIOD / 2, delta=PERIOD / 4)
+
+    async def test_add(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.add("zero", self.make_method("zero"), 0)
+        self.scheduler.add("a", self.make_method("a"), PERIOD)
+        with self.assertRaises(ValueError):
+            self.scheduler.add("a", self.make_method("a"), PERIOD)
+        self.scheduler.start()
+        with self.assertRaises(RuntimeError):
+            self.scheduler.add("b", self.make_method("b"), PERIOD)
+
+
+if __name__ == "__main__":
+    asynctest.main()